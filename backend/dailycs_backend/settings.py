@@ -38,6 +38,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'quiz.compression.CompressionMiddleware',
+    'quiz.metrics.QueryMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -92,6 +94,28 @@ DATABASES = {
     }
 }
 
+# 읽기 전용 replica (선택). DB_REPLICA_HOST 가 있으면 'replica' alias 를 추가하고,
+# 나머지 접속 정보는 지정하지 않은 항목만 primary 값을 그대로 쓴다
+if os.environ.get('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.environ.get('DB_REPLICA_NAME', DATABASES['default']['NAME']),
+        'USER': os.environ.get('DB_REPLICA_USER', DATABASES['default']['USER']),
+        'PASSWORD': os.environ.get('DB_REPLICA_PASSWORD', DATABASES['default']['PASSWORD']),
+        'HOST': os.environ.get('DB_REPLICA_HOST'),
+        'PORT': os.environ.get('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['quiz.replicas.ReplicaRouter']
+
+# QuizSetViewSet / QuestionViewSet 의 GET 요청을 보낼 replica alias 목록 (quiz/replicas.py)
+# GRADING_READS='replica' 이면 submit / submit_all 의 정답표 조회도 replica 에서 읽는다 (복제 지연만큼 오래된 정답표가 캐시될 수 있음)
+QUIZ_DB_REPLICAS = {
+    'ALIASES': [alias for alias in DATABASES if alias != 'default'],
+    'GRADING_READS': os.environ.get('QUIZ_GRADING_READS', 'primary'),
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -142,4 +166,66 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
-}
\ No newline at end of file
+    # orjson 기반 (미설치 시 DRF 기본 json 으로 동작)
+    'DEFAULT_RENDERER_CLASSES': [
+        'quiz.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'quiz.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
+# Quiz 채점용 정답표 캐시 (quiz/grading.py)
+# CACHE_ALIAS 를 지정하면 프로세스 로컬 LRU 뒤에 Django cache backend 를 공유 캐시로 사용
+QUIZ_ANSWER_KEY_CACHE = {
+    'MAX_ENTRIES': 256,
+    'LOCAL_TTL': 60,
+    'CACHE_ALIAS': os.environ.get('QUIZ_ANSWER_KEY_CACHE_ALIAS') or None,
+    'TIMEOUT': 60 * 60,
+}
+
+# POST /api/quizsets/{id}/questions/bulk/ 한 번에 받을 수 있는 최대 문제 수
+QUIZ_BULK_IMPORT_MAX_ITEMS = 1000
+
+# POST /api/submissions/batch/ 한 번에 받을 수 있는 최대 제출 수
+QUIZ_BATCH_GRADING_MAX_SUBMISSIONS = 500
+
+# 페이지네이션 응답의 전체 개수 캐시 (quiz/pagination.py)
+QUIZ_COUNT_CACHE_ALIAS = 'default'
+QUIZ_COUNT_CACHE_TIMEOUT = 60
+
+# 오늘의 문제 payload 캐시 (quiz/daily.py). 기본 cache 는 워커마다 따로 있으므로 다른 워커에서 수정 / 삭제된 문제는
+# TIMEOUT 초 안에 반영된다. 여러 워커가 공유하는 cache 를 QUIZ_DAILY_CACHE_ALIAS 로 지정하면 늘려도 된다
+QUIZ_DAILY_CACHE_TIMEOUT = 60
+
+# 무작위 추출용 id 인덱스 (quiz/sampling.py) 를 다시 만드는 주기(초). 변경 시 올리는 version 은 기본 cache(워커마다 따로) 에 있으므로
+# 다른 워커의 추가 / 삭제는 이 시간 안에 반영된다. 공유 cache 를 QUIZ_SAMPLING_CACHE_ALIAS 로 지정하면 늘려도 된다
+QUIZ_SAMPLING_INDEX_TTL = 60
+
+# 채점 기록 write-behind 버퍼 (quiz/attempts.py)
+# ENABLED=False 이면 채점 요청 안에서 바로 저장 (테스트용 동기 모드)
+QUIZ_ATTEMPT_BUFFER = {
+    'ENABLED': os.environ.get('QUIZ_ATTEMPT_BUFFER_ENABLED', 'true').lower() == 'true',
+    'MAX_SIZE': 200,
+    'FLUSH_INTERVAL': 2.0,
+    'MAX_PENDING': 5000,
+    'MAX_RETRIES': 3,
+}
+
+# quiz API 요청 계측 (quiz/metrics.py), 결과는 /api/_metrics 에서 조회
+QUIZ_METRICS = {
+    'SAMPLE_RATE': float(os.environ.get('QUIZ_METRICS_SAMPLE_RATE', '0.1')),
+    'BUFFER_SIZE': 1000,
+    'SERVER_TIMING': DEBUG,
+    'PATH_PREFIX': '/api/',
+}
+
+# 응답 압축 (quiz/compression.py). MIN_SIZE 바이트 이상인 JSON 응답을 br(brotli 설치 시) / gzip 으로 압축
+QUIZ_COMPRESSION = {
+    'MIN_SIZE': 1024,
+    'GZIP_LEVEL': 5,
+    'BROTLI_QUALITY': 4,
+}
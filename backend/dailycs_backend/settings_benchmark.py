@@ -0,0 +1,23 @@
+"""
+로컬 벤치마크용 설정 (SQLite)
+
+    python manage.py migrate --settings=dailycs_backend.settings_benchmark
+    python manage.py generate_quiz_dataset --settings=dailycs_backend.settings_benchmark
+    python manage.py benchmark_quiz_api --settings=dailycs_backend.settings_benchmark
+"""
+from .settings import *  # noqa: F401,F403
+
+DEBUG = False
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('BENCHMARK_DB_PATH', BASE_DIR / 'benchmark.sqlite3'),
+        'OPTIONS': {
+            'timeout': 20,
+        },
+    }
+}
+
+# 벤치마크 자체가 쿼리 수 / 지연 시간을 측정하므로 요청 계측은 끔
+QUIZ_METRICS = {**QUIZ_METRICS, 'SAMPLE_RATE': 0.0, 'SERVER_TIMING': False}
@@ -0,0 +1,24 @@
+"""
+primary / replica 를 SQLite 파일 두 개로 흉내 내는 로컬 설정 (read replica router 확인용)
+
+    python manage.py migrate --settings=dailycs_backend.settings_replica
+    cp replica-primary.sqlite3 replica-replica.sqlite3      # '복제'
+    python manage.py runserver --settings=dailycs_backend.settings_replica
+
+replica 파일은 복사한 시점에 멈춰 있으므로, 이후 primary 에 쓴 내용이 GET 응답에 보이지 않으면 replica 에서 읽은 것이다.
+"""
+from .settings import *  # noqa: F401,F403
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('REPLICA_PRIMARY_DB_PATH', BASE_DIR / 'replica-primary.sqlite3'),
+    },
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('REPLICA_REPLICA_DB_PATH', BASE_DIR / 'replica-replica.sqlite3'),
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+
+QUIZ_DB_REPLICAS = {**QUIZ_DB_REPLICAS, 'ALIASES': ['replica']}
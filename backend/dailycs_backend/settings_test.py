@@ -0,0 +1,24 @@
+"""
+테스트용 설정 (SQLite)
+
+    python manage.py test --settings=dailycs_backend.settings_test
+"""
+from .settings import *  # noqa: F401,F403
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'test.sqlite3',
+    },
+    # ReplicaRouter 테스트용. MIRROR 대신 별도 테스트 DB 를 만들어 어느 쪽에서 읽었는지 데이터로 구분한다
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'test-replica.sqlite3',
+    },
+}
+
+# replica 로 라우팅하는 테스트만 override_settings 로 켠다
+QUIZ_DB_REPLICAS = {**QUIZ_DB_REPLICAS, 'ALIASES': []}
+
+# 테스트가 쿼리 수를 직접 확인하므로 요청 계측은 끔
+QUIZ_METRICS = {**QUIZ_METRICS, 'SAMPLE_RATE': 0.0, 'SERVER_TIMING': False}
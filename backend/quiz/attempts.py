@@ -0,0 +1,206 @@
+import atexit
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+
+from .models import Attempt, AttemptAnswer
+from .review import apply_review_updates
+from .stats import apply_attempt_stats
+
+logger = logging.getLogger(__name__)
+
+# settings.QUIZ_ATTEMPT_BUFFER 로 덮어쓸 수 있는 기본값
+#  - ENABLED        : False 면 채점 요청 안에서 바로 저장 (테스트 / 단일 프로세스용 동기 모드)
+#  - MAX_SIZE       : 이 개수만큼 쌓이면 백그라운드 스레드가 바로 flush
+#  - FLUSH_INTERVAL : 개수와 상관없이 flush 하는 주기(초)
+#  - MAX_PENDING    : flush 가 밀려 이 개수를 넘으면 요청 스레드에서 동기로 flush (메모리 상한)
+#  - MAX_RETRIES    : DB 오류로 저장하지 못한 기록을 버퍼에 되돌려 다시 시도하는 횟수 (넘으면 버린다)
+DEFAULTS = {
+    'ENABLED': True,
+    'MAX_SIZE': 200,
+    'FLUSH_INTERVAL': 2.0,
+    'MAX_PENDING': 5000,
+    'MAX_RETRIES': 3,
+}
+
+
+def _config(name):
+    return getattr(settings, 'QUIZ_ATTEMPT_BUFFER', {}).get(name, DEFAULTS[name])
+
+
+def normalize_choice_ids(choice_ids):
+    """
+    저장할 choice_ids: 중복을 없애고 정렬한다.
+    채점은 set 비교라 문자열 id 등이 섞여 있어도 통과하므로, 정렬할 수 없는 조합이면 (타입 이름, 값) 순으로 정렬한다.
+    """
+    unique = set(choice_ids)
+    try:
+        return sorted(unique)
+    except TypeError:
+        return sorted(unique, key=lambda value: (type(value).__name__, str(value)))
+
+
+def build_attempt(quizset_id, user, answer_key, submitted_answers, results, total_questions, kind='quizset',
+                  user_ref='', idempotency_scope='', idempotency_key=None):
+    """
+    채점 결과(grade_submission 의 results)로 저장할 Attempt / AttemptAnswer 객체를 만든다.
+    QuizSet 에 속하지 않은 question_id 의 답안은 정답표에 없으므로 기록하지 않는다.
+    """
+    attempt = Attempt(
+        kind=kind,
+        user=user if user is not None and user.is_authenticated else None,
+        quiz_set_id=quizset_id,
+        total_questions=total_questions,
+        total_correct=sum(1 for result in results if result['is_correct']),
+        submitted_at=timezone.now(),
+        user_ref=user_ref,
+        idempotency_scope=idempotency_scope,
+        idempotency_key=idempotency_key,
+    )
+    answers = [
+        AttemptAnswer(
+            attempt=attempt,
+            question_id=result['question_id'],
+            choice_ids=normalize_choice_ids(answer.get('choice_ids', [])),
+            is_correct=result['is_correct'],
+        )
+        for answer, result in zip(submitted_answers, results)
+        if result['question_id'] in answer_key
+    ]
+    return attempt, answers
+
+
+def write_attempts(entries):
+    """
+    (Attempt, [AttemptAnswer]) 목록을 bulk_create 2번으로 저장하고, 같은 트랜잭션에서 통계 카운터와 복습 상태를 갱신한다.
+    그 사이 삭제된 QuizSet / Question 이나 이미 저장된 idempotency_key 때문에 실패하면
+    Attempt 단위로 나눠 저장하고 실패한 것만 버린다.
+    """
+    if not entries:
+        return
+    try:
+        with transaction.atomic():
+            _bulk_insert(entries)
+    except IntegrityError:
+        for entry in entries:
+            try:
+                with transaction.atomic():
+                    _bulk_insert([entry])
+            except IntegrityError:
+                logger.warning(
+                    'Dropped quiz attempt %s: duplicate idempotency key or referenced rows no longer exist.',
+                    entry[0].pk
+                )
+
+
+def _bulk_insert(entries):
+    answers = [answer for _, answers in entries for answer in answers]
+    # 롤백된 이전 시도에서 bulk_create 가 채운 pk 가 남아 있을 수 있으므로 비우고 새로 받는다
+    for answer in answers:
+        answer.pk = None
+    Attempt.objects.bulk_create([attempt for attempt, _ in entries])
+    AttemptAnswer.objects.bulk_create(answers)
+    apply_attempt_stats(entries)
+    apply_review_updates(entries)
+
+
+class AttemptBuffer:
+    """
+    채점 결과를 메모리에 모아 두었다가 백그라운드 스레드에서 한꺼번에 저장하는 write-behind 버퍼.
+    채점 응답은 저장을 기다리지 않는다. 프로세스 종료 시 atexit 으로 남은 기록을 flush 한다.
+    DB 가 잠시 응답하지 않는 등으로 저장에 실패하면 기록을 버퍼 앞쪽에 되돌려 다음 flush 에서 다시 시도하고,
+    MAX_RETRIES 번 연속 실패한 기록만 버린다.
+    """
+
+    def __init__(self):
+        self._pending = []
+        self._failures = 0 # 연속으로 실패한 flush 횟수
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._worker = None
+        self._worker_pid = None
+
+    def add(self, attempt, answers):
+        if not _config('ENABLED'):
+            write_attempts([(attempt, answers)])
+            return
+
+        with self._lock:
+            self._pending.append((attempt, answers))
+            pending = len(self._pending)
+        self._ensure_worker()
+
+        if pending >= _config('MAX_PENDING'):
+            # 백그라운드 flush 가 따라오지 못하는 경우 요청 스레드에서 직접 저장
+            self.flush()
+        elif pending >= _config('MAX_SIZE'):
+            self._wakeup.set()
+
+    def flush(self):
+        """쌓여 있는 기록을 모두 저장. 저장한 Attempt 수를 반환"""
+        with self._flush_lock:
+            with self._lock:
+                entries, self._pending = self._pending, []
+            if not entries:
+                return 0
+            try:
+                write_attempts(entries)
+            except Exception:
+                self._failures += 1
+                if self._failures > _config('MAX_RETRIES'):
+                    logger.exception(
+                        'Dropped %d quiz attempt(s) after %d failed flushes.', len(entries), self._failures
+                    )
+                    self._failures = 0
+                    return 0
+                logger.exception(
+                    'Failed to flush %d quiz attempt(s), will retry (%d/%d).',
+                    len(entries), self._failures, _config('MAX_RETRIES')
+                )
+                # 그 사이 들어온 기록보다 먼저 다시 시도하도록 앞쪽에 되돌린다
+                with self._lock:
+                    self._pending[:0] = entries
+                return 0
+            self._failures = 0
+            return len(entries)
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending)
+
+    def _ensure_worker(self):
+        # gunicorn 등에서 fork 된 경우 부모의 스레드는 넘어오지 않으므로 pid 로 확인
+        if self._worker is not None and self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker is not None and self._worker_pid == os.getpid():
+                return
+            self._worker_pid = os.getpid()
+            self._worker = threading.Thread(target=self._run, name='quiz-attempt-buffer', daemon=True)
+            self._worker.start()
+            atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(_config('FLUSH_INTERVAL'))
+            self._wakeup.clear()
+            self.flush()
+            # 백그라운드 스레드 전용 DB 커넥션이 오래 열려 있지 않도록 정리
+            connection.close_if_unusable_or_obsolete()
+
+
+attempt_buffer = AttemptBuffer()
+
+
+def record_attempt(quizset_id, user, answer_key, submitted_answers, results, total_questions, kind='quizset'):
+    """채점 결과를 버퍼에 넣고, 응답에 실을 attempt id 를 반환"""
+    attempt, answers = build_attempt(
+        quizset_id, user, answer_key, submitted_answers, results, total_questions, kind
+    )
+    attempt_buffer.add(attempt, answers)
+    return attempt.pk
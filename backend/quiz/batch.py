@@ -0,0 +1,139 @@
+from django.db.models import Prefetch
+
+from .attempts import build_attempt, write_attempts
+from .grading import get_answer_keys, grade_submission
+from .models import Attempt, AttemptAnswer
+
+
+def idempotency_scope(user_ref, user):
+    """idempotency_key 가 유일해야 하는 범위. user_ref 가 있으면 그 응시자, 없으면 요청한 계정"""
+    if user_ref:
+        return f'ref:{user_ref}'
+    if user is not None and user.is_authenticated:
+        return f'user:{user.pk}'
+    return ''
+
+
+def _stored_attempts(scoped_keys, queryset):
+    """(scope, key) 쌍으로 저장된 Attempt 를 쿼리 1회로 찾는다. 두 열의 IN 으로 좁힌 뒤 쌍이 맞는 것만 남긴다"""
+    attempts = queryset.filter(
+        idempotency_scope__in={scope for scope, _ in scoped_keys},
+        idempotency_key__in={key for _, key in scoped_keys},
+    )
+    return {
+        (attempt.idempotency_scope, attempt.idempotency_key): attempt
+        for attempt in attempts
+        if (attempt.idempotency_scope, attempt.idempotency_key) in scoped_keys
+    }
+
+
+def _existing_attempts(scoped_keys):
+    """이미 저장된 (scope, idempotency_key) 의 Attempt (답안은 저장 순서대로). 키가 없으면 쿼리하지 않는다"""
+    if not scoped_keys:
+        return {}
+    return _stored_attempts(
+        scoped_keys,
+        Attempt.objects.prefetch_related(Prefetch('answers', queryset=AttemptAnswer.objects.order_by('pk'))),
+    )
+
+
+def _replay(index, attempt, answer_key):
+    """저장된 Attempt 로 처음 채점했을 때와 같은 결과를 다시 만든다 (중복 제출 응답)"""
+    return {
+        "index": index,
+        "status": "duplicate",
+        "user_ref": attempt.user_ref,
+        "quizset_id": attempt.quiz_set_id,
+        "attempt_id": attempt.pk,
+        "total_questions": attempt.total_questions,
+        "total_correct": attempt.total_correct,
+        "results": [
+            {
+                "question_id": answer.question_id,
+                "is_correct": answer.is_correct,
+                "correct_choice_ids": sorted(answer_key.get(answer.question_id, ())),
+            }
+            for answer in attempt.answers.all()
+        ],
+    }
+
+
+def grade_batch(submissions, user):
+    """
+    BatchSubmissionSerializer 로 검증된 (index, 제출) 목록을 채점해 index 순서대로 결과를 반환한다.
+
+    - 정답표: 참조된 모든 QuizSet 을 get_answer_keys 로 한 번에 (캐시 미스분만 쿼리 1회)
+    - 같은 응시자(idempotency_scope) 의 idempotency_key 가 이미 저장되어 있거나 같은 요청에서 앞서 나온 제출은
+      다시 기록하지 않고 처음 결과를 돌려준다
+    - 새 기록은 응답 전에 write_attempts 로 바로 저장한다 (재전송이 버퍼 flush 전에 와도 중복을 알아챌 수 있도록)
+    - user_ref 가 있으면 다른 사람의 답안(강의실 업로드 등)이므로 Attempt.user 를 비워 둔다
+    """
+    scoped = {
+        index: (idempotency_scope(submission['user_ref'], user), submission['idempotency_key'])
+        for index, submission in submissions if submission['idempotency_key']
+    }
+    existing = _existing_attempts(set(scoped.values()))
+    answer_keys = get_answer_keys(
+        {submission['quizset_id'] for _, submission in submissions}
+        | {attempt.quiz_set_id for attempt in existing.values()}
+    )
+
+    results = {}
+    entries = []
+    first_index = {}
+    repeats = []
+    for index, submission in submissions:
+        key = scoped.get(index)
+        if key in existing:
+            attempt = existing[key]
+            results[index] = _replay(index, attempt, answer_keys.get(attempt.quiz_set_id, {}))
+            continue
+        if key in first_index:
+            repeats.append((index, first_index[key]))
+            continue
+
+        answer_key = answer_keys.get(submission['quizset_id'])
+        if answer_key is None:
+            results[index] = {"index": index, "status": "error", "errors": {"quizset_id": ["QuizSet not found."]}}
+            continue
+
+        correct_count, graded = grade_submission(answer_key, submission['answers'])
+        attempt, answers = build_attempt(
+            submission['quizset_id'], None if submission['user_ref'] else user,
+            answer_key, submission['answers'], graded, len(answer_key),
+            user_ref=submission['user_ref'],
+            idempotency_scope=key[0] if key else '', idempotency_key=key[1] if key else None,
+        )
+        entries.append((attempt, answers))
+        if key:
+            first_index[key] = index
+        results[index] = {
+            "index": index,
+            "status": "graded",
+            "user_ref": submission['user_ref'],
+            "quizset_id": submission['quizset_id'],
+            "attempt_id": attempt.pk,
+            "total_questions": len(answer_key),
+            "total_correct": correct_count,
+            "results": graded,
+        }
+
+    write_attempts(entries)
+
+    # 조회 이후 다른 요청(동시 재전송)이 같은 key 를 먼저 저장했다면 그쪽 Attempt 가 기준이다
+    if first_index:
+        stored = _stored_attempts(set(first_index), Attempt.objects.only('id', 'idempotency_scope', 'idempotency_key'))
+        for key, index in first_index.items():
+            attempt_id = stored[key].pk if key in stored else None
+            if attempt_id is None:
+                results[index] = {"index": index, "status": "error", "errors": {"detail": ["Could not be recorded."]}}
+            elif attempt_id != results[index]["attempt_id"]:
+                results[index] = {**results[index], "status": "duplicate", "attempt_id": attempt_id}
+
+    for index, first in repeats:
+        result = {**results[first], "index": index}
+        if result["status"] != "error":
+            result["status"] = "duplicate"
+        results[index] = result
+
+    return [results[index] for index in sorted(results)]
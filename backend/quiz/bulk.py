@@ -0,0 +1,87 @@
+from django.db import connection, transaction
+
+from .models import Question, Choice
+from .content import quizset_content_changed
+from .serializers import build_choices
+
+BATCH_SIZE = 500
+
+
+def bulk_create_questions(quizset_id, items, batch_size=BATCH_SIZE):
+    """
+    검증이 끝난 문제 목록을 하나의 트랜잭션 안에서 Question / Choice 각각 bulk_create로 저장.
+
+    items 예시:
+    [
+      {
+        "question_text": "...",
+        "explanation": "...",
+        "difficulty_level": "...",
+        "choices": [ { "text": "...", "is_correct": true }, ... ]
+      }
+    ]
+
+    choice 의 order 는 QuestionSerializer.create 와 동일하게 build_choices 로 1부터 매긴다.
+    저장된 Question 리스트(items 순서 유지)를 반환한다.
+    """
+    if not items:
+        return []
+
+    with transaction.atomic():
+        questions = [
+            Question(
+                quiz_set_id=quizset_id,
+                question_text=item['question_text'],
+                explanation=item.get('explanation', ''),
+                difficulty_level=item.get('difficulty_level', ''),
+            )
+            for item in items
+        ]
+        _bulk_create_with_pks(questions, batch_size)
+
+        choices = [
+            choice
+            for question, item in zip(questions, items)
+            for choice in build_choices(question, item['choices'])
+        ]
+        Choice.objects.bulk_create(choices, batch_size=batch_size)
+
+        transaction.on_commit(lambda: quizset_content_changed(quizset_id))
+    return questions
+
+
+def _bulk_create_with_pks(questions, batch_size):
+    """
+    PostgreSQL / SQLite / MariaDB 는 bulk_create 가 INSERT ... RETURNING 으로 PK를 채워주지만 MySQL 은 그렇지 않다.
+    MySQL 은 innodb_autoinc_lock_mode 가 0 / 1 이면 multi-row INSERT 한 번의 auto-increment 값이 연속이므로
+    batch 마다 INSERT 한 뒤 LAST_INSERT_ID()(batch 첫 행의 PK) 부터 auto_increment_increment 간격으로 PK를 매긴다.
+    연속이 보장되지 않는 설정(2, interleaved) 이거나 다른 DB 면 한 행씩 INSERT 한다.
+    """
+    if connection.features.can_return_rows_from_bulk_insert:
+        Question.objects.bulk_create(questions, batch_size=batch_size)
+        return
+
+    step = _contiguous_autoinc_step()
+    if step is None:
+        for question in questions:
+            question.save(force_insert=True)
+        return
+
+    for start in range(0, len(questions), batch_size):
+        batch = questions[start:start + batch_size]
+        Question.objects.bulk_create(batch, batch_size=len(batch))
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT LAST_INSERT_ID()')
+            first_pk = cursor.fetchone()[0]
+        for offset, question in enumerate(batch):
+            question.pk = first_pk + offset * step
+
+
+def _contiguous_autoinc_step():
+    """multi-row INSERT 의 PK 가 연속으로 매겨지는 MySQL 이면 PK 간격(auto_increment_increment), 아니면 None"""
+    if connection.vendor != 'mysql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT @@innodb_autoinc_lock_mode, @@auto_increment_increment')
+        lock_mode, increment = cursor.fetchone()
+    return int(increment) if int(lock_mode) <= 1 else None
@@ -0,0 +1,131 @@
+import gzip
+import re
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+
+try:
+    import brotli
+except ImportError:  # brotli 가 없으면 gzip 만 사용
+    brotli = None
+
+DEFAULTS = {
+    'MIN_SIZE': 1024,
+    'GZIP_LEVEL': 5,
+    'BROTLI_QUALITY': 4,
+    'CONTENT_TYPES': ('application/json', 'application/x-ndjson', 'text/'),
+}
+
+_accept_encoding_re = re.compile(r'^\s*([^\s;]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?\s*$')
+
+
+def _config(name):
+    return getattr(settings, 'QUIZ_COMPRESSION', {}).get(name, DEFAULTS[name])
+
+
+def accepted_encodings(header):
+    """Accept-Encoding 헤더를 {encoding: q} 로. q=0 인 항목은 제외"""
+    encodings = {}
+    for item in header.split(','):
+        match = _accept_encoding_re.match(item)
+        if not match:
+            continue
+        try:
+            quality = float(match.group(2)) if match.group(2) else 1.0
+        except ValueError:
+            continue
+        if quality > 0:
+            encodings[match.group(1).lower()] = quality
+    return encodings
+
+
+def choose_encoding(header):
+    """클라이언트가 받을 수 있는 인코딩 중 q 값이 가장 높은 것 (같으면 br 우선). 없으면 None"""
+    encodings = accepted_encodings(header or '')
+    candidates = ['br', 'gzip'] if brotli is not None else ['gzip']
+    best = None
+    for encoding in candidates:
+        quality = encodings.get(encoding, encodings.get('*', 0))
+        if quality > 0 and (best is None or quality > best[1]):
+            best = (encoding, quality)
+    return best and best[0]
+
+
+def encoded_etag(etag, encoding):
+    """
+    압축한 표현의 ETag. identity 표현과 같은 값을 쓰면 캐시가 재검증 때 두 표현을 섞을 수 있으므로
+    인코딩을 붙이고, Django GZipMiddleware 와 같이 weak ETag 로 바꾼다 ("v3" -> W/"v3-gzip")
+    """
+    return f'W/{etag.removeprefix("W/")[:-1]}-{encoding}"'
+
+
+def decoded_etag(etag):
+    """encoded_etag 의 역변환 (W/"v3-gzip" -> "v3"). 압축 표현의 ETag 가 아니면 그대로"""
+    for encoding in ('br', 'gzip'):
+        suffix = f'-{encoding}"'
+        if etag.endswith(suffix):
+            return etag.removeprefix('W/')[:-len(suffix)] + '"'
+    return etag
+
+
+def compress(content, encoding):
+    if encoding == 'br':
+        return brotli.compress(content, quality=_config('BROTLI_QUALITY'))
+    return gzip.compress(content, compresslevel=_config('GZIP_LEVEL'), mtime=0)
+
+
+class CompressionMiddleware:
+    """
+    MIN_SIZE 이상인 JSON / 텍스트 응답을 Accept-Encoding 에 따라 brotli 또는 gzip 으로 압축한다.
+
+    스트리밍 응답(NDJSON export 는 자체 gzip 옵션이 있다)과 이미 인코딩된 응답은 건드리지 않는다.
+    압축하면 본문이 달라지므로 ETag 를 인코딩별 값(encoded_etag) 으로 바꾸고, 304 응답에는 클라이언트가
+    보낸 인코딩별 ETag 를 돌려준다. 압축 여부가 Accept-Encoding 에 따라 달라지므로 Vary: Accept-Encoding 을 붙인다.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        if response.status_code == 304:
+            return self._not_modified(request, response)
+        content_type = response.get('Content-Type', '')
+        if not any(content_type.startswith(prefix) for prefix in _config('CONTENT_TYPES')):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if len(response.content) < _config('MIN_SIZE'):
+            return response
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING'))
+        if encoding is None:
+            return response
+
+        compressed = compress(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        etag = response.get('ETag')
+        if etag:
+            response['ETag'] = encoded_etag(etag, encoding)
+        return response
+
+    def _not_modified(self, request, response):
+        # 304 에는 본문이 없으므로 압축하지 않고, 클라이언트가 가진 표현이 압축본이면 그 ETag 로 응답한다
+        etag = response.get('ETag')
+        if not etag:
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING'))
+        if encoding is not None:
+            candidate = encoded_etag(etag, encoding)
+            if candidate in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+                response['ETag'] = candidate
+        return response
@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from .daily import invalidate_daily_cache
+from .grading import invalidate_answer_key
+from .models import QuizSet
+from .sampling import invalidate_sampling_index
+from .snapshots import rebuild_snapshot
+
+
+def count_cache():
+    return caches[getattr(settings, 'QUIZ_COUNT_CACHE_ALIAS', 'default')]
+
+
+def question_count_key(quizset_id=None):
+    return f'quiz:question-count:{quizset_id or "all"}'
+
+
+QUIZSET_COUNT_KEY = 'quiz:quizset-count'
+
+
+def quizset_content_changed(quizset_id, categories=None):
+    """
+    QuizSet 에 속한 Question / Choice 가 생성·수정·삭제되었을 때 호출.
+    해당 QuizSet 기준으로 만들어 둔 파생 데이터(정답표, 문제 수 / 오늘의 문제 캐시, 무작위 추출 인덱스)를 무효화하고
+    커밋 이후 문제 목록 스냅샷을 다시 만든다.
+    무작위 추출 인덱스는 categories(없으면 QuizSet 의 현재 카테고리를 조회) 만 무효화하며, QuizSet 이 없으면 전체를 무효화한다.
+    """
+    invalidate_answer_key(quizset_id)
+    count_cache().delete_many([question_count_key(quizset_id), question_count_key()])
+    invalidate_daily_cache()
+    if categories is None:
+        category = QuizSet.objects.filter(pk=quizset_id).values_list('category', flat=True).first()
+        categories = [category] if category is not None else [None]
+    for category in categories:
+        invalidate_sampling_index(category)
+    transaction.on_commit(lambda: rebuild_snapshot(quizset_id))
+
+
+def quizset_catalog_changed():
+    """QuizSet 자체가 생성·삭제되었을 때 호출"""
+    count_cache().delete(QUIZSET_COUNT_KEY)
@@ -0,0 +1,109 @@
+import hashlib
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import IntegrityError
+from django.utils import timezone
+
+from .models import CATEGORY_CHOICES, DailyQuestion, Question
+
+CATEGORIES = [code for code, _ in CATEGORY_CHOICES]
+
+# 캐시된 payload 의 최대 유효 시간(초). 기본 cache(LocMemCache) 는 워커마다 따로 있어서
+# 한 워커의 invalidate_daily_cache 가 다른 워커에 닿지 않으므로, 수정 / 삭제된 문제가 이 시간 안에 반영되도록 한다.
+# QUIZ_DAILY_CACHE_ALIAS 가 여러 워커가 공유하는 cache(Redis 등) 면 늘려도 된다 (그래도 자정은 넘기지 않음)
+DEFAULT_CACHE_TIMEOUT = 60
+
+
+def daily_cache():
+    return caches[getattr(settings, 'QUIZ_DAILY_CACHE_ALIAS', 'default')]
+
+
+def daily_cache_timeout(now=None):
+    return min(seconds_until_tomorrow(now), getattr(settings, 'QUIZ_DAILY_CACHE_TIMEOUT', DEFAULT_CACHE_TIMEOUT))
+
+
+def daily_cache_key(date, category):
+    return f'quiz:daily:{date.isoformat()}:{category}'
+
+
+def pick_question_id(date, category):
+    """
+    (날짜, 카테고리) 로 정해지는 결정적 선택. 같은 날 몇 번을 계산해도, 어느 워커에서 계산해도 같은 문제가 나온다.
+    카테고리에 문제가 없으면 None.
+    """
+    question_ids = list(
+        Question.objects.filter(quiz_set__category=category).order_by('pk').values_list('pk', flat=True)
+    )
+    if not question_ids:
+        return None
+    digest = hashlib.sha256(f'{date.isoformat()}:{category}'.encode('utf-8')).digest()
+    return question_ids[int.from_bytes(digest[:8], 'big') % len(question_ids)]
+
+
+def select_daily_question(date, category):
+    """
+    (date, category) 의 DailyQuestion 을 반환하고, 없으면 골라서 저장한다.
+    동시에 여러 요청이 처음 계산해도 (date, category) unique 제약이 잠금 역할을 하므로 한 행만 남는다.
+    """
+    daily = DailyQuestion.objects.filter(date=date, category=category).first()
+    if daily is not None:
+        return daily
+
+    question_id = pick_question_id(date, category)
+    if question_id is None:
+        return None
+    try:
+        return DailyQuestion.objects.create(date=date, category=category, question_id=question_id)
+    except IntegrityError:
+        return DailyQuestion.objects.get(date=date, category=category)
+
+
+def build_daily_payload(date, category):
+    # 순환 import 방지 (serializers -> content -> daily)
+    from .serializers import QuestionSerializer
+
+    daily = select_daily_question(date, category)
+    if daily is None:
+        return None
+    question = Question.objects.prefetch_related('choices').get(pk=daily.question_id)
+    return {
+        "date": date.isoformat(),
+        "category": category,
+        "question": QuestionSerializer(question).data,
+    }
+
+
+def seconds_until_tomorrow(now=None):
+    now = timezone.localtime(now)
+    tomorrow = datetime.combine(now.date() + timedelta(days=1), time.min, tzinfo=now.tzinfo)
+    return max(int((tomorrow - now).total_seconds()), 1)
+
+
+def get_daily_payload(category, date=None):
+    """
+    오늘(로컬 날짜)의 문제 payload. 캐시에 있으면 쿼리 없이 반환하고,
+    없으면 DailyQuestion 으로부터 다시 만들어 daily_cache_timeout 동안 (자정을 넘기지 않게) 캐시한다.
+    카테고리에 문제가 없으면 None.
+    """
+    date = date or timezone.localdate()
+    key = daily_cache_key(date, category)
+    cache = daily_cache()
+
+    payload = cache.get(key)
+    if payload is None:
+        payload = build_daily_payload(date, category)
+        if payload is None:
+            return None
+        cache.set(key, payload, daily_cache_timeout())
+    return payload
+
+
+def invalidate_daily_cache(date=None):
+    """
+    문제가 바뀌었을 때 오늘 캐시를 비워, 다음 요청에서 DailyQuestion 으로부터 다시 만들게 한다.
+    cache 가 워커마다 따로 있으면 이 워커만 비워지고, 다른 워커는 daily_cache_timeout 안에 다시 만든다.
+    """
+    date = date or timezone.localdate()
+    daily_cache().delete_many([daily_cache_key(date, category) for category in CATEGORIES])
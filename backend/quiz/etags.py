@@ -0,0 +1,83 @@
+import hashlib
+
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from .compression import decoded_etag
+from .models import QuizSet
+
+
+def quizset_versions(quizset_id):
+    """
+    (QuizSet.updated_at, 스냅샷 version) 을 쿼리 1회로 조회.
+    QuizSet 이 없으면 None, 스냅샷이 아직 없으면 version 은 None.
+    """
+    try:
+        return QuizSet.objects.filter(pk=quizset_id).values_list('updated_at', 'snapshot__version').first()
+    except ValueError:
+        return None
+
+
+def renderer_variant(request):
+    """
+    협상된 렌더러의 표현 구분자. 기본(JSON) 이 아닌 렌더러(브라우저블 API 등) 나
+    ?indent= 같은 미디어 타입 파라미터는 본문을 바꾸므로 ETag 를 구분해야 한다. 기본이면 None
+    """
+    media_type = request.accepted_media_type or ''
+    if request.accepted_renderer.format == 'json' and ';' not in media_type:
+        return None
+    return f'r={request.accepted_renderer.format}:{media_type}'
+
+
+def _variant_suffix(variant):
+    # 쿼리 파라미터 값을 그대로 넣으면 따옴표 등 ETag 에 쓸 수 없는 문자가 들어올 수 있으므로 해시해서 붙인다
+    return f'-{hashlib.sha256(variant.encode("utf-8")).hexdigest()[:16]}' if variant else ''
+
+
+def quizset_etag(quizset_id, versions=None, variant=None):
+    """QuizSet 메타데이터(retrieve) 용 strong ETag. variant 는 renderer_variant 결과"""
+    versions = versions or quizset_versions(quizset_id)
+    if versions is None:
+        return None
+    updated_at, _ = versions
+    return quote_etag(f'qs{quizset_id}-{updated_at.timestamp():.6f}{_variant_suffix(variant)}')
+
+
+def question_list_etag(quizset_id, versions=None, variant=None):
+    """
+    QuizSet 문제 목록 용 strong ETag. 문제 / 선택지가 바뀌면 스냅샷 version 이 올라간다.
+    variant 는 ?mode=play / ?fields= / 페이지 / 렌더러 등 표현 구분자로, 표현마다 다른 ETag 가 되도록 붙인다.
+    """
+    versions = versions or quizset_versions(quizset_id)
+    if versions is None or versions[1] is None:
+        return None
+    updated_at, version = versions
+    return quote_etag(f'qs{quizset_id}-{updated_at.timestamp():.6f}-v{version}{_variant_suffix(variant)}')
+
+
+def not_modified(request, etag):
+    """If-None-Match 가 etag 와 일치하면 304 응답, 아니면 None"""
+    if etag is None:
+        return None
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if not if_none_match:
+        return None
+    # If-None-Match 는 weak 비교. CompressionMiddleware 가 압축 응답에 붙인 인코딩도 떼고 비교한다
+    etags = [decoded_etag(value).removeprefix('W/') for value in parse_etags(if_none_match)]
+    if '*' not in etags and etag not in etags:
+        return None
+    return with_etag(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+
+
+def with_etag(response, etag):
+    """
+    ETag 를 달고, 프록시(nginx 등)가 저장하더라도 매번 ETag 로 재검증하도록 한다.
+    렌더러가 Accept 헤더로 정해지므로 프록시가 표현을 섞지 않도록 Vary: Accept 도 붙인다.
+    """
+    if etag is not None and response.status_code in (200, 304):
+        response['ETag'] = etag
+        patch_cache_control(response, public=True, no_cache=True)
+        patch_vary_headers(response, ('Accept',))
+    return response
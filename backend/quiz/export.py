@@ -0,0 +1,86 @@
+import json
+import zlib
+from itertools import islice
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Choice, Question
+
+# 한 번에 내보내는 바이트 단위 (StreamingHttpResponse / 파일 write 횟수를 줄인다)
+WRITE_BUFFER_SIZE = 64 * 1024
+
+
+def export_record(question, choices):
+    """Question 1개를 부모 QuizSet 메타데이터, 선택지와 함께 NDJSON 레코드(dict) 로"""
+    quiz_set = question.quiz_set
+    return {
+        "quiz_set": {
+            "id": quiz_set.id,
+            "title": quiz_set.title,
+            "description": quiz_set.description,
+            "category": quiz_set.category,
+            "created_at": quiz_set.created_at,
+            "updated_at": quiz_set.updated_at,
+        },
+        "id": question.id,
+        "question_text": question.question_text,
+        "explanation": question.explanation,
+        "difficulty_level": question.difficulty_level,
+        "created_at": question.created_at,
+        "updated_at": question.updated_at,
+        "choices": choices,
+    }
+
+
+def iter_export_records(quizset_ids=None, chunk_size=500):
+    """
+    pk 순서로 Question 을 chunk_size 개씩 읽어 레코드를 하나씩 내보낸다.
+    Question(+QuizSet JOIN) 은 서버 측 커서 1개로 읽고, chunk 마다 Choice 를 한 번에 가져온다.
+    prefetch_related 는 인스턴스 사이에 순환 참조를 남겨 GC 전까지 지난 chunk 가 해제되지 않으므로
+    선택지는 values() 로 직접 묶는다. 메모리에는 한 chunk 만 올라간다.
+    """
+    questions = Question.objects.select_related('quiz_set').order_by('pk')
+    if quizset_ids:
+        questions = questions.filter(quiz_set_id__in=quizset_ids)
+
+    iterator = questions.iterator(chunk_size=chunk_size)
+    while chunk := list(islice(iterator, chunk_size)):
+        choices = {}
+        rows = (
+            Choice.objects.filter(question_id__in=[question.pk for question in chunk])
+            .order_by('question_id', 'order')
+            .values('question_id', 'id', 'text', 'order', 'is_correct')
+        )
+        for row in rows:
+            choices.setdefault(row.pop('question_id'), []).append(row)
+        for question in chunk:
+            yield export_record(question, choices.get(question.pk, []))
+
+
+def iter_ndjson(records):
+    """레코드마다 한 줄짜리 UTF-8 JSON 을 WRITE_BUFFER_SIZE 단위로 묶어서 내보낸다"""
+    buffer = bytearray()
+    for record in records:
+        buffer += json.dumps(record, ensure_ascii=False, cls=DjangoJSONEncoder).encode('utf-8')
+        buffer += b'\n'
+        if len(buffer) >= WRITE_BUFFER_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+def iter_gzip(chunks, level=6):
+    """바이트 chunk 스트림을 gzip 형식으로 바로 압축 (전체를 모으지 않는다)"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def stream_export(quizset_ids=None, chunk_size=500, compress=False):
+    """NDJSON export 바이트 스트림. compress=True 면 gzip"""
+    chunks = iter_ndjson(iter_export_records(quizset_ids, chunk_size))
+    return iter_gzip(chunks) if compress else chunks
@@ -0,0 +1,211 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import QuizSet
+
+# settings.QUIZ_ANSWER_KEY_CACHE 로 덮어쓸 수 있는 기본값
+#  - MAX_ENTRIES : 프로세스 로컬 LRU에 보관할 QuizSet 수
+#  - LOCAL_TTL   : 로컬 LRU 항목 유효 시간(초). 다른 워커에서 발생한 무효화를 이 시간 안에 따라잡음
+#  - CACHE_ALIAS : 워커 간 공유할 Django cache alias (None이면 로컬 LRU만 사용)
+#  - TIMEOUT     : 공유 캐시 항목 유효 시간(초)
+DEFAULTS = {
+    'MAX_ENTRIES': 256,
+    'LOCAL_TTL': 60,
+    'CACHE_ALIAS': None,
+    'TIMEOUT': 60 * 60,
+}
+
+
+def _config(name):
+    return getattr(settings, 'QUIZ_ANSWER_KEY_CACHE', {}).get(name, DEFAULTS[name])
+
+
+def _shared_key(quizset_id):
+    return f'quiz:answer-key:{quizset_id}'
+
+
+class AnswerKeyCache:
+    """
+    QuizSet 단위 정답표(question_id -> frozenset(정답 choice_id)) 캐시.
+
+    프로세스 로컬 LRU를 먼저 보고, 없으면 (설정된 경우) Django cache backend,
+    그래도 없으면 DB에서 쿼리 한 번으로 정답표를 만들어 두 계층에 채워 넣는다.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _shared_cache(self):
+        alias = _config('CACHE_ALIAS')
+        return caches[alias] if alias else None
+
+    def get(self, quizset_id):
+        """정답표를 반환. QuizSet이 없으면 QuizSet.DoesNotExist 발생"""
+        quizset_id = int(quizset_id)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(quizset_id)
+            if entry is not None:
+                answer_key, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(quizset_id)
+                    return answer_key
+                del self._entries[quizset_id]
+
+        shared = self._shared_cache()
+        answer_key = shared.get(_shared_key(quizset_id)) if shared is not None else None
+        if answer_key is None:
+            answer_key = build_answer_key(quizset_id)
+            if shared is not None:
+                shared.set(_shared_key(quizset_id), answer_key, _config('TIMEOUT'))
+
+        self._store(quizset_id, answer_key, now)
+        return answer_key
+
+    def get_many(self, quizset_ids):
+        """
+        {quizset_id: 정답표}. 존재하지 않는 QuizSet 은 결과에서 빠진다.
+        캐시에 없는 QuizSet 들은 build_answer_keys 쿼리 한 번으로 만든다.
+        """
+        quizset_ids = {int(quizset_id) for quizset_id in quizset_ids}
+        now = time.monotonic()
+        answer_keys = {}
+
+        with self._lock:
+            for quizset_id in quizset_ids:
+                entry = self._entries.get(quizset_id)
+                if entry is None:
+                    continue
+                answer_key, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(quizset_id)
+                    answer_keys[quizset_id] = answer_key
+                else:
+                    del self._entries[quizset_id]
+
+        missing = quizset_ids - answer_keys.keys()
+        shared = self._shared_cache()
+        if missing and shared is not None:
+            cached = shared.get_many([_shared_key(quizset_id) for quizset_id in missing])
+            for quizset_id in list(missing):
+                answer_key = cached.get(_shared_key(quizset_id))
+                if answer_key is not None:
+                    answer_keys[quizset_id] = answer_key
+                    missing.discard(quizset_id)
+                    self._store(quizset_id, answer_key, now)
+
+        if missing:
+            built = build_answer_keys(missing)
+            if shared is not None and built:
+                shared.set_many(
+                    {_shared_key(quizset_id): answer_key for quizset_id, answer_key in built.items()},
+                    _config('TIMEOUT')
+                )
+            for quizset_id, answer_key in built.items():
+                answer_keys[quizset_id] = answer_key
+                self._store(quizset_id, answer_key, now)
+        return answer_keys
+
+    def _store(self, quizset_id, answer_key, now):
+        with self._lock:
+            self._entries[quizset_id] = (answer_key, now + _config('LOCAL_TTL'))
+            self._entries.move_to_end(quizset_id)
+            while len(self._entries) > _config('MAX_ENTRIES'):
+                self._entries.popitem(last=False)
+
+    def invalidate(self, quizset_id):
+        quizset_id = int(quizset_id)
+        with self._lock:
+            self._entries.pop(quizset_id, None)
+        shared = self._shared_cache()
+        if shared is not None:
+            shared.delete(_shared_key(quizset_id))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def build_answer_keys(quizset_ids):
+    """
+    QuizSet -> Question -> Choice 를 LEFT JOIN 한 쿼리 한 번으로 여러 QuizSet 의 정답표를 만든다.
+    선택지가 없는 문제도 빈 frozenset 으로, 문제가 없는 QuizSet 은 빈 정답표로 포함되고,
+    존재하지 않는 QuizSet 은 결과에서 빠진다.
+    """
+    rows = QuizSet.objects.filter(pk__in=quizset_ids).values_list(
+        'id', 'questions__id', 'questions__choices__id', 'questions__choices__is_correct'
+    )
+
+    correct = {}
+    for quizset_id, question_id, choice_id, is_correct in rows:
+        by_question = correct.setdefault(quizset_id, {})
+        if question_id is None:
+            continue
+        ids = by_question.setdefault(question_id, set())
+        if is_correct:
+            ids.add(choice_id)
+
+    return {
+        quizset_id: {question_id: frozenset(ids) for question_id, ids in by_question.items()}
+        for quizset_id, by_question in correct.items()
+    }
+
+
+def build_answer_key(quizset_id):
+    """QuizSet 하나의 정답표 (쿼리 1회). QuizSet 이 없으면 QuizSet.DoesNotExist 발생"""
+    answer_keys = build_answer_keys([quizset_id])
+    if quizset_id not in answer_keys:
+        raise QuizSet.DoesNotExist(f'QuizSet {quizset_id} does not exist.')
+    return answer_keys[quizset_id]
+
+
+answer_key_cache = AnswerKeyCache()
+
+
+def get_answer_key(quizset_id):
+    return answer_key_cache.get(quizset_id)
+
+
+def get_answer_keys(quizset_ids):
+    return answer_key_cache.get_many(quizset_ids)
+
+
+def invalidate_answer_key(quizset_id):
+    answer_key_cache.invalidate(quizset_id)
+
+
+def grade_answer(answer_key, question_id, choice_ids):
+    """
+    제출 하나를 채점해 (is_correct, 정답 choice_id 정렬 리스트)를 반환.
+    QuizSet에 속하지 않은 question_id는 오답 + 빈 정답 리스트로 처리한다.
+    """
+    correct_choice_ids = answer_key.get(question_id)
+    if correct_choice_ids is None:
+        return False, []
+    return set(choice_ids) == correct_choice_ids, sorted(correct_choice_ids)
+
+
+def grade_submission(answer_key, answers):
+    """
+    submit_all 형식의 answers 리스트를 정답표만으로 채점 (추가 쿼리 없음).
+    (맞힌 개수, 문제별 결과 리스트)를 반환한다.
+    """
+    results = []
+    correct_count = 0
+    for answer in answers:
+        qid = answer.get('question_id')
+        is_correct, correct_choice_ids = grade_answer(answer_key, qid, answer.get('choice_ids', []))
+        if is_correct:
+            correct_count += 1
+        results.append({
+            "question_id": qid,
+            "is_correct": is_correct,
+            "correct_choice_ids": correct_choice_ids
+        })
+    return correct_count, results
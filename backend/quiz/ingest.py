@@ -0,0 +1,180 @@
+import json
+import os
+import random
+
+from django.conf import settings
+from django.db import transaction
+
+from .bulk import bulk_create_questions
+from .content import quizset_catalog_changed
+from .models import CATEGORY_CHOICES, IngestedFile, QuizSet
+
+# question_gen 의 TOPICS -> CATEGORY_CHOICES. 값이 None 인 주제는 건너뛴다 (settings.QUIZ_INGEST_TOPIC_CATEGORIES 로 변경)
+TOPIC_CATEGORIES = {
+    'OS': 'OS',
+    'Network': 'NET',
+    'DB': 'DB',
+    'Git': 'GIT',
+    'DevOps': 'GIT',
+    'Algorithm': None,
+}
+DEFAULT_QUIZSET_TITLE = '[generated] {category}'
+# 워터마크 앞쪽으로 다시 나열하는 manifest key 수 (settings.QUIZ_INGEST_LOOKBACK 로 변경)
+DEFAULT_LOOKBACK = 100
+
+
+class IngestError(ValueError):
+    """적재할 수 없는 문제 파일 (manifest 에 skipped 로 남긴다)"""
+
+
+class LocalSource:
+    """버킷 대신 쓰는 로컬 디렉터리. root 아래 경로가 S3 key 와 같다 (개발 / 테스트용)"""
+
+    def __init__(self, root, prefix=''):
+        self.root = os.path.abspath(root)
+        self.prefix = prefix
+        self.uri = f'file://{self.root}/{prefix}'
+
+    def list_keys(self, start_after=''):
+        directory, name_prefix = os.path.split(os.path.join(self.root, self.prefix))
+        if not os.path.isdir(directory):
+            return []
+        relative = os.path.relpath(directory, self.root)
+        keys = (
+            entry.name if relative == '.' else f'{relative}/{entry.name}'
+            for entry in os.scandir(directory)
+            if entry.is_file() and entry.name.startswith(name_prefix) and entry.name.endswith('.json')
+        )
+        return sorted(key for key in keys if key > start_after)
+
+    def read(self, key):
+        with open(os.path.join(self.root, key), 'rb') as fp:
+            return fp.read()
+
+
+class S3Source:
+    """S3 (또는 S3 호환 스토리지) prefix. boto3 가 필요하다"""
+
+    def __init__(self, bucket, prefix='', endpoint_url=None):
+        try:
+            import boto3
+        except ImportError as exc:
+            raise ImportError('boto3 is required to ingest from S3.') from exc
+        self.client = boto3.client('s3', endpoint_url=endpoint_url)
+        self.bucket = bucket
+        self.prefix = prefix
+        self.uri = f's3://{bucket}/{prefix}'
+
+    def list_keys(self, start_after=''):
+        # key 가 q-<timestamp>.json 이라 사전순이 생성 순서와 같으므로 StartAfter 이후만 나열한다
+        params = {'Bucket': self.bucket, 'Prefix': self.prefix}
+        if start_after:
+            params['StartAfter'] = start_after
+        keys = []
+        for page in self.client.get_paginator('list_objects_v2').paginate(**params):
+            keys.extend(obj['Key'] for obj in page.get('Contents', []) if obj['Key'].endswith('.json'))
+        return keys
+
+    def read(self, key):
+        return self.client.get_object(Bucket=self.bucket, Key=key)['Body'].read()
+
+
+def lookback():
+    return getattr(settings, 'QUIZ_INGEST_LOOKBACK', DEFAULT_LOOKBACK)
+
+
+def topic_categories():
+    return getattr(settings, 'QUIZ_INGEST_TOPIC_CATEGORIES', TOPIC_CATEGORIES)
+
+
+def parse_generated(key, raw):
+    """
+    생성기 JSON ({topic, question, answer, selections}) 을 (category, bulk_create_questions item) 으로 변환.
+    생성기는 정답을 항상 첫 선택지에 두므로 key 로 seed 한 셔플로 순서를 섞는다 (다시 적재해도 같은 순서).
+    """
+    try:
+        data = json.loads(raw)
+    except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+        raise IngestError(f'Invalid JSON: {exc}')
+    if not isinstance(data, dict):
+        raise IngestError('Expected a JSON object.')
+
+    topic = data.get('topic')
+    mapping = topic_categories()
+    category = mapping.get(topic) if topic in mapping else (topic if topic in dict(CATEGORY_CHOICES) else None)
+    if category is None:
+        raise IngestError(f'Unmapped topic: {topic!r}')
+
+    question_text = data.get('question')
+    answer = data.get('answer')
+    selections = data.get('selections')
+    if not isinstance(question_text, str) or not isinstance(answer, str):
+        raise IngestError("'question' and 'answer' must be strings.")
+    question_text, answer = question_text.strip(), answer.strip()
+    if not question_text or not answer or not isinstance(selections, list) or len(selections) < 2:
+        raise IngestError("'question', 'answer' and at least two 'selections' are required.")
+
+    selections = [str(selection).strip() for selection in selections]
+    if answer not in selections:
+        raise IngestError("'answer' does not match any selection.")
+
+    random.Random(key).shuffle(selections)
+    return category, {
+        'question_text': question_text,
+        'choices': [{'text': text, 'is_correct': text == answer} for text in selections],
+    }
+
+
+def _quizset_for(category, title_template, quizsets):
+    if category not in quizsets:
+        quizset, created = QuizSet.objects.get_or_create(
+            title=title_template.format(category=category), category=category
+        )
+        if created:
+            quizset_catalog_changed()
+        quizsets[category] = quizset.pk
+    return quizsets[category]
+
+
+def ingest(source, batch_size=100, title_template=DEFAULT_QUIZSET_TITLE):
+    """
+    source(uri 에 prefix 포함) 에서 아직 적재하지 않은 문제 파일을 batch_size 개씩 하나의 트랜잭션으로 적재하고
+    {'ingested': n, 'skipped': n} 를 반환한다.
+    문제는 카테고리별 QuizSet(title_template) 에 bulk_create_questions 로 넣고, manifest 도 같은 트랜잭션에 기록한다.
+    """
+    # manifest 의 가장 큰 key 에서 lookback 개 앞부터 나열한다. 동시 업로드가 key 순서와 다르게 끝나
+    # 워터마크보다 조금 작은 key 가 늦게 올라와도 읽고, 나열 / manifest 조회량은 새 파일 + lookback 으로 묶인다
+    window = lookback()
+    recent = list(
+        IngestedFile.objects.filter(source=source.uri).order_by('-key').values_list('key', flat=True)[:window + 1]
+    )
+    start_after = recent.pop() if len(recent) > window else ''
+    known = set(recent)
+    keys = [key for key in source.list_keys(start_after=start_after) if key not in known]
+
+    counts = {'ingested': 0, 'skipped': 0}
+    quizsets = {}
+    for start in range(0, len(keys), batch_size):
+        batch = keys[start:start + batch_size]
+        items_by_quizset = {}
+        manifest = []
+        for key in batch:
+            try:
+                category, item = parse_generated(key, source.read(key))
+            except IngestError as exc:
+                manifest.append(IngestedFile(source=source.uri, key=key, status='skipped', detail=str(exc)[:255]))
+                continue
+            entry = IngestedFile(source=source.uri, key=key, status='ingested')
+            manifest.append(entry)
+            items_by_quizset.setdefault(_quizset_for(category, title_template, quizsets), []).append((entry, item))
+
+        with transaction.atomic():
+            for quizset_id, pairs in items_by_quizset.items():
+                questions = bulk_create_questions(quizset_id, [item for _, item in pairs])
+                for (entry, _), question in zip(pairs, questions):
+                    entry.question = question
+            IngestedFile.objects.bulk_create(manifest)
+
+        for entry in manifest:
+            counts[entry.status] += 1
+    return counts
@@ -0,0 +1,195 @@
+import json
+import platform
+import random
+import statistics
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.utils import timezone
+
+from quiz.attempts import attempt_buffer
+from quiz.models import Choice, QuizSet
+
+
+class QueryCounter:
+    """connection.execute_wrapper 로 요청 하나의 SQL 실행 횟수를 센다"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def percentile(sorted_values, percent):
+    index = min(len(sorted_values) - 1, int(round(percent / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Command(BaseCommand):
+    help = (
+        'quiz API 주요 경로(QuizSet 목록, 문제 목록, submit, submit_all)의 처리량, p50 / p99 지연 시간, '
+        '쿼리 수를 측정해 JSON 으로 출력합니다. generate_quiz_dataset 으로 데이터를 먼저 만들어 두세요.'
+    )
+
+    scenarios = ['quizset_list', 'question_list', 'question_list_paginated', 'submit', 'submit_all']
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200, help='시나리오별 측정 요청 수 (기본 200)')
+        parser.add_argument('--warmup', type=int, default=20, help='시나리오별 워밍업 요청 수 (기본 20)')
+        parser.add_argument('--scenario', action='append', choices=self.scenarios, help='측정할 시나리오 (반복 지정 가능, 기본 전체)')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--accept-encoding', default='',
+            help="요청에 보낼 Accept-Encoding (예: 'gzip, br'). 기본은 압축 없이 측정"
+        )
+        parser.add_argument('--output', help='결과 JSON 을 저장할 파일 (생략 시 stdout)')
+        parser.add_argument('--baseline', help='비교할 이전 결과 JSON 파일')
+        parser.add_argument(
+            '--max-regression', type=float, default=0.2,
+            help='baseline 대비 허용하는 p50 증가 비율 (기본 0.2 = 20%%). 쿼리 수는 증가를 허용하지 않음'
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        fixtures = self._load_fixtures()
+        if not fixtures:
+            raise CommandError('No quiz sets with questions. Run generate_quiz_dataset first.')
+
+        client = Client(headers={'Accept-Encoding': options['accept_encoding']} if options['accept_encoding'] else None)
+        results = {}
+        for name in options['scenario'] or self.scenarios:
+            make_request = getattr(self, f'_request_{name}')
+            for _ in range(options['warmup']):
+                make_request(client, rng, fixtures)
+            results[name] = self._measure(client, rng, fixtures, make_request, options['iterations'])
+        attempt_buffer.flush()
+
+        report = {
+            'generated_at': timezone.now().isoformat(),
+            'environment': {
+                'python': platform.python_version(),
+                'database': connection.vendor,
+                'quizsets': len(fixtures),
+                'questions': sum(len(answers) for _, answers in fixtures),
+            },
+            'iterations': options['iterations'],
+            'accept_encoding': options['accept_encoding'],
+            'results': results,
+        }
+
+        rendered = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(rendered)
+        else:
+            self.stdout.write(rendered)
+
+        if options['baseline']:
+            self._check_regressions(report, options['baseline'], options['max_regression'])
+
+    def _load_fixtures(self):
+        """QuizSet 별 (id, 모든 문제에 정답을 고른 answers) 목록. 측정 전에 한 번만 조회"""
+        answers = {}
+        rows = (
+            Choice.objects.filter(is_correct=True)
+            .values_list('question__quiz_set_id', 'question_id', 'id')
+            .order_by('question__quiz_set_id', 'question_id')
+        )
+        for quizset_id, question_id, choice_id in rows:
+            by_question = answers.setdefault(quizset_id, {})
+            by_question.setdefault(question_id, []).append(choice_id)
+
+        existing = set(QuizSet.objects.filter(pk__in=answers.keys()).values_list('pk', flat=True))
+        return [
+            (quizset_id, [{'question_id': qid, 'choice_ids': ids} for qid, ids in by_question.items()])
+            for quizset_id, by_question in answers.items()
+            if quizset_id in existing
+        ]
+
+    def _measure(self, client, rng, fixtures, make_request, iterations):
+        latencies = []
+        query_counts = []
+        response_sizes = []
+        status_codes = Counter()
+
+        started = time.perf_counter()
+        for _ in range(iterations):
+            counter = QueryCounter()
+            with connection.execute_wrapper(counter):
+                request_started = time.perf_counter()
+                response = make_request(client, rng, fixtures)
+                latencies.append((time.perf_counter() - request_started) * 1000)
+            query_counts.append(counter.count)
+            response_sizes.append(len(response.content))
+            status_codes[response.status_code] += 1
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        return {
+            'requests': iterations,
+            'throughput_rps': iterations / elapsed if elapsed else None,
+            'latency_ms': {
+                'mean': statistics.fmean(latencies),
+                'p50': percentile(latencies, 50),
+                'p90': percentile(latencies, 90),
+                'p99': percentile(latencies, 99),
+                'max': latencies[-1],
+            },
+            'queries': {
+                'mean': statistics.fmean(query_counts),
+                'max': max(query_counts),
+            },
+            'response_bytes': statistics.fmean(response_sizes),
+            'status_codes': {str(code): count for code, count in status_codes.items()},
+        }
+
+    def _request_quizset_list(self, client, rng, fixtures):
+        return client.get('/api/quizsets/')
+
+    def _request_question_list(self, client, rng, fixtures):
+        quizset_id, _ = rng.choice(fixtures)
+        return client.get(f'/api/quizsets/{quizset_id}/questions/')
+
+    def _request_question_list_paginated(self, client, rng, fixtures):
+        quizset_id, _ = rng.choice(fixtures)
+        return client.get(f'/api/quizsets/{quizset_id}/questions/?page_size=10')
+
+    def _request_submit(self, client, rng, fixtures):
+        quizset_id, answers = rng.choice(fixtures)
+        answer = rng.choice(answers)
+        return client.post(
+            f"/api/quizsets/{quizset_id}/questions/{answer['question_id']}/submit/",
+            {'choice_ids': answer['choice_ids']}, content_type='application/json'
+        )
+
+    def _request_submit_all(self, client, rng, fixtures):
+        quizset_id, answers = rng.choice(fixtures)
+        return client.post(
+            f'/api/quizsets/{quizset_id}/submit_all/',
+            {'answers': answers}, content_type='application/json'
+        )
+
+    def _check_regressions(self, report, baseline_path, max_regression):
+        with open(baseline_path, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+        failures = []
+        for name, result in report['results'].items():
+            previous = baseline.get('results', {}).get(name)
+            if previous is None:
+                continue
+            p50, previous_p50 = result['latency_ms']['p50'], previous['latency_ms']['p50']
+            if p50 > previous_p50 * (1 + max_regression):
+                failures.append(f'{name}: p50 {previous_p50:.2f}ms -> {p50:.2f}ms')
+            queries, previous_queries = result['queries']['max'], previous['queries']['max']
+            if queries > previous_queries:
+                failures.append(f'{name}: max queries {previous_queries} -> {queries}')
+
+        if failures:
+            raise CommandError('Performance regression detected:\n  ' + '\n  '.join(failures))
+        self.stderr.write(self.style.SUCCESS('No regressions against baseline.'))
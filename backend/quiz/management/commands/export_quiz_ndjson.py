@@ -0,0 +1,40 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from quiz.export import stream_export
+
+
+class Command(BaseCommand):
+    help = '문제를 선택지 / QuizSet 메타데이터와 함께 한 줄에 하나씩 NDJSON 으로 내보냅니다 (백업 / 이전용).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', '-o', default='-',
+            help="저장할 파일 경로 (기본 '-' : 표준 출력)"
+        )
+        parser.add_argument('--gzip', action='store_true', help='gzip 으로 압축해서 저장')
+        parser.add_argument('--chunk-size', type=int, default=500, help='한 번에 읽는 문제 수 (기본 500)')
+        parser.add_argument(
+            '--quizset', type=int, action='append', dest='quizset_ids',
+            help='내보낼 QuizSet id (여러 번 지정 가능, 생략 시 전체)'
+        )
+
+    def handle(self, *args, **options):
+        chunks = stream_export(options['quizset_ids'], options['chunk_size'], compress=options['gzip'])
+
+        if options['output'] == '-':
+            self._write(sys.stdout.buffer, chunks)
+            sys.stdout.buffer.flush()
+            return
+
+        with open(options['output'], 'wb') as output:
+            written = self._write(output, chunks)
+        self.stderr.write(self.style.SUCCESS(f"Exported {written} byte(s) to {options['output']}."))
+
+    def _write(self, output, chunks):
+        written = 0
+        for chunk in chunks:
+            output.write(chunk)
+            written += len(chunk)
+        return written
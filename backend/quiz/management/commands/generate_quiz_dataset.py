@@ -0,0 +1,66 @@
+import random
+
+from django.core.management.base import BaseCommand
+
+from quiz.bulk import bulk_create_questions
+from quiz.models import CATEGORY_CHOICES, QuizSet
+
+DIFFICULTY_LEVELS = ['easy', 'medium', 'hard']
+
+
+class Command(BaseCommand):
+    help = '벤치마크 / 부하 테스트용 합성 QuizSet, Question, Choice 데이터를 생성합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--quizsets', type=int, default=50, help='생성할 QuizSet 수 (기본 50)')
+        parser.add_argument('--questions', type=int, default=30, help='QuizSet 당 문제 수 (기본 30)')
+        parser.add_argument('--choices', type=int, default=4, help='문제 당 선택지 수 (기본 4)')
+        parser.add_argument('--text-length', type=int, default=400, help='문제 / 해설 본문 길이 (기본 400자)')
+        parser.add_argument('--seed', type=int, default=0, help='난수 seed (같은 seed 면 같은 데이터)')
+        parser.add_argument('--clear', action='store_true', help='생성 전에 기존 QuizSet 을 모두 삭제')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        if options['clear']:
+            QuizSet.objects.all().delete()
+
+        categories = [code for code, _ in CATEGORY_CHOICES]
+        for index in range(options['quizsets']):
+            category = categories[index % len(categories)]
+            quizset = QuizSet.objects.create(
+                title=f'[synthetic] {category} #{index + 1}',
+                description=self._text(rng, options['text_length'] // 4),
+                category=category,
+            )
+            bulk_create_questions(quizset.pk, [
+                self._question(rng, options['choices'], options['text_length'])
+                for _ in range(options['questions'])
+            ])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {options['quizsets']} quiz set(s) x {options['questions']} question(s) "
+            f"x {options['choices']} choice(s)."
+        ))
+
+    def _question(self, rng, choice_count, text_length):
+        correct = rng.randrange(choice_count)
+        return {
+            'question_text': self._text(rng, text_length),
+            'explanation': self._text(rng, text_length),
+            'difficulty_level': rng.choice(DIFFICULTY_LEVELS),
+            'choices': [
+                {'text': self._text(rng, text_length // 2), 'is_correct': idx == correct}
+                for idx in range(choice_count)
+            ],
+        }
+
+    def _text(self, rng, length):
+        # 실제 문제처럼 한글 / 영문 / markdown 이 섞인 본문
+        words = ['프로세스', '스레드', 'TCP', '인덱스', '트랜잭션', 'commit', '`SELECT`', '**캐시**', 'DNS', '컨테이너']
+        text = []
+        size = 0
+        while size < length:
+            word = rng.choice(words)
+            text.append(word)
+            size += len(word) + 1
+        return ' '.join(text)[:length]
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from quiz.ingest import DEFAULT_QUIZSET_TITLE, LocalSource, S3Source, ingest
+
+
+class Command(BaseCommand):
+    help = 'question_gen 이 S3 (또는 로컬 디렉터리) 에 저장한 문제 JSON 파일 중 새 파일만 Question / Choice 로 적재합니다.'
+
+    def add_arguments(self, parser):
+        source = parser.add_mutually_exclusive_group(required=True)
+        source.add_argument('--bucket', help='S3 버킷 이름')
+        source.add_argument('--dir', help='버킷 대신 사용할 로컬 디렉터리 (버킷 루트에 해당)')
+        parser.add_argument('--prefix', default='cs-question/', help="문제 파일 key prefix (기본 'cs-question/')")
+        parser.add_argument('--endpoint-url', help='S3 호환 스토리지 endpoint (MinIO 등)')
+        parser.add_argument('--batch-size', type=int, default=100, help='트랜잭션 하나에 적재할 파일 수 (기본 100)')
+        parser.add_argument(
+            '--quizset-title', default=DEFAULT_QUIZSET_TITLE,
+            help="문제를 넣을 카테고리별 QuizSet 제목 (기본 '[generated] {category}')"
+        )
+
+    def handle(self, *args, **options):
+        if options['dir']:
+            source = LocalSource(options['dir'], options['prefix'])
+        else:
+            try:
+                source = S3Source(options['bucket'], options['prefix'], options['endpoint_url'])
+            except ImportError as exc:
+                raise CommandError(str(exc))
+
+        counts = ingest(source, batch_size=options['batch_size'], title_template=options['quizset_title'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Ingested {counts['ingested']} question(s), skipped {counts['skipped']} file(s) from {source.uri}."
+        ))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from quiz.models import QuizSet
+from quiz.snapshots import rebuild_snapshot
+
+
+class Command(BaseCommand):
+    help = 'QuizSet 별 문제 목록 JSON 스냅샷을 다시 만듭니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'quizset_ids', nargs='*', type=int,
+            help='다시 만들 QuizSet id 목록 (생략 시 전체)'
+        )
+
+    def handle(self, *args, **options):
+        quizset_ids = options['quizset_ids'] or list(QuizSet.objects.order_by('pk').values_list('pk', flat=True))
+
+        rebuilt = 0
+        for quizset_id in quizset_ids:
+            if rebuild_snapshot(quizset_id) is None:
+                self.stderr.write(f'QuizSet {quizset_id} not found. Skipped.')
+                continue
+            rebuilt += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rebuilt} snapshot(s).'))
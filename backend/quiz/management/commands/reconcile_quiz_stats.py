@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from quiz.stats import RECONCILE_CHUNK_SIZE, rebuild_question_stats, rebuild_quizset_stats
+
+
+class Command(BaseCommand):
+    help = '채점 기록(Attempt / AttemptAnswer) 원본으로 문제 / QuizSet 통계 카운터를 다시 계산합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=RECONCILE_CHUNK_SIZE,
+            help=f'한 번에 처리할 Question / QuizSet 수 (기본 {RECONCILE_CHUNK_SIZE})'
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        questions = rebuild_question_stats(chunk_size)
+        quizsets = rebuild_quizset_stats(chunk_size)
+        self.stdout.write(self.style.SUCCESS(
+            f'Reconciled stats of {questions} question(s) and {quizsets} quiz set(s).'
+        ))
@@ -0,0 +1,27 @@
+from datetime import date as date_cls
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from quiz.daily import CATEGORIES, get_daily_payload
+
+
+class Command(BaseCommand):
+    help = "카테고리별 '오늘의 문제'를 미리 정하고 캐시에 올립니다. 자정 직후 cron 으로 실행하세요."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='대상 날짜 YYYY-MM-DD (기본: 오늘)')
+
+    def handle(self, *args, **options):
+        try:
+            date = date_cls.fromisoformat(options['date']) if options['date'] else timezone.localdate()
+        except ValueError:
+            raise CommandError(f"Invalid date: {options['date']}")
+
+        for category in CATEGORIES:
+            payload = get_daily_payload(category, date)
+            if payload is None:
+                self.stderr.write(f'{category}: no questions, skipped.')
+                continue
+            self.stdout.write(f"{category}: Q{payload['question']['id']}")
+        self.stdout.write(self.style.SUCCESS(f'Selected daily questions for {date.isoformat()}.'))
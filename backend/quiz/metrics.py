@@ -0,0 +1,182 @@
+import random
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from rest_framework import serializers
+
+# settings.QUIZ_METRICS 로 덮어쓸 수 있는 기본값
+#  - SAMPLE_RATE   : 계측할 요청 비율 (0.0 ~ 1.0). 계측하지 않는 요청은 비용이 거의 없음
+#  - BUFFER_SIZE   : 보관할 최근 샘플 수 (ring buffer)
+#  - SERVER_TIMING : 계측한 요청에 Server-Timing 헤더를 붙일지 여부
+#  - PATH_PREFIX   : 계측 대상 경로
+DEFAULTS = {
+    'SAMPLE_RATE': 0.1,
+    'BUFFER_SIZE': 1000,
+    'SERVER_TIMING': False,
+    'PATH_PREFIX': '/api/',
+}
+
+
+def _config(name):
+    return getattr(settings, 'QUIZ_METRICS', {}).get(name, DEFAULTS[name])
+
+
+_current_sample = ContextVar('quiz_metrics_sample', default=None)
+
+
+class RequestSample:
+    __slots__ = ('endpoint', 'status', 'query_count', 'db_ms', 'serializer_ms', 'total_ms', 'timestamp')
+
+    def __init__(self):
+        self.endpoint = None
+        self.status = None
+        self.query_count = 0
+        self.db_ms = 0.0
+        self.serializer_ms = 0.0
+        self.total_ms = 0.0
+        self.timestamp = time.time()
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper 로 등록되어 모든 SQL 실행을 감싼다
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_ms += (time.perf_counter() - started) * 1000
+            self.query_count += 1
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def server_timing(self):
+        return ', '.join([
+            f'db;dur={self.db_ms:.2f};desc="{self.query_count} queries"',
+            f'serializer;dur={self.serializer_ms:.2f}',
+            f'total;dur={self.total_ms:.2f}',
+        ])
+
+
+class SampleBuffer:
+    """최근 요청 샘플을 고정 크기로 보관하는 ring buffer"""
+
+    def __init__(self):
+        self._samples = deque(maxlen=_config('BUFFER_SIZE'))
+        self._lock = threading.Lock()
+
+    def append(self, sample):
+        with self._lock:
+            self._samples.append(sample)
+
+    def snapshot(self):
+        with self._lock:
+            return list(self._samples)
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+
+
+sample_buffer = SampleBuffer()
+
+
+@contextmanager
+def timed(field):
+    """현재 요청이 계측 대상이면 블록 실행 시간을 sample.<field>_ms 에 더한다"""
+    sample = _current_sample.get()
+    if sample is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(sample, f'{field}_ms', getattr(sample, f'{field}_ms') + (time.perf_counter() - started) * 1000)
+
+
+class QueryMetricsMiddleware:
+    """
+    SAMPLE_RATE 비율의 quiz API 요청에 대해 SQL 쿼리 수 / DB 시간 / serializer 시간 / 전체 처리 시간(total_ms: 이 미들웨어 아래의 미들웨어 + view) 을 기록.
+    샘플은 sample_buffer 에 쌓이고 /api/_metrics 로 내보낸다.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not request.path.startswith(_config('PATH_PREFIX')) or random.random() >= _config('SAMPLE_RATE'):
+            return self.get_response(request)
+
+        sample = RequestSample()
+        token = _current_sample.set(sample)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(sample))
+                response = self.get_response(request)
+        finally:
+            sample.total_ms = (time.perf_counter() - started) * 1000
+            _current_sample.reset(token)
+
+        match = request.resolver_match
+        sample.endpoint = f'{request.method} {match.view_name if match else request.path}'
+        sample.status = response.status_code
+        sample_buffer.append(sample)
+
+        if _config('SERVER_TIMING'):
+            response['Server-Timing'] = sample.server_timing()
+        return response
+
+
+class TimedListSerializer(serializers.ListSerializer):
+    @property
+    def data(self):
+        with timed('serializer'):
+            return super().data
+
+
+class TimedSerializerMixin:
+    """
+    serializer.data 생성 시간을 요청 샘플의 serializer_ms 로 기록.
+    many=True 도 기록하려면 Meta.list_serializer_class = TimedListSerializer 를 함께 지정한다.
+    """
+
+    @property
+    def data(self):
+        with timed('serializer'):
+            return super().data
+
+
+def _percentile(sorted_values, percent):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(percent / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(samples):
+    """엔드포인트별 요청 수, 평균 쿼리 수, 전체 처리 / DB 시간 p50 / p99 요약"""
+    grouped = {}
+    for sample in samples:
+        grouped.setdefault(sample.endpoint, []).append(sample)
+
+    summary = {}
+    for endpoint, items in grouped.items():
+        total_ms = sorted(item.total_ms for item in items)
+        db_ms = sorted(item.db_ms for item in items)
+        summary[endpoint] = {
+            'count': len(items),
+            'avg_query_count': sum(item.query_count for item in items) / len(items),
+            'max_query_count': max(item.query_count for item in items),
+            'total_ms_p50': _percentile(total_ms, 50),
+            'total_ms_p99': _percentile(total_ms, 99),
+            'db_ms_p50': _percentile(db_ms, 50),
+            'db_ms_p99': _percentile(db_ms, 99),
+            'serializer_ms_avg': sum(item.serializer_ms for item in items) / len(items),
+        }
+    return summary
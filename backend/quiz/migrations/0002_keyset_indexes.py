@@ -0,0 +1,21 @@
+# Generated by Django 5.2.1 on 2026-10-17 18:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['quiz_set', 'created_at', 'id'], name='question_set_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quizset',
+            index=models.Index(fields=['created_at', 'id'], name='quizset_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.1 on 2026-10-17 18:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0002_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuizSetSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField(default=1)),
+                ('format_version', models.PositiveSmallIntegerField()),
+                ('question_count', models.PositiveIntegerField()),
+                ('payload', models.BinaryField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('quiz_set', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='snapshot', to='quiz.quizset')),
+            ],
+        ),
+    ]
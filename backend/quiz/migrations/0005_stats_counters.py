@@ -0,0 +1,49 @@
+# Generated by Django 5.2.1 on 2026-10-17 18:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0004_attempts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionStats',
+            fields=[
+                ('question', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='quiz.question')),
+                ('attempt_count', models.PositiveIntegerField(default=0)),
+                ('correct_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='QuizSetStats',
+            fields=[
+                ('quiz_set', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='quiz.quizset')),
+                ('attempt_count', models.PositiveIntegerField(default=0)),
+                ('total_correct_sum', models.PositiveBigIntegerField(default=0)),
+                ('total_questions_sum', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='attempt',
+            name='kind',
+            field=models.CharField(choices=[('question', 'Single question'), ('quizset', 'Whole quiz set')], default='quizset', max_length=10),
+        ),
+        migrations.CreateModel(
+            name='QuizSetScoreBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.PositiveSmallIntegerField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('quiz_set', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_buckets', to='quiz.quizset')),
+            ],
+            options={
+                'ordering': ['bucket'],
+                'unique_together': {('quiz_set', 'bucket')},
+            },
+        ),
+    ]
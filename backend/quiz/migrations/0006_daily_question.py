@@ -0,0 +1,27 @@
+# Generated by Django 5.2.1 on 2026-10-17 18:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0005_stats_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyQuestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('category', models.CharField(choices=[('OS', 'Operating Systems'), ('NET', 'Networking'), ('DB', 'Databases'), ('GIT', 'Git / DevOps'), ('CLOUD', 'Cloud'), ('SEC', 'Security')], max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_selections', to='quiz.question')),
+            ],
+            options={
+                'unique_together': {('date', 'category')},
+            },
+        ),
+    ]
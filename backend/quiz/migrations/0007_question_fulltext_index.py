@@ -0,0 +1,67 @@
+from django.db import migrations
+
+# MySQL: InnoDB FULLTEXT 인덱스 + ngram parser (한글 검색용), 인덱스는 InnoDB 가 행 변경과 함께 갱신
+MYSQL_FORWARDS = [
+    'ALTER TABLE quiz_question ADD FULLTEXT INDEX question_fulltext_idx (question_text, explanation) WITH PARSER ngram',
+]
+MYSQL_BACKWARDS = [
+    'ALTER TABLE quiz_question DROP INDEX question_fulltext_idx',
+]
+
+# SQLite (로컬 / 테스트): external content FTS5 테이블 + 트리거로 quiz_question 과 동기화
+SQLITE_FORWARDS = [
+    """
+    CREATE VIRTUAL TABLE quiz_question_fts USING fts5(
+        question_text, explanation, content='quiz_question', content_rowid='id', tokenize='unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER quiz_question_fts_ai AFTER INSERT ON quiz_question BEGIN
+        INSERT INTO quiz_question_fts(rowid, question_text, explanation)
+        VALUES (new.id, new.question_text, new.explanation);
+    END
+    """,
+    """
+    CREATE TRIGGER quiz_question_fts_ad AFTER DELETE ON quiz_question BEGIN
+        INSERT INTO quiz_question_fts(quiz_question_fts, rowid, question_text, explanation)
+        VALUES ('delete', old.id, old.question_text, old.explanation);
+    END
+    """,
+    """
+    CREATE TRIGGER quiz_question_fts_au AFTER UPDATE ON quiz_question BEGIN
+        INSERT INTO quiz_question_fts(quiz_question_fts, rowid, question_text, explanation)
+        VALUES ('delete', old.id, old.question_text, old.explanation);
+        INSERT INTO quiz_question_fts(rowid, question_text, explanation)
+        VALUES (new.id, new.question_text, new.explanation);
+    END
+    """,
+    "INSERT INTO quiz_question_fts(quiz_question_fts) VALUES ('rebuild')",
+]
+SQLITE_BACKWARDS = [
+    'DROP TRIGGER IF EXISTS quiz_question_fts_au',
+    'DROP TRIGGER IF EXISTS quiz_question_fts_ad',
+    'DROP TRIGGER IF EXISTS quiz_question_fts_ai',
+    'DROP TABLE IF EXISTS quiz_question_fts',
+]
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        # 그 외 DB 는 quiz.search 의 LIKE fallback 을 사용하므로 만들 인덱스가 없다
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0006_daily_question'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run({'mysql': MYSQL_FORWARDS, 'sqlite': SQLITE_FORWARDS}),
+            _run({'mysql': MYSQL_BACKWARDS, 'sqlite': SQLITE_BACKWARDS}),
+        ),
+    ]
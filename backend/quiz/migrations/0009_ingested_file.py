@@ -0,0 +1,29 @@
+# Generated by Django 5.2.1 on 2026-10-17 18:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0008_review_state'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestedFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=200)),
+                ('key', models.CharField(max_length=255)),
+                ('status', models.CharField(choices=[('ingested', 'Ingested'), ('skipped', 'Skipped')], max_length=10)),
+                ('detail', models.CharField(blank=True, max_length=255)),
+                ('ingested_at', models.DateTimeField(auto_now_add=True)),
+                ('question', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='quiz.question')),
+            ],
+            options={
+                'unique_together': {('source', 'key')},
+            },
+        ),
+    ]
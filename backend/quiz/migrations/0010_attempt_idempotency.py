@@ -0,0 +1,32 @@
+# Generated by Django 5.2.1 on 2026-10-17 18:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0009_ingested_file'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attempt',
+            name='user_ref',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='attempt',
+            name='idempotency_scope',
+            field=models.CharField(blank=True, max_length=260),
+        ),
+        migrations.AddField(
+            model_name='attempt',
+            name='idempotency_key',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='attempt',
+            constraint=models.UniqueConstraint(fields=('idempotency_scope', 'idempotency_key'), name='attempt_idempotency_uniq'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-17 18:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0010_attempt_idempotency'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizsetsnapshot',
+            name='play_payload',
+            field=models.BinaryField(default=b''),
+        ),
+    ]
@@ -1,3 +1,6 @@
+import uuid
+
+from django.conf import settings
 from django.db import models
 
 CATEGORY_CHOICES = [
@@ -16,6 +19,12 @@ class QuizSet(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # keyset 페이지네이션 (created_at, id)
+            models.Index(fields=['created_at', 'id'], name='quizset_created_id_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -27,6 +36,12 @@ class Question(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # QuizSet 별 keyset 페이지네이션 (quiz_set, created_at, id)
+            models.Index(fields=['quiz_set', 'created_at', 'id'], name='question_set_created_id_idx'),
+        ]
+
     def __str__(self):
         return f'Q{self.pk} of {self.quiz_set}'
 
@@ -41,4 +56,160 @@ class Choice(models.Model):
         ordering = ['order']
 
     def __str__(self):
-        return f'Choice {self.order} of Q{self.question_id}'
\ No newline at end of file
+        return f'Choice {self.order} of Q{self.question_id}'
+
+
+class QuizSetSnapshot(models.Model):
+    """
+    QuizSet 문제 목록(QuestionSerializer many=True 결과)을 미리 직렬화해 둔 JSON.
+    문제 / 선택지가 바뀔 때마다 다시 만들며, 문제 목록 조회 시 ORM / serializer 없이 그대로 응답한다.
+    """
+    quiz_set = models.OneToOneField(QuizSet, related_name='snapshot', on_delete=models.CASCADE)
+    version = models.PositiveIntegerField(default=1)
+    format_version = models.PositiveSmallIntegerField()
+    question_count = models.PositiveIntegerField()
+    payload = models.BinaryField()
+    # ?mode=play 용 (explanation, 선택지 is_correct 제외)
+    play_payload = models.BinaryField(default=b'')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'Snapshot v{self.version} of {self.quiz_set_id}'
+
+ATTEMPT_KIND_CHOICES = [
+    ('question', 'Single question'),
+    ('quizset', 'Whole quiz set'),
+]
+
+class Attempt(models.Model):
+    """
+    채점 결과 기록 (submit 은 문제 1개, submit_all 은 QuizSet 전체).
+    PK 를 UUID 로 두어 저장 전에 id 를 정할 수 있으므로, 버퍼에서 AttemptAnswer 와 함께 bulk_create 할 수 있다.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    kind = models.CharField(max_length=10, choices=ATTEMPT_KIND_CHOICES, default='quizset')
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, related_name='quiz_attempts',
+        null=True, blank=True, on_delete=models.SET_NULL
+    )
+    quiz_set = models.ForeignKey(QuizSet, related_name='attempts', on_delete=models.CASCADE)
+    total_questions = models.PositiveIntegerField()
+    total_correct = models.PositiveIntegerField()
+    submitted_at = models.DateTimeField()
+    # 일괄 채점(/api/submissions/batch/) 에서 클라이언트가 보내는 응시자 식별자 / 재전송 중복 방지 키.
+    # 키는 응시자(idempotency_scope: 'ref:<user_ref>' 또는 'user:<pk>') 안에서만 유일하다
+    user_ref = models.CharField(max_length=255, blank=True)
+    idempotency_scope = models.CharField(max_length=260, blank=True)
+    idempotency_key = models.CharField(max_length=64, null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['quiz_set', 'submitted_at'], name='attempt_set_submitted_idx'),
+            models.Index(fields=['user', 'submitted_at'], name='attempt_user_submitted_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['idempotency_scope', 'idempotency_key'], name='attempt_idempotency_uniq'),
+        ]
+
+    def __str__(self):
+        return f'Attempt {self.pk} of {self.quiz_set_id}'
+
+class AttemptAnswer(models.Model):
+    attempt = models.ForeignKey(Attempt, related_name='answers', on_delete=models.CASCADE)
+    question = models.ForeignKey(Question, related_name='attempt_answers', on_delete=models.CASCADE)
+    choice_ids = models.JSONField(default=list)
+    is_correct = models.BooleanField()
+
+    def __str__(self):
+        return f'Answer to Q{self.question_id} in {self.attempt_id}'
+
+class QuestionStats(models.Model):
+    """채점 시 F() 로 누적되는 문제별 카운터"""
+    question = models.OneToOneField(Question, primary_key=True, related_name='stats', on_delete=models.CASCADE)
+    attempt_count = models.PositiveIntegerField(default=0)
+    correct_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f'Stats of Q{self.question_id}'
+
+class QuizSetStats(models.Model):
+    """submit_all 채점 시 F() 로 누적되는 QuizSet 별 카운터"""
+    quiz_set = models.OneToOneField(QuizSet, primary_key=True, related_name='stats', on_delete=models.CASCADE)
+    attempt_count = models.PositiveIntegerField(default=0)
+    total_correct_sum = models.PositiveBigIntegerField(default=0)
+    total_questions_sum = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f'Stats of {self.quiz_set_id}'
+
+class QuizSetScoreBucket(models.Model):
+    """QuizSet 점수 분포. bucket n 은 정답률 [n*10%, (n+1)*10%) 구간 (마지막 구간은 100% 포함)"""
+    quiz_set = models.ForeignKey(QuizSet, related_name='score_buckets', on_delete=models.CASCADE)
+    bucket = models.PositiveSmallIntegerField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('quiz_set', 'bucket')
+        ordering = ['bucket']
+
+    def __str__(self):
+        return f'Bucket {self.bucket} of {self.quiz_set_id}'
+
+class DailyQuestion(models.Model):
+    """날짜 / 카테고리별 '오늘의 문제'. 하루에 한 번 정해지며 (date, category) 가 유일하다"""
+    date = models.DateField()
+    category = models.CharField(max_length=10, choices=CATEGORY_CHOICES)
+    question = models.ForeignKey(Question, related_name='daily_selections', on_delete=models.CASCADE)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('date', 'category')
+
+    def __str__(self):
+        return f'{self.date} {self.category}: Q{self.question_id}'
+
+class ReviewState(models.Model):
+    """
+    사용자 x 문제 별 SM-2 복습 상태. 채점 기록이 저장될 때 일괄 갱신되고,
+    (user, due_at) 인덱스 range scan 으로 다음 복습 문제를 꺼낸다.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='review_states', on_delete=models.CASCADE)
+    question = models.ForeignKey(Question, related_name='review_states', on_delete=models.CASCADE)
+    repetitions = models.PositiveIntegerField(default=0)
+    interval_days = models.PositiveIntegerField(default=0)
+    ease = models.FloatField(default=2.5)
+    due_at = models.DateTimeField()
+    last_reviewed_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('user', 'question')
+        indexes = [
+            models.Index(fields=['user', 'due_at'], name='review_user_due_idx'),
+        ]
+
+    def __str__(self):
+        return f'Review of Q{self.question_id} by {self.user_id}'
+
+INGEST_STATUS_CHOICES = [
+    ('ingested', 'Ingested'),
+    ('skipped', 'Skipped'),
+]
+
+class IngestedFile(models.Model):
+    """
+    question_gen 이 만든 문제 JSON 파일의 적재 manifest. (source, key) 당 한 행.
+    가장 큰 key 에서 QUIZ_INGEST_LOOKBACK 개 앞부터 나열하고 그중 이 manifest 에 없는 것만 읽으므로,
+    적재했거나 건너뛴 파일은 다시 읽지 않는다.
+    """
+    source = models.CharField(max_length=200)
+    key = models.CharField(max_length=255)
+    status = models.CharField(max_length=10, choices=INGEST_STATUS_CHOICES)
+    question = models.ForeignKey(Question, related_name='+', null=True, blank=True, on_delete=models.SET_NULL)
+    detail = models.CharField(max_length=255, blank=True)
+    ingested_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('source', 'key')
+
+    def __str__(self):
+        return f'{self.source}/{self.key} ({self.status})'
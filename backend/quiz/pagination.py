@@ -0,0 +1,101 @@
+import base64
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .content import count_cache
+
+
+class KeysetPagination(BasePagination):
+    """
+    (created_at, id) 기준 keyset(cursor) 페이지네이션.
+
+    OFFSET 을 쓰지 않고 마지막 행의 (created_at, id) 다음부터 읽기 때문에
+    몇 번째 페이지든 인덱스 range scan 한 번으로 끝난다.
+    요청에 `page_size` 나 `cursor` 가 없으면 페이지네이션을 하지 않는다 (opt-in).
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = 20
+    max_page_size = 100
+    ordering = ('created_at', 'id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if (self.cursor_query_param not in request.query_params
+                and self.page_size_query_param not in request.query_params):
+            return None
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            created_at, pk = position
+            queryset = queryset.filter(
+                Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk)
+            )
+
+        # 다음 페이지 존재 여부를 COUNT 없이 알기 위해 한 행 더 읽는다
+        rows = list(queryset[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        page = rows[:page_size]
+        self.next_position = (page[-1].created_at, page[-1].pk) if self.has_next else None
+        return page
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            decoded = base64.urlsafe_b64decode(encoded.encode('ascii')).decode('ascii')
+            created_at, pk = decoded.rsplit('|', 1)
+            return datetime.fromisoformat(created_at), int(pk)
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, position):
+        created_at, pk = position
+        raw = f'{created_at.isoformat()}|{pk}'
+        return base64.urlsafe_b64encode(raw.encode('ascii')).decode('ascii')
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_paginated_response(self, data, count=None):
+        return Response({
+            'count': count,
+            'next': self.get_next_link(),
+            'results': data
+        })
+
+
+def cached_count(key, queryset):
+    """
+    queryset.count() 결과를 Django cache 에 보관.
+    Question / QuizSet 변경 시 quiz.content 에서 키를 지우고, 그 외에는 TTL 만큼 재사용한다.
+    """
+    cache = count_cache()
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, getattr(settings, 'QUIZ_COUNT_CACHE_TIMEOUT', 60))
+    return count
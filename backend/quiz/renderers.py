@@ -0,0 +1,56 @@
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # orjson 이 없으면 DRF 기본 json 구현으로 동작
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    orjson 으로 직렬화하는 JSONRenderer.
+
+    datetime / Decimal / lazy 문자열 등은 DRF JSONEncoder.default 로 넘겨 기존 응답과 같은 형식을 유지한다.
+    orjson 이 없거나, 들여쓰기 요청(브라우저블 API, ?indent) 이거나, orjson 이 처리하지 못하는 값
+    (64bit 를 넘는 정수 등) 이 있으면 DRF 기본 구현으로 렌더링한다.
+    """
+    if orjson is not None:
+        options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=self.options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # DRF 와 같이 U+2028 / U+2029 는 escape (JavaScript 문자열과 호환)
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class ORJSONParser(JSONParser):
+    """orjson 으로 요청 본문을 파싱하는 JSONParser. orjson 이 없으면 DRF 기본 구현"""
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            raw = stream.read()
+            if encoding.lower().replace('-', '') != 'utf8':
+                raw = raw.decode(encoding)
+            return orjson.loads(raw)
+        except (orjson.JSONDecodeError, UnicodeDecodeError) as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
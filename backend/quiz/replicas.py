@@ -0,0 +1,89 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+
+DEFAULT_DB_ALIAS = 'default'
+
+
+class _RoutingState:
+    def __init__(self, replica_reads):
+        self.replica_reads = replica_reads
+        self.wrote = False
+
+
+# 요청(또는 with 블록) 단위 라우팅 상태. 스레드 / async task 마다 독립적이다
+_state = ContextVar('quiz_db_routing', default=None)
+
+
+def _config(name, default):
+    return getattr(settings, 'QUIZ_DB_REPLICAS', {}).get(name, default)
+
+
+def replica_aliases():
+    return [alias for alias in _config('ALIASES', []) if alias in settings.DATABASES]
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    """블록 안의 읽기를 replica 로 보낸다. 블록 안에서 한 번이라도 쓰면 이후 읽기는 primary 에 고정된다"""
+    token = _state.set(_RoutingState(enabled))
+    try:
+        yield
+    finally:
+        _state.reset(token)
+
+
+def primary_reads(func):
+    """replica_reads 블록 안에서 호출되더라도 primary 에서 읽어야 하는 함수 (읽은 값으로 다시 쓰는 경우)"""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with replica_reads(enabled=False):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter:
+    """
+    replica_reads() 블록 안의 읽기만 QUIZ_DB_REPLICAS['ALIASES'] 중 하나로 보내는 router.
+    그 외의 읽기 / 모든 쓰기는 primary(default). replica 가 설정되지 않았으면 아무것도 하지 않는다.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or not state.replica_reads or state.wrote:
+            return None
+        aliases = replica_aliases()
+        return random.choice(aliases) if aliases else None
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replica 는 primary 의 복제본이므로 어느 쪽에서 읽은 객체끼리든 관계를 허용
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+class ReplicaReadMixin:
+    """
+    ViewSet 의 안전한 요청(GET / HEAD / OPTIONS) 의 읽기를 replica 로 보낸다.
+    grading_actions(submit / submit_all) 의 정답표 조회는 QUIZ_DB_REPLICAS['GRADING_READS'] == 'replica' 일 때만 replica.
+    """
+    grading_actions = ()
+
+    def dispatch(self, request, *args, **kwargs):
+        action = (getattr(self, 'action_map', None) or {}).get(request.method.lower())
+        enabled = request.method in SAFE_METHODS or (
+            action in self.grading_actions and _config('GRADING_READS', 'primary') == 'replica'
+        )
+        with replica_reads(enabled):
+            return super().dispatch(request, *args, **kwargs)
@@ -0,0 +1,91 @@
+from datetime import timedelta
+
+from django.db import connection
+
+from .models import ReviewState
+
+MIN_EASE = 1.3
+# 정답 / 오답을 SM-2 의 응답 품질(0 ~ 5)로 환산
+CORRECT_QUALITY = 4
+INCORRECT_QUALITY = 1
+
+SCHEDULE_FIELDS = ['repetitions', 'interval_days', 'ease', 'due_at', 'last_reviewed_at']
+
+
+def schedule(state, is_correct, reviewed_at):
+    """SM-2 규칙으로 state 의 반복 횟수 / 간격 / ease / 다음 복습 시각을 갱신"""
+    quality = CORRECT_QUALITY if is_correct else INCORRECT_QUALITY
+
+    if quality < 3:
+        state.repetitions = 0
+        state.interval_days = 1
+    else:
+        state.repetitions += 1
+        if state.repetitions == 1:
+            state.interval_days = 1
+        elif state.repetitions == 2:
+            state.interval_days = 6
+        else:
+            state.interval_days = max(1, round(state.interval_days * state.ease))
+
+    state.ease = max(MIN_EASE, state.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    state.last_reviewed_at = reviewed_at
+    state.due_at = reviewed_at + timedelta(days=state.interval_days)
+
+
+def apply_review_updates(entries):
+    """
+    저장되는 (Attempt, [AttemptAnswer]) 목록으로 로그인 사용자의 복습 상태를 일괄 갱신.
+    기존 상태 조회 1회 + bulk_update 1회 + bulk_create 1회.
+    다른 워커가 같은 (user, question) 을 먼저 만들었으면 upsert 로 덮어쓴다.
+    attempts.write_attempts 와 같은 트랜잭션 안에서 호출된다.
+    """
+    graded = [
+        (attempt.user_id, answer.question_id, answer.is_correct, attempt.submitted_at)
+        for attempt, answers in entries
+        if attempt.user_id is not None
+        for answer in answers
+    ]
+    if not graded:
+        return
+
+    keys = {(user_id, question_id) for user_id, question_id, _, _ in graded}
+    candidates = ReviewState.objects.filter(
+        user_id__in={user_id for user_id, _ in keys},
+        question_id__in={question_id for _, question_id in keys},
+    )
+    states = {
+        (state.user_id, state.question_id): state
+        for state in candidates
+        if (state.user_id, state.question_id) in keys
+    }
+
+    created = {}
+    for user_id, question_id, is_correct, reviewed_at in graded:
+        key = (user_id, question_id)
+        state = states.get(key) or created.get(key)
+        if state is None:
+            state = created[key] = ReviewState(user_id=user_id, question_id=question_id)
+        schedule(state, is_correct, reviewed_at)
+
+    if states:
+        ReviewState.objects.bulk_update(states.values(), SCHEDULE_FIELDS)
+    if created:
+        # MySQL 은 ON DUPLICATE KEY UPDATE 라 충돌 대상 컬럼을 지정하지 않는다
+        unique_fields = ['user', 'question'] if connection.features.supports_update_conflicts_with_target else None
+        ReviewState.objects.bulk_create(
+            created.values(), update_conflicts=True, unique_fields=unique_fields, update_fields=SCHEDULE_FIELDS
+        )
+
+
+def next_reviews(user, limit, now):
+    """
+    due_at 이 지난 복습 대상을 오래된 순으로 최대 limit 개.
+    (user, due_at) 인덱스 range scan 1회 (+ 선택지 prefetch 1회).
+    """
+    return list(
+        ReviewState.objects.filter(user=user, due_at__lte=now)
+        .order_by('due_at')
+        .select_related('question')
+        .prefetch_related('question__choices')[:limit]
+    )
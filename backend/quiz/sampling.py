@@ -0,0 +1,117 @@
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import Question
+
+VERSION_KEY = 'quiz:sampling-index-version'
+# 인덱스의 최대 사용 시간(초). 기본 cache(LocMemCache) 는 워커마다 따로 있어 version 증가가 다른 워커에 보이지 않으므로,
+# 다른 워커에서 추가 / 삭제된 문제가 이 시간 안에 반영되도록 한다 (settings.QUIZ_SAMPLING_INDEX_TTL)
+DEFAULT_INDEX_TTL = 60
+
+
+def version_cache():
+    return caches[getattr(settings, 'QUIZ_SAMPLING_CACHE_ALIAS', 'default')]
+
+
+def category_version_key(category):
+    return f'{VERSION_KEY}:{category}'
+
+
+def _index_version(category):
+    """(전체 version, 카테고리 version). 둘 중 하나라도 바뀌면 그 카테고리의 인덱스를 다시 만든다"""
+    versions = version_cache().get_many([VERSION_KEY, category_version_key(category)])
+    return versions.get(VERSION_KEY, 0), versions.get(category_version_key(category), 0)
+
+
+class SamplingIndex:
+    """
+    카테고리별로 난이도 -> Question id 배열을 프로세스 메모리에 보관하는 무작위 추출용 인덱스.
+
+    ORDER BY RAND() 없이 배열에서 random.sample 로 N 개를 고르고 pk IN (...) 으로 가져오므로
+    테이블 크기와 관계없이 O(N) 작업과 고정된 쿼리 수로 끝난다.
+    인덱스는 카테고리 단위로 만들고 무효화한다: 문제가 바뀌면 그 카테고리의 version 이 올라가고,
+    같은 cache 를 보는 워커는 그 카테고리를 다음에 조회할 때만 다시 만든다.
+    version 이 그대로여도 QUIZ_SAMPLING_INDEX_TTL 이 지난 카테고리는 다시 만든다 (cache 가 워커마다 따로 있는 경우).
+    """
+
+    def __init__(self):
+        # category -> (version, expires_at, {difficulty_level 또는 None: ids}). 항목은 통째로 교체만 한다
+        self._categories = {}
+        self._lock = threading.Lock()
+
+    def ids(self, category, difficulty_level=None):
+        return self._buckets(category).get(difficulty_level or None, ())
+
+    def _buckets(self, category):
+        version = _index_version(category)
+        now = time.monotonic()
+        entry = self._categories.get(category)
+        if entry is not None and entry[0] == version and entry[1] > now:
+            return entry[2]
+        with self._lock:
+            entry = self._categories.get(category)
+            if entry is None or entry[0] != version or entry[1] <= now:
+                ttl = getattr(settings, 'QUIZ_SAMPLING_INDEX_TTL', DEFAULT_INDEX_TTL)
+                entry = (version, now + ttl, self._build(category))
+                self._categories[category] = entry
+            return entry[2]
+
+    def _build(self, category):
+        buckets = {None: []}
+        rows = (
+            Question.objects.filter(quiz_set__category=category)
+            .order_by('pk').values_list('pk', 'difficulty_level')
+        )
+        for pk, difficulty_level in rows.iterator(chunk_size=5000):
+            buckets[None].append(pk)
+            if difficulty_level:
+                buckets.setdefault(difficulty_level, []).append(pk)
+        return {key: tuple(ids) for key, ids in buckets.items()}
+
+    def discard(self, category=None):
+        """이 워커의 인덱스를 버린다 (category 가 None 이면 전체)"""
+        with self._lock:
+            if category is None:
+                self._categories = {}
+            else:
+                self._categories.pop(category, None)
+
+    def reset(self):
+        self.discard()
+
+
+sampling_index = SamplingIndex()
+
+
+def invalidate_sampling_index(category=None):
+    """
+    같은 cache 를 보는 워커가 category 의 인덱스를 다음 조회 때 다시 만들도록 version 을 올린다 (None 이면 전체 카테고리).
+    cache 가 워커마다 따로 있으면 나머지 워커는 QUIZ_SAMPLING_INDEX_TTL 안에 다시 만든다.
+    """
+    cache = version_cache()
+    key = VERSION_KEY if category is None else category_version_key(category)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+    sampling_index.discard(category)
+
+
+def sample_question_ids(category, count, difficulty_level=None, rng=random):
+    """카테고리(와 난이도)에서 중복 없이 최대 count 개의 Question id 를 무작위로 고른다 (쿼리 없음, 인덱스 재구성 시 제외)"""
+    ids = sampling_index.ids(category, difficulty_level)
+    return rng.sample(ids, min(count, len(ids)))
+
+
+def sample_questions(category, count, difficulty_level=None):
+    """무작위로 고른 Question 을 선택지와 함께 반환. 쿼리 2회 (Question, Choice prefetch)"""
+    question_ids = sample_question_ids(category, count, difficulty_level)
+    if not question_ids:
+        return []
+    questions = Question.objects.filter(pk__in=question_ids).prefetch_related('choices').in_bulk()
+    # 삭제된 직후라 인덱스에만 남아 있던 id 는 건너뛴다
+    return [questions[pk] for pk in question_ids if pk in questions]
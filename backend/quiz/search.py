@@ -0,0 +1,100 @@
+import re
+
+from django.db import connection
+
+from .models import Question
+
+# FTS 인덱스는 migrations/0007_question_fulltext_index.py 에서 DB 종류별로 만든다
+#  - mysql  : FULLTEXT(question_text, explanation) WITH PARSER ngram
+#  - sqlite : FTS5 external content 테이블 quiz_question_fts (트리거로 동기화)
+#  - 그 외  : 인덱스 없이 LIKE 검색 (개발 편의용)
+
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def _filters(category, quizset_id):
+    sql = []
+    params = []
+    if category:
+        sql.append('s.category = %s')
+        params.append(category)
+    if quizset_id:
+        sql.append('q.quiz_set_id = %s')
+        params.append(quizset_id)
+    return ''.join(f' AND {clause}' for clause in sql), params
+
+
+def _mysql_search(query, category, quizset_id, limit, offset):
+    match = 'MATCH(q.question_text, q.explanation) AGAINST (%s IN NATURAL LANGUAGE MODE)'
+    where, params = _filters(category, quizset_id)
+    base = f'FROM quiz_question q JOIN quiz_quizset s ON s.id = q.quiz_set_id WHERE {match}{where}'
+    return (
+        f'SELECT q.id, {match} AS score {base} ORDER BY score DESC, q.id LIMIT %s OFFSET %s',
+        [query, query, *params, limit, offset],
+        f'SELECT COUNT(*) {base}',
+        [query, *params],
+    )
+
+
+def _sqlite_search(query, category, quizset_id, limit, offset):
+    # 토큰마다 따옴표로 감싸 FTS5 문법 문자를 무력화하고, 조사가 붙은 한글 단어도 찾도록 prefix 검색(*)
+    fts_query = ' '.join(f'"{token}"*' for token in _TOKEN_RE.findall(query))
+    where, params = _filters(category, quizset_id)
+    base = (
+        'FROM quiz_question_fts f JOIN quiz_question q ON q.id = f.rowid '
+        f'JOIN quiz_quizset s ON s.id = q.quiz_set_id WHERE quiz_question_fts MATCH %s{where}'
+    )
+    return (
+        f'SELECT q.id, -bm25(quiz_question_fts) AS score {base} ORDER BY score DESC, q.id LIMIT %s OFFSET %s',
+        [fts_query, *params, limit, offset],
+        f'SELECT COUNT(*) {base}',
+        [fts_query, *params],
+    )
+
+
+def _like_search(query, category, quizset_id, limit, offset):
+    where, params = _filters(category, quizset_id)
+    pattern = f'%{query}%'
+    base = (
+        'FROM quiz_question q JOIN quiz_quizset s ON s.id = q.quiz_set_id '
+        f'WHERE (q.question_text LIKE %s OR q.explanation LIKE %s){where}'
+    )
+    return (
+        f'SELECT q.id, 1 AS score {base} ORDER BY q.id LIMIT %s OFFSET %s',
+        [pattern, pattern, *params, limit, offset],
+        f'SELECT COUNT(*) {base}',
+        [pattern, pattern, *params],
+    )
+
+
+BACKENDS = {
+    'mysql': _mysql_search,
+    'sqlite': _sqlite_search,
+}
+
+
+def search_questions(query, category=None, quizset_id=None, limit=20, offset=0):
+    """
+    Question.question_text / explanation 전문 검색.
+    관련도 순으로 정렬된 (Question 리스트(score 속성 포함), 전체 결과 수) 를 반환한다.
+    쿼리 4회 (검색, COUNT, Question, Choice prefetch).
+    """
+    if not _TOKEN_RE.search(query):
+        return [], 0
+
+    build = BACKENDS.get(connection.vendor, _like_search)
+    select_sql, select_params, count_sql, count_params = build(query, category, quizset_id, limit, offset)
+    with connection.cursor() as cursor:
+        cursor.execute(select_sql, select_params)
+        scores = dict(cursor.fetchall())
+        cursor.execute(count_sql, count_params)
+        total = cursor.fetchone()[0]
+
+    questions = Question.objects.filter(pk__in=scores).prefetch_related('choices').in_bulk()
+    results = []
+    for pk, score in scores.items():
+        if pk in questions:
+            question = questions[pk]
+            question.score = float(score)
+            results.append(question)
+    return results, total
@@ -1,38 +1,193 @@
+from django.db import transaction
 from rest_framework import serializers
 from .models import QuizSet, Question, Choice
+from .content import quizset_content_changed
+from .metrics import TimedSerializerMixin, TimedListSerializer
+
+CHOICE_UPDATE_FIELDS = ['text', 'order', 'is_correct']
+
+def build_choices(question, choices_data):
+    """선택지 order 는 전달된 값과 상관없이 1부터 순서대로 매긴다 (새로 만드는 선택지이므로 id 는 무시)"""
+    return [
+        Choice(question=question, **{
+            **{key: value for key, value in choice_data.items() if key != 'id'},
+            'order': idx+1,
+        })
+        for idx, choice_data in enumerate(choices_data)
+    ]
+
+def sync_choices(question, existing, choices_data):
+    """
+    기존 선택지(existing) 를 choices_data 와 같아지도록 diff 로 반영한다.
+    전달된 선택지는 id, 없으면 기존 order 로 기존 선택지와 짝짓고, 짝지어진 선택지는 id 를 유지한다
+    (지난 Attempt 의 choice_ids 가 계속 유효). order 는 build_choices 와 같이 1부터 다시 매긴다.
+    삭제 1회 + bulk_update 1회 + bulk_create 1회 이하로 처리하며, 바뀐 것이 없으면 쿼리를 보내지 않는다.
+    """
+    # 임시 order 의 기준. 아래에서 order 를 최종 값으로 덮어쓰기 전에, DB 에 있는 값으로 계산한다
+    base = max([choice.order for choice in existing] + [len(choices_data)])
+    by_id = {choice.pk: choice for choice in existing}
+    by_order = {choice.order: choice for choice in existing}
+    claimed = {data['id'] for data in choices_data if data.get('id') is not None}
+
+    matched = []
+    for data in choices_data:
+        choice = by_id.get(data.get('id'))
+        if choice is None and data.get('id') is None:
+            candidate = by_order.get(data.get('order'))
+            if candidate is not None and candidate.pk not in claimed:
+                choice = candidate
+                claimed.add(candidate.pk)
+        matched.append(choice)
+
+    kept_ids = {choice.pk for choice in matched if choice is not None}
+    removed_ids = [pk for pk in by_id if pk not in kept_ids]
+
+    changed, created = [], []
+    for idx, (data, choice) in enumerate(zip(choices_data, matched)):
+        values = {'text': data['text'], 'order': idx + 1, 'is_correct': data.get('is_correct', False)}
+        if choice is None:
+            created.append(Choice(question=question, **values))
+        elif any(getattr(choice, field) != value for field, value in values.items()):
+            previous_order = choice.order
+            for field, value in values.items():
+                setattr(choice, field, value)
+            changed.append((choice, previous_order))
+
+    if removed_ids:
+        Choice.objects.filter(pk__in=removed_ids).delete()
+    if changed:
+        # (question, order) unique 제약은 행 단위로 검사되므로, 다른 선택지가 비울 order 로 옮기는 경우
+        # (순서 교환 등) 기존 order 와 겹치지 않는 임시 order 로 한 번 옮긴 뒤 최종 값을 쓴다
+        moving = [choice for choice, previous_order in changed if choice.order != previous_order]
+        vacated = {previous_order for choice, previous_order in changed if choice.order != previous_order}
+        if any(choice.order in vacated for choice in moving):
+            final_orders = {choice.pk: choice.order for choice in moving}
+            for choice in moving:
+                choice.order += base
+            Choice.objects.bulk_update(moving, ['order'])
+            for choice in moving:
+                choice.order = final_orders[choice.pk]
+        Choice.objects.bulk_update([choice for choice, _ in changed], CHOICE_UPDATE_FIELDS)
+    if created:
+        Choice.objects.bulk_create(created)
 
 class ChoiceSerializer(serializers.ModelSerializer):
+    # 문제 수정(PUT / PATCH) 시 기존 선택지를 가리키는 용도. 생략하면 order 로 짝짓는다
+    id = serializers.IntegerField(required=False)
+
     class Meta:
         model = Choice
         fields = ['id', 'text', 'order', 'is_correct']
 
-class QuestionSerializer(serializers.ModelSerializer):
+class PlayChoiceSerializer(serializers.ModelSerializer):
+    """문제 풀이 화면용 선택지 (정답 여부 제외)"""
+    class Meta:
+        model = Choice
+        fields = ['id', 'text', 'order']
+
+class QuestionSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """
+    fields / omit 로 내려줄 필드를 고르고, play=True 면 풀이 화면용으로 explanation 과 선택지의 is_correct 를 뺀다.
+    (GET ?fields= / ?omit= / ?mode=play)
+    """
     choices = ChoiceSerializer(many=True)
 
     class Meta:
         model = Question
         fields = ['id', 'quiz_set', 'question_text', 'explanation', 'difficulty_level', 'choices']
+        list_serializer_class = TimedListSerializer
+
+    def __init__(self, *args, fields=None, omit=None, play=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        if play:
+            self.fields['choices'] = PlayChoiceSerializer(many=True, read_only=True)
+            omit = [*(omit or ()), 'explanation']
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        for name in omit or ():
+            self.fields.pop(name, None)
+
+    def validate_choices(self, choices_data):
+        # 생성 시에는 선택지 id 를 무시한다 (build_choices)
+        if self.instance is None:
+            return choices_data
+        ids = [data['id'] for data in choices_data if data.get('id') is not None]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError('Duplicate choice id.')
+        if ids:
+            existing_ids = {choice.pk for choice in self.instance.choices.all()}
+            unknown = sorted(set(ids) - existing_ids)
+            if unknown:
+                raise serializers.ValidationError(
+                    f"Choice id(s) {', '.join(map(str, unknown))} do not belong to this question."
+                )
+        return choices_data
 
     def create(self, validated_data):
         choices_data = validated_data.pop('choices')
         question = Question.objects.create(**validated_data)
-        for idx, choice_data in enumerate(choices_data):
-            Choice.objects.create(question=question, order=idx+1, **choice_data)
+        Choice.objects.bulk_create(build_choices(question, choices_data))
+        quizset_content_changed(question.quiz_set_id)
         return question
 
     def update(self, instance, validated_data):
         choices_data = validated_data.pop('choices', None)
+        previous_quizset_id = instance.quiz_set_id
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
-        instance.save()
 
-        if choices_data is not None:
-            instance.choices.all().delete()
-            for idx, choice_data in enumerate(choices_data):
-                Choice.objects.create(question=instance, order=idx+1, **choice_data)
+        with transaction.atomic():
+            instance.save()
+            if choices_data is not None:
+                sync_choices(instance, list(instance.choices.all()), choices_data)
+
+        # 문제가 다른 QuizSet으로 옮겨진 경우 양쪽 파생 데이터 모두 무효화
+        quizset_content_changed(previous_quizset_id)
+        if instance.quiz_set_id != previous_quizset_id:
+            quizset_content_changed(instance.quiz_set_id)
         return instance
 
-class QuizSetSerializer(serializers.ModelSerializer):
+class QuizSetSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = QuizSet
-        fields = ['id', 'title', 'description', 'category', 'created_at', 'updated_at']
\ No newline at end of file
+        fields = ['id', 'title', 'description', 'category', 'created_at', 'updated_at']
+        list_serializer_class = TimedListSerializer
+
+class ChoiceImportSerializer(serializers.Serializer):
+    text = serializers.CharField()
+    is_correct = serializers.BooleanField(default=False)
+
+class QuestionImportSerializer(serializers.Serializer):
+    """
+    대량 등록(bulk) 항목 하나를 검증하는 serializer.
+    quiz_set 은 URL 에서 받으므로 항목마다 DB 조회를 하지 않도록 필드에서 제외한다.
+    """
+    question_text = serializers.CharField()
+    explanation = serializers.CharField(required=False, allow_blank=True, default='')
+    difficulty_level = serializers.CharField(required=False, allow_blank=True, max_length=50, default='')
+    choices = ChoiceImportSerializer(many=True, allow_empty=False)
+
+class SubmittedAnswerSerializer(serializers.Serializer):
+    question_id = serializers.IntegerField()
+    choice_ids = serializers.ListField(child=serializers.IntegerField(), default=list)
+
+class BatchSubmissionSerializer(serializers.Serializer):
+    """
+    일괄 채점(batch) 제출 하나를 검증하는 serializer.
+    정답표는 제출 전체에 대해 한 번에 읽으므로 quizset_id 의 존재 여부는 여기서 확인하지 않는다.
+    """
+    user_ref = serializers.CharField(required=False, allow_blank=True, max_length=255, default='')
+    quizset_id = serializers.IntegerField()
+    answers = SubmittedAnswerSerializer(many=True)
+    idempotency_key = serializers.CharField(required=False, allow_null=True, max_length=64, default=None)
+
+    def validate(self, attrs):
+        # idempotency_key 는 응시자(user_ref 또는 로그인 계정) 안에서만 유일하므로 둘 다 없으면 받을 수 없다
+        request = self.context.get('request')
+        authenticated = request is not None and request.user.is_authenticated
+        if attrs['idempotency_key'] and not attrs['user_ref'] and not authenticated:
+            raise serializers.ValidationError(
+                {"idempotency_key": ["Requires 'user_ref' or an authenticated user."]}
+            )
+        return attrs
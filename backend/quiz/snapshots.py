@@ -0,0 +1,93 @@
+import json
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import QuizSet, Question, QuizSetSnapshot
+from .renderers import ORJSONRenderer
+from .replicas import primary_reads
+
+# 저장되는 payload 형식이 바뀌면 올려서 이전 형식의 스냅샷을 자동으로 다시 만들게 한다
+FORMAT_VERSION = 2
+
+
+def render_questions(quizset_id):
+    """
+    QuestionViewSet.list 의 'questions' 와 동일한 JSON bytes 를 (전체, ?mode=play) 두 가지로 만든다.
+    (payload, play_payload, 문제 수) 를 반환. 같은 인스턴스를 두 번 직렬화하므로 쿼리는 2회.
+    """
+    # 순환 import 방지 (serializers -> content -> snapshots)
+    from .serializers import QuestionSerializer
+
+    questions = list(Question.objects.filter(quiz_set_id=quizset_id).prefetch_related('choices'))
+    renderer = ORJSONRenderer()
+    return (
+        renderer.render(QuestionSerializer(questions, many=True).data),
+        renderer.render(QuestionSerializer(questions, many=True, play=True).data),
+        len(questions),
+    )
+
+
+@primary_reads
+def rebuild_snapshot(quizset_id):
+    """
+    QuizSet 의 스냅샷을 다시 만들고 version 을 1 올린다. (payload, play_payload, 문제 수) 를 반환.
+    QuizSet 이 이미 삭제된 경우에는 아무것도 하지 않고 None 을 반환한다.
+    복제 지연으로 오래된 내용을 저장하지 않도록 항상 primary 에서 읽는다.
+    """
+    if not QuizSet.objects.filter(pk=quizset_id).exists():
+        return None
+
+    payload, play_payload, question_count = render_questions(quizset_id)
+    fields = {
+        'format_version': FORMAT_VERSION,
+        'question_count': question_count,
+        'payload': payload,
+        'play_payload': play_payload,
+    }
+    if not _bump_snapshot(quizset_id, fields):
+        try:
+            with transaction.atomic():
+                QuizSetSnapshot.objects.create(quiz_set_id=quizset_id, **fields)
+        except IntegrityError:
+            # 동시에 처음 조회한 다른 요청이 먼저 만든 경우 (quiz_set 은 OneToOne) 그 행을 갱신한다
+            _bump_snapshot(quizset_id, fields)
+    return payload, play_payload, question_count
+
+
+def _bump_snapshot(quizset_id, fields):
+    """스냅샷 행이 있으면 내용을 바꾸고 version 을 1 올린다. 갱신한 행 수를 반환"""
+    return QuizSetSnapshot.objects.filter(quiz_set_id=quizset_id).update(version=F('version') + 1, **fields)
+
+
+def get_snapshot(quizset_id, play=False):
+    """
+    (questions JSON bytes, 문제 수) 를 반환. play=True 면 풀이 화면용(?mode=play) payload. 쿼리 1회.
+    스냅샷이 없거나 형식이 오래된 경우 그 자리에서 다시 만든다.
+    QuizSet 이 없으면 None.
+    """
+    row = (
+        QuizSetSnapshot.objects.filter(quiz_set_id=quizset_id)
+        .values_list('format_version', 'question_count', 'play_payload' if play else 'payload')
+        .first()
+    )
+    if row is not None and row[0] == FORMAT_VERSION:
+        return bytes(row[2]), row[1]
+
+    rebuilt = rebuild_snapshot(quizset_id)
+    if rebuilt is None:
+        return None
+    payload, play_payload, question_count = rebuilt
+    return (play_payload if play else payload), question_count
+
+
+def render_question_list(quizset_id, questions_json, question_count):
+    """
+    QuestionViewSet.list 응답 envelope 을 bytes 연결만으로 조립한다.
+    quizset_id 는 기존 응답과 동일하게 URL 에서 받은 문자열 그대로 내려준다.
+    """
+    head = json.dumps({
+        'quizset_id': quizset_id,
+        'total_question_count': question_count,
+    }, separators=(',', ':'))
+    return head[:-1].encode('utf-8') + b',"questions":' + questions_json + b'}'
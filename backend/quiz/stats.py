@@ -0,0 +1,198 @@
+from collections import Counter, defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+
+from .models import (
+    Attempt, AttemptAnswer, Question, QuizSet,
+    QuestionStats, QuizSetStats, QuizSetScoreBucket,
+)
+
+BUCKET_COUNT = 10
+RECONCILE_CHUNK_SIZE = 1000
+
+
+def score_bucket(total_correct, total_questions):
+    if total_questions <= 0:
+        return 0
+    return min(total_correct * BUCKET_COUNT // total_questions, BUCKET_COUNT - 1)
+
+
+def apply_attempt_stats(entries):
+    """
+    저장되는 (Attempt, [AttemptAnswer]) 목록을 메모리에서 먼저 합산한 뒤
+    문제 / QuizSet / 점수 구간마다 F() UPDATE 한 번씩으로 카운터에 더한다.
+    attempts.write_attempts 와 같은 트랜잭션 안에서 호출된다. 행 잠금 순서를 reconcile 과 맞추도록 id 순으로 갱신한다.
+    """
+    question_deltas = defaultdict(lambda: [0, 0])
+    quizset_deltas = defaultdict(lambda: [0, 0, 0])
+    bucket_deltas = Counter()
+
+    for attempt, answers in entries:
+        for answer in answers:
+            delta = question_deltas[answer.question_id]
+            delta[0] += 1
+            delta[1] += int(answer.is_correct)
+
+        if attempt.kind != 'quizset':
+            continue
+        delta = quizset_deltas[attempt.quiz_set_id]
+        delta[0] += 1
+        delta[1] += attempt.total_correct
+        delta[2] += attempt.total_questions
+        bucket_deltas[(attempt.quiz_set_id, score_bucket(attempt.total_correct, attempt.total_questions))] += 1
+
+    for question_id, (attempts, correct) in sorted(question_deltas.items()):
+        _increment(
+            QuestionStats, {'question_id': question_id},
+            attempt_count=attempts, correct_count=correct,
+        )
+    for quizset_id, (attempts, correct_sum, questions_sum) in sorted(quizset_deltas.items()):
+        _increment(
+            QuizSetStats, {'quiz_set_id': quizset_id},
+            attempt_count=attempts, total_correct_sum=correct_sum, total_questions_sum=questions_sum,
+        )
+    for (quizset_id, bucket), count in sorted(bucket_deltas.items()):
+        _increment(QuizSetScoreBucket, {'quiz_set_id': quizset_id, 'bucket': bucket}, count=count)
+
+
+def _increment(model, lookup, **deltas):
+    """카운터 행에 F() 로 더하고, 행이 없으면 만든다 (동시 생성 시 다시 UPDATE)"""
+    updates = {field: F(field) + value for field, value in deltas.items()}
+    if model.objects.filter(**lookup).update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **deltas)
+    except IntegrityError:
+        model.objects.filter(**lookup).update(**updates)
+
+
+def get_quizset_stats(quizset_id):
+    """카운터 테이블만 읽어 /api/quizsets/{id}/stats/ 응답을 만든다 (채점 기록 테이블은 읽지 않음)"""
+    quizset_stats = QuizSetStats.objects.filter(quiz_set_id=quizset_id).first()
+    buckets = dict(
+        QuizSetScoreBucket.objects.filter(quiz_set_id=quizset_id).values_list('bucket', 'count')
+    )
+    question_stats = (
+        QuestionStats.objects.filter(question__quiz_set_id=quizset_id)
+        .order_by('question_id').values_list('question_id', 'attempt_count', 'correct_count')
+    )
+
+    attempt_count = quizset_stats.attempt_count if quizset_stats else 0
+    questions_sum = quizset_stats.total_questions_sum if quizset_stats else 0
+    correct_sum = quizset_stats.total_correct_sum if quizset_stats else 0
+    return {
+        "quizset_id": int(quizset_id),
+        "attempt_count": attempt_count,
+        "average_correct_rate": correct_sum / questions_sum if questions_sum else None,
+        "score_histogram": [
+            {
+                "bucket": bucket,
+                "min_rate": bucket / BUCKET_COUNT,
+                "max_rate": (bucket + 1) / BUCKET_COUNT,
+                "count": buckets.get(bucket, 0),
+            }
+            for bucket in range(BUCKET_COUNT)
+        ],
+        "questions": [
+            {
+                "question_id": question_id,
+                "attempt_count": attempts,
+                "correct_count": correct,
+                "correct_rate": correct / attempts if attempts else None,
+            }
+            for question_id, attempts, correct in question_stats
+        ],
+    }
+
+
+def _lock_counters(model, field, ids):
+    """
+    ids 의 카운터 행을 (없으면 0 으로 만든 뒤) SELECT ... FOR UPDATE 로 잠근다.
+    채점 기록을 저장하는 트랜잭션은 같은 행을 F() 로 갱신해야 커밋할 수 있으므로, 잠금 이후의 집계에는
+    이미 커밋된 기록만 빠짐없이 들어가고 아직 커밋되지 않은 기록은 재계산이 끝난 뒤 자기 delta 를 더한다.
+    """
+    model.objects.bulk_create([model(**{field: pk}) for pk in ids], ignore_conflicts=True)
+    list(model.objects.select_for_update().filter(**{f'{field}__in': ids}).order_by(field).values_list(field, flat=True))
+
+
+def rebuild_question_stats(chunk_size=RECONCILE_CHUNK_SIZE):
+    """
+    AttemptAnswer 원본에서 QuestionStats 를 question id 구간(chunk) 단위로 다시 계산. 처리한 문제 수 반환.
+    chunk 마다 카운터 잠금 -> 집계 -> 덮어쓰기를 한 트랜잭션에서 하므로 그 사이 저장되는 기록이 빠지거나 두 번 세어지지 않는다.
+    """
+    processed = 0
+    last_pk = 0
+    while True:
+        question_ids = list(
+            Question.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:chunk_size]
+        )
+        if not question_ids:
+            return processed
+        last_pk = question_ids[-1]
+
+        with transaction.atomic():
+            _lock_counters(QuestionStats, 'question_id', question_ids)
+            rows = {
+                row['question_id']: row
+                for row in AttemptAnswer.objects.filter(question_id__in=question_ids)
+                .values('question_id')
+                .annotate(attempts=Count('id'), correct=Count('id', filter=Q(is_correct=True)))
+            }
+            QuestionStats.objects.bulk_update([
+                QuestionStats(
+                    question_id=question_id,
+                    attempt_count=rows[question_id]['attempts'] if question_id in rows else 0,
+                    correct_count=rows[question_id]['correct'] if question_id in rows else 0,
+                )
+                for question_id in question_ids
+            ], ['attempt_count', 'correct_count'])
+        processed += len(question_ids)
+
+
+def rebuild_quizset_stats(chunk_size=RECONCILE_CHUNK_SIZE):
+    """
+    Attempt 원본에서 QuizSetStats / 점수 분포를 quizset id 구간(chunk) 단위로 다시 계산. 처리한 QuizSet 수 반환.
+    점수 구간은 QuizSetStats 를 갱신한 뒤에 갱신되므로 QuizSetStats 잠금만으로 그 사이 저장되는 기록과 겹치지 않는다.
+    """
+    processed = 0
+    last_pk = 0
+    while True:
+        quizset_ids = list(
+            QuizSet.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:chunk_size]
+        )
+        if not quizset_ids:
+            return processed
+        last_pk = quizset_ids[-1]
+
+        with transaction.atomic():
+            _lock_counters(QuizSetStats, 'quiz_set_id', quizset_ids)
+
+            totals = defaultdict(lambda: [0, 0, 0])
+            buckets = Counter()
+            attempts = (
+                Attempt.objects.filter(quiz_set_id__in=quizset_ids, kind='quizset')
+                .values_list('quiz_set_id', 'total_correct', 'total_questions')
+                .iterator(chunk_size=chunk_size)
+            )
+            for quizset_id, total_correct, total_questions in attempts:
+                total = totals[quizset_id]
+                total[0] += 1
+                total[1] += total_correct
+                total[2] += total_questions
+                buckets[(quizset_id, score_bucket(total_correct, total_questions))] += 1
+
+            QuizSetStats.objects.bulk_update([
+                QuizSetStats(
+                    quiz_set_id=quizset_id, attempt_count=totals[quizset_id][0],
+                    total_correct_sum=totals[quizset_id][1], total_questions_sum=totals[quizset_id][2],
+                )
+                for quizset_id in quizset_ids
+            ], ['attempt_count', 'total_correct_sum', 'total_questions_sum'])
+            QuizSetScoreBucket.objects.filter(quiz_set_id__in=quizset_ids).delete()
+            QuizSetScoreBucket.objects.bulk_create([
+                QuizSetScoreBucket(quiz_set_id=quizset_id, bucket=bucket, count=count)
+                for (quizset_id, bucket), count in sorted(buckets.items())
+            ])
+        processed += len(quizset_ids)
@@ -1,3 +1,1003 @@
-from django.test import TestCase
+import gzip
+import importlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+from decimal import Decimal
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from . import search
+from .compression import brotli, choose_encoding
+from .daily import daily_cache
+from .export import stream_export
+from .grading import answer_key_cache
+from .ingest import LocalSource, ingest
+from .metrics import RequestSample, sample_buffer, summarize
+from .models import (
+    Attempt, AttemptAnswer, Choice, IngestedFile, Question, QuestionStats, QuizSet, QuizSetScoreBucket, QuizSetStats,
+    ReviewState,
+)
+from .renderers import ORJSONParser, ORJSONRenderer
+from .replicas import replica_reads
+from .review import MIN_EASE, schedule
+from .search import search_questions
+from .sampling import sampling_index
+from .stats import score_bucket
+
+
+def create_quizset(question_count=3, choice_count=4, category='OS'):
+    """선택지 choice_count 개(첫 번째가 정답)를 가진 문제 question_count 개짜리 QuizSet"""
+    quizset = QuizSet.objects.create(title=f'{category} set', category=category)
+    for index in range(question_count):
+        question = Question.objects.create(quiz_set=quizset, question_text=f'Question {index + 1}')
+        Choice.objects.bulk_create(
+            Choice(question=question, text=f'Choice {order}', order=order, is_correct=order == 1)
+            for order in range(1, choice_count + 1)
+        )
+    return quizset
+
+
+class QuizAPITestCase(TestCase):
+    """프로세스 로컬 캐시(정답표, 개수 / 오늘의 문제 캐시, 무작위 추출 인덱스) 를 테스트마다 비운다"""
+
+    def setUp(self):
+        caches['default'].clear()
+        answer_key_cache.clear()
+        sampling_index.reset()
+
+
+@override_settings(QUIZ_ATTEMPT_BUFFER={'ENABLED': False})
+class QuestionListTests(QuizAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.quizset = create_quizset()
+        self.url = f'/api/quizsets/{self.quizset.pk}/questions/'
+
+    def test_list_is_served_from_snapshot(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.json()['total_question_count'], 3)
+        self.assertEqual(len(first.json()['questions'][0]['choices']), 4)
+
+        # 버전 조회 1회 + 스냅샷 조회 1회
+        with self.assertNumQueries(2):
+            second = self.client.get(self.url)
+        self.assertEqual(second.json(), first.json())
+
+    def test_not_modified(self):
+        # 스냅샷이 생긴 뒤부터 ETag 가 붙는다
+        self.client.get(self.url)
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_play_mode_hides_answers(self):
+        response = self.client.get(self.url, {'mode': 'play'})
+        question = response.json()['questions'][0]
+        self.assertNotIn('explanation', question)
+        self.assertNotIn('is_correct', question['choices'][0])
+
+    def test_paginated_list(self):
+        self.client.get(self.url)
+        # 버전 조회, 문제 페이지, 선택지 prefetch, 전체 개수 (이후 요청은 캐시)
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url, {'page_size': 2})
+        body = response.json()
+        self.assertEqual(len(body['questions']), 2)
+        self.assertEqual(body['total_question_count'], 3)
+        self.assertIsNotNone(body['next'])
+
+        with self.assertNumQueries(3):
+            last_page = self.client.get(body['next'])
+        self.assertEqual(len(last_page.json()['questions']), 1)
+        self.assertIsNone(last_page.json()['next'])
+
+    def test_etag_differs_per_page_and_representation(self):
+        self.client.get(self.url)
+        etags = {
+            self.client.get(self.url, params)['ETag']
+            for params in ({}, {'page_size': 1}, {'page_size': 2}, {'mode': 'play'}, {'fields': 'id'})
+        }
+        self.assertEqual(len(etags), 5)
+
+
+@override_settings(QUIZ_ATTEMPT_BUFFER={'ENABLED': False})
+class SubmitTests(QuizAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.quizset = create_quizset()
+        self.questions = list(self.quizset.questions.order_by('pk'))
+        self.correct = {
+            question.pk: question.choices.get(is_correct=True).pk for question in self.questions
+        }
+
+    def submit_url(self, question):
+        return f'/api/quizsets/{self.quizset.pk}/questions/{question.pk}/submit/'
+
+    def test_submit(self):
+        question = self.questions[0]
+        # 문제 + 선택지 prefetch, 정답표, Attempt / AttemptAnswer 저장, 문제 통계 UPDATE + INSERT (+ savepoint)
+        with self.assertNumQueries(11):
+            response = self.client.post(
+                self.submit_url(question), {'choice_ids': [self.correct[question.pk]]}, content_type='application/json'
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['is_correct'])
+        self.assertEqual(response.json()['correct_choice_ids'], [self.correct[question.pk]])
+
+        attempt = Attempt.objects.get(pk=response.json()['attempt_id'])
+        self.assertEqual((attempt.kind, attempt.total_correct), ('question', 1))
+        self.assertEqual(QuestionStats.objects.get(question=question).attempt_count, 1)
+
+    def test_submit_wrong_answer(self):
+        question = self.questions[0]
+        wrong = question.choices.get(order=2).pk
+        response = self.client.post(self.submit_url(question), {'choice_ids': [wrong]}, content_type='application/json')
+        self.assertFalse(response.json()['is_correct'])
+        self.assertEqual(QuestionStats.objects.get(question=question).correct_count, 0)
+
+    def test_submit_accepts_mixed_choice_id_types(self):
+        question = self.questions[0]
+        response = self.client.post(
+            self.submit_url(question), {'choice_ids': [self.correct[question.pk], 'x']}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.json()['is_correct'])
+        answer = AttemptAnswer.objects.get(attempt_id=response.json()['attempt_id'])
+        self.assertEqual(answer.choice_ids, [self.correct[question.pk], 'x'])
+
+    def test_submit_all(self):
+        answers = [
+            {'question_id': self.questions[0].pk, 'choice_ids': [self.correct[self.questions[0].pk]]},
+            {'question_id': self.questions[1].pk, 'choice_ids': [self.correct[self.questions[1].pk]]},
+            {'question_id': self.questions[2].pk, 'choice_ids': []},
+        ]
+        url = f'/api/quizsets/{self.quizset.pk}/submit_all/'
+        # 정답표 1회 + 저장: Attempt, AttemptAnswer, 카운터(문제 3 / QuizSet / 점수 구간) 행이 없어 UPDATE + INSERT (+ savepoint)
+        with self.assertNumQueries(25):
+            response = self.client.post(url, {'answers': answers}, content_type='application/json')
+        body = response.json()
+        self.assertEqual((body['total_questions'], body['total_correct']), (3, 2))
+        self.assertEqual([result['is_correct'] for result in body['results']], [True, True, False])
+
+        # 두 번째 제출은 캐시된 정답표로 채점하고 카운터는 UPDATE 만 (Attempt, AttemptAnswer, UPDATE 5회 + savepoint)
+        with self.assertNumQueries(9):
+            self.client.post(url, {'answers': answers}, content_type='application/json')
+        stats = QuizSetStats.objects.get(quiz_set=self.quizset)
+        self.assertEqual((stats.attempt_count, stats.total_correct_sum, stats.total_questions_sum), (2, 4, 6))
+
+    def test_submit_all_unknown_quizset(self):
+        response = self.client.post('/api/quizsets/999999/submit_all/', {'answers': []}, content_type='application/json')
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(QUIZ_ATTEMPT_BUFFER={'ENABLED': False})
+class StatsTests(QuizAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.quizset = create_quizset()
+        self.questions = list(self.quizset.questions.order_by('pk'))
+
+    def submit_all(self, correct_count):
+        answers = [
+            {'question_id': question.pk, 'choice_ids': [question.choices.get(order=1 if index < correct_count else 2).pk]}
+            for index, question in enumerate(self.questions)
+        ]
+        response = self.client.post(
+            f'/api/quizsets/{self.quizset.pk}/submit_all/', {'answers': answers}, content_type='application/json'
+        )
+        self.assertEqual(response.json()['total_correct'], correct_count)
+
+    def stats(self):
+        return self.client.get(f'/api/quizsets/{self.quizset.pk}/stats/').json()
+
+    def test_score_bucket(self):
+        self.assertEqual(
+            [score_bucket(correct, 10) for correct in (0, 1, 5, 9, 10)], [0, 1, 5, 9, 9]
+        )
+        self.assertEqual(score_bucket(1, 3), 3)
+        self.assertEqual(score_bucket(2, 3), 6)
+        self.assertEqual(score_bucket(0, 0), 0)
+
+    def test_counters_accumulate(self):
+        self.submit_all(3)
+        self.submit_all(1)
+        self.submit_all(1)
+
+        stats = self.stats()
+        self.assertEqual(stats['attempt_count'], 3)
+        self.assertAlmostEqual(stats['average_correct_rate'], 5 / 9)
+        histogram = {bucket['bucket']: bucket['count'] for bucket in stats['score_histogram'] if bucket['count']}
+        self.assertEqual(histogram, {3: 2, 9: 1})
+        self.assertEqual(
+            [(question['attempt_count'], question['correct_count']) for question in stats['questions']],
+            [(3, 3), (3, 1), (3, 1)]
+        )
+
+    def test_reconcile_rebuilds_counters(self):
+        self.submit_all(2)
+        self.submit_all(0)
+        expected = self.stats()
+
+        QuestionStats.objects.update(attempt_count=99, correct_count=0)
+        QuizSetStats.objects.all().delete()
+        QuizSetScoreBucket.objects.create(quiz_set=self.quizset, bucket=5, count=7)
+        self.assertNotEqual(self.stats(), expected)
+
+        call_command('reconcile_quiz_stats', chunk_size=1, stdout=io.StringIO())
+        self.assertEqual(self.stats(), expected)
+
+        # 재계산한 카운터에 이후 기록이 F() 로 그대로 더해진다
+        self.submit_all(3)
+        self.assertEqual(self.stats()['attempt_count'], 3)
+        self.assertEqual(QuestionStats.objects.get(question=self.questions[0]).correct_count, 2)
+
+    def test_reconcile_zeroes_counters_without_attempts(self):
+        self.submit_all(3)
+        Attempt.objects.all().delete()
+
+        call_command('reconcile_quiz_stats', stdout=io.StringIO())
+        stats = self.stats()
+        self.assertEqual(stats['attempt_count'], 0)
+        self.assertEqual(sum(bucket['count'] for bucket in stats['score_histogram']), 0)
+        self.assertEqual({question['attempt_count'] for question in stats['questions']}, {0})
+
+
+@override_settings(QUIZ_ATTEMPT_BUFFER={'ENABLED': False})
+class BatchSubmitTests(QuizAPITestCase):
+    url = '/api/submissions/batch/'
+
+    def setUp(self):
+        super().setUp()
+        self.quizset = create_quizset()
+        # 답안을 문제 역순으로 보내 저장 순서와 pk 순서가 같은지 확인한다
+        self.answers = [
+            {'question_id': question.pk, 'choice_ids': [question.choices.get(is_correct=True).pk]}
+            for question in self.quizset.questions.order_by('-pk')
+        ]
+
+    def post(self, *submissions):
+        return self.client.post(self.url, {'submissions': list(submissions)}, content_type='application/json').json()
+
+    def submission(self, user_ref='', key='k-1'):
+        return {'user_ref': user_ref, 'quizset_id': self.quizset.pk, 'answers': self.answers, 'idempotency_key': key}
+
+    def test_resend_replays_first_result(self):
+        first = self.post(self.submission('student-01'))['results'][0]
+        self.assertEqual(first['status'], 'graded')
+
+        again = self.post(self.submission('student-01'))['results'][0]
+        self.assertEqual(again['status'], 'duplicate')
+        self.assertEqual(again['attempt_id'], first['attempt_id'])
+        self.assertEqual(again['results'], first['results'])
+        self.assertEqual(Attempt.objects.count(), 1)
+
+    def test_key_is_scoped_per_user_ref(self):
+        body = self.post(self.submission('student-01'), self.submission('student-02'), self.submission('student-01'))
+        self.assertEqual([result['status'] for result in body['results']], ['graded', 'graded', 'duplicate'])
+        self.assertEqual(Attempt.objects.count(), 2)
+
+    def test_key_is_scoped_per_user(self):
+        User = get_user_model()
+        self.client.force_login(User.objects.create_user('alice'))
+        self.assertEqual(self.post(self.submission())['results'][0]['status'], 'graded')
+        self.client.force_login(User.objects.create_user('bob'))
+        self.assertEqual(self.post(self.submission())['results'][0]['status'], 'graded')
+        self.assertEqual(set(Attempt.objects.values_list('idempotency_scope', flat=True)), {
+            f'user:{pk}' for pk in User.objects.values_list('pk', flat=True)
+        })
+
+    def test_anonymous_key_requires_user_ref(self):
+        result = self.post(self.submission())['results'][0]
+        self.assertEqual(result['status'], 'error')
+        self.assertIn('idempotency_key', result['errors'])
+        self.assertFalse(Attempt.objects.exists())
+
+
+class BulkImportTests(QuizAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.quizset = create_quizset(question_count=0)
+        self.url = f'/api/quizsets/{self.quizset.pk}/questions/bulk/'
+
+    def test_bulk_saves_valid_items_and_reports_errors(self):
+        items = [
+            {'question_text': f'Imported {index}', 'choices': [{'text': 'A', 'is_correct': True}, {'text': 'B'}]}
+            for index in range(5)
+        ]
+        items.insert(2, {'question_text': 'No choices', 'choices': []})
+        # QuizSet 확인, savepoint, Question / Choice bulk_create
+        with self.assertNumQueries(5):
+            response = self.client.post(self.url, {'questions': items}, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        body = response.json()
+        self.assertEqual(body['created_count'], 5)
+        self.assertEqual([error['index'] for error in body['errors']], [2])
+        self.assertEqual(Choice.objects.filter(question__quiz_set=self.quizset).count(), 10)
+        self.assertEqual(
+            list(Choice.objects.filter(question_id=body['created_ids'][0]).values_list('order', 'is_correct')),
+            [(1, True), (2, False)]
+        )
+
+    def test_bulk_without_returning_inserts(self):
+        # MySQL 처럼 bulk INSERT 가 PK 를 돌려주지 않고 연속 PK 도 보장되지 않으면 한 행씩 INSERT 한다
+        items = [
+            {'question_text': 'Same text', 'choices': [{'text': f'A{index}', 'is_correct': True}, {'text': 'B'}]}
+            for index in range(3)
+        ]
+        with mock.patch.object(
+            type(connection.features), 'can_return_rows_from_bulk_insert', new_callable=mock.PropertyMock, return_value=False
+        ):
+            response = self.client.post(self.url, {'questions': items}, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        created_ids = response.json()['created_ids']
+        self.assertEqual(
+            [Choice.objects.get(question_id=pk, is_correct=True).text for pk in created_ids], ['A0', 'A1', 'A2']
+        )
+
+    def test_bulk_unknown_quizset(self):
+        response = self.client.post('/api/quizsets/999999/questions/bulk/', {'questions': []}, content_type='application/json')
+        self.assertEqual(response.status_code, 404)
+
+
+class ChoiceSyncTests(QuizAPITestCase):
+    """PUT 으로 선택지를 고칠 때 id 를 유지하면서 (question, order) unique 제약을 넘지 않는지"""
+
+    def setUp(self):
+        super().setUp()
+        self.quizset = create_quizset(question_count=1)
+        self.question = self.quizset.questions.get()
+        self.url = f'/api/quizsets/{self.quizset.pk}/questions/{self.question.pk}/'
+        self.ids = list(self.question.choices.order_by('order').values_list('pk', flat=True))
+
+    def put(self, choices):
+        return self.client.put(self.url, {
+            'quiz_set': self.quizset.pk,
+            'question_text': self.question.question_text,
+            'choices': [{'order': order, 'is_correct': False, **choice} for order, choice in enumerate(choices, 1)],
+        }, content_type='application/json')
+
+    def keep(self, *indexes):
+        return [{'id': self.ids[index], 'text': f'Choice {index + 1}', 'is_correct': index == 0} for index in indexes]
+
+    def assertChoices(self, response, expected):
+        """expected: (id 또는 None, text) 목록. order 는 1부터 순서대로여야 한다"""
+        self.assertEqual(response.status_code, 200, response.content)
+        rows = list(self.question.choices.order_by('order').values_list('order', 'pk', 'text'))
+        self.assertEqual([order for order, _, _ in rows], list(range(1, len(expected) + 1)))
+        self.assertEqual([text for _, _, text in rows], [text for _, text in expected])
+        for (_, pk, _), (expected_id, _) in zip(rows, expected):
+            if expected_id is None:
+                self.assertNotIn(pk, self.ids)
+            else:
+                self.assertEqual(pk, expected_id)
+        self.assertEqual(
+            [(choice['id'], choice['order']) for choice in response.json()['choices']],
+            [(pk, order) for order, pk, _ in rows]
+        )
+
+    def expected(self, *indexes):
+        return [(self.ids[index], f'Choice {index + 1}') for index in indexes]
+
+    def test_swap(self):
+        self.assertChoices(self.put(self.keep(1, 0, 2, 3)), self.expected(1, 0, 2, 3))
+
+    def test_rotate(self):
+        self.assertChoices(self.put(self.keep(3, 0, 1, 2)), self.expected(3, 0, 1, 2))
+        self.assertChoices(self.put(self.keep(1, 2, 3, 0)), self.expected(1, 2, 3, 0))
+
+    def test_remove_first(self):
+        self.assertChoices(self.put(self.keep(1, 2, 3)), self.expected(1, 2, 3))
+        self.assertFalse(Choice.objects.filter(pk=self.ids[0]).exists())
+
+    def test_remove_middle_and_reorder(self):
+        self.assertChoices(self.put(self.keep(3, 0, 2)), self.expected(3, 0, 2))
+
+    def test_append_and_prepend(self):
+        response = self.put(self.keep(0, 1, 2, 3) + [{'text': 'Appended'}])
+        self.assertChoices(response, self.expected(0, 1, 2, 3) + [(None, 'Appended')])
+
+        # id 없는 선택지는 order 로 짝짓지만, 그 자리의 Choice 1 은 id 로 보냈으므로 새로 만든다
+        response = self.put([{'text': 'Prepended'}] + self.keep(0, 1, 2, 3))
+        self.assertChoices(response, [(None, 'Prepended')] + self.expected(0, 1, 2, 3))
+
+    def test_unchanged_put_sends_no_choice_writes(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertChoices(self.put(self.keep(0, 1, 2, 3)), self.expected(0, 1, 2, 3))
+        self.assertFalse([
+            query for query in queries.captured_queries
+            if 'quiz_choice' in query['sql'] and not query['sql'].startswith('SELECT')
+        ])
+
+    def test_unknown_or_duplicate_id_is_rejected(self):
+        other = create_quizset(question_count=1).questions.get().choices.first()
+        response = self.put(self.keep(0, 1) + [{'id': other.pk, 'text': 'Foreign'}])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('choices', response.json())
+
+        response = self.put(self.keep(0, 0))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(self.question.choices.order_by('order').values_list('pk', flat=True)), self.ids)
+
+
+class DailyQuestionTests(QuizAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.quizset = create_quizset(category='NET')
+
+    def test_daily_question_is_cached(self):
+        first = self.client.get('/api/daily/', {'category': 'NET'})
+        self.assertEqual(first.status_code, 200)
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/daily/', {'category': 'NET'})
+        self.assertEqual(second.json(), first.json())
+
+    @override_settings(QUIZ_DAILY_CACHE_TIMEOUT=30)
+    def test_cache_timeout_is_bounded(self):
+        # 다른 워커의 무효화가 닿지 않는 캐시라도 이 시간 안에 다시 만든다
+        with mock.patch.object(daily_cache(), 'set', wraps=daily_cache().set) as cache_set:
+            self.client.get('/api/daily/', {'category': 'NET'})
+        self.assertLessEqual(cache_set.call_args.args[2], 30)
+
+    def test_deleted_question_is_replaced(self):
+        question_id = self.client.get('/api/daily/', {'category': 'NET'}).json()['question']['id']
+        self.client.delete(f'/api/quizsets/{self.quizset.pk}/questions/{question_id}/')
+        response = self.client.get('/api/daily/', {'category': 'NET'})
+        self.assertNotEqual(response.json()['question']['id'], question_id)
+
+
+class SamplingTests(QuizAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.quizset = create_quizset(question_count=5, category='DB')
+
+    def sample_ids(self):
+        response = self.client.get('/api/questions/sample/', {'category': 'DB', 'count': 10})
+        return {question['id'] for question in response.json()['questions']}
+
+    def test_sample_returns_unique_questions(self):
+        self.assertEqual(self.sample_ids(), set(self.quizset.questions.values_list('pk', flat=True)))
+
+    @override_settings(QUIZ_SAMPLING_INDEX_TTL=60)
+    def test_index_expires_without_version_bump(self):
+        self.sample_ids()
+        # 다른 워커에서 추가되어 이 워커의 version 은 그대로인 문제
+        added = Question.objects.create(quiz_set=self.quizset, question_text='Added elsewhere')
+        self.assertNotIn(added.pk, self.sample_ids())
+
+        now = time.monotonic()
+        with mock.patch('quiz.sampling.time.monotonic', return_value=now + 61):
+            self.assertIn(added.pk, self.sample_ids())
+
+    def test_write_rebuilds_only_its_category(self):
+        other = create_quizset(question_count=2, category='NET')
+        self.sample_ids()
+        self.client.get('/api/questions/sample/', {'category': 'NET'})
+
+        response = self.client.post(
+            f'/api/quizsets/{self.quizset.pk}/questions/',
+            {'quiz_set': self.quizset.pk, 'question_text': 'New', 'choices': [
+                {'text': 'A', 'order': 1, 'is_correct': True}, {'text': 'B', 'order': 2, 'is_correct': False},
+            ]},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 201)
+        with mock.patch.object(sampling_index, '_build', wraps=sampling_index._build) as build:
+            self.assertIn(response.json()['id'], self.sample_ids())
+            self.client.get('/api/questions/sample/', {'category': 'NET'})
+        self.assertEqual([call.args for call in build.call_args_list], [('DB',)])
+        self.assertEqual(len(sampling_index.ids('NET')), other.questions.count())
+
+    def test_category_change_moves_questions(self):
+        self.sample_ids()
+        response = self.client.patch(
+            f'/api/quizsets/{self.quizset.pk}/', {'category': 'NET'}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.sample_ids(), set())
+        self.assertEqual(len(sampling_index.ids('NET')), 5)
+
+    def test_reset_between_lookups(self):
+        self.assertEqual(len(sampling_index.ids('DB')), 5)
+        sampling_index.reset()
+        self.assertEqual(len(sampling_index.ids('DB')), 5)
+        self.assertEqual(sampling_index.ids('OS'), ())
+
+
+class IngestTests(TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.source = LocalSource(self.root, 'cs-question/')
+        os.makedirs(os.path.join(self.root, 'cs-question'))
+
+    def write(self, name, data):
+        with open(os.path.join(self.root, 'cs-question', name), 'w') as fp:
+            json.dump(data, fp)
+
+    def valid(self, text):
+        return {'topic': 'OS', 'question': text, 'answer': 'A', 'selections': ['A', 'B', 'C', 'D']}
+
+    def test_invalid_files_are_skipped_and_the_run_continues(self):
+        self.write('q-2024-01-01-00-00-00.json', self.valid('First'))
+        self.write('q-2024-01-01-00-00-01.json', {'topic': 'OS', 'question': 42, 'answer': ['A'], 'selections': ['A', 'B']})
+        self.write('q-2024-01-01-00-00-02.json', self.valid('Second'))
+
+        self.assertEqual(ingest(self.source), {'ingested': 2, 'skipped': 1})
+        skipped = IngestedFile.objects.get(status='skipped')
+        self.assertEqual(skipped.key, 'cs-question/q-2024-01-01-00-00-01.json')
+        self.assertIn('must be strings', skipped.detail)
+        self.assertEqual(
+            sorted(Question.objects.values_list('question_text', flat=True)), ['First', 'Second']
+        )
+
+        # 이미 적재했거나 건너뛴 파일은 다시 읽지 않는다
+        self.assertEqual(ingest(self.source), {'ingested': 0, 'skipped': 0})
+        self.assertEqual(Question.objects.count(), 2)
+
+    @override_settings(QUIZ_INGEST_LOOKBACK=2)
+    def test_listing_starts_after_watermark_with_bounded_lookback(self):
+        for second in range(5):
+            self.write(f'q-2024-01-01-00-00-0{second}.json', self.valid(f'Question {second}'))
+        self.assertEqual(ingest(self.source), {'ingested': 5, 'skipped': 0})
+
+        # 동시 업로드가 늦게 끝난 파일: 워터마크보다 작지만 lookback 안의 key 는 적재한다
+        self.write('q-2024-01-01-00-00-03_500000.json', self.valid('Late upload'))
+        with mock.patch.object(self.source, 'list_keys', wraps=self.source.list_keys) as list_keys:
+            self.assertEqual(ingest(self.source), {'ingested': 1, 'skipped': 0})
+        list_keys.assert_called_once_with(start_after='cs-question/q-2024-01-01-00-00-02.json')
+
+        # lookback 보다 오래된 key 는 다시 나열하지 않는다
+        self.write('q-2024-01-01-00-00-00_500000.json', self.valid('Too late'))
+        self.assertEqual(ingest(self.source), {'ingested': 0, 'skipped': 0})
+        self.assertEqual(IngestedFile.objects.count(), 6)
+
+    def test_local_source_lists_keys_after_start_after(self):
+        for name in ('q-2024-01-01-00-00-00.json', 'q-2024-01-01-00-00-01.json', 'q-2024-01-01-00-00-02.json', 'notes.txt'):
+            self.write(name, {})
+        self.assertEqual(
+            self.source.list_keys(start_after='cs-question/q-2024-01-01-00-00-00.json'),
+            ['cs-question/q-2024-01-01-00-00-01.json', 'cs-question/q-2024-01-01-00-00-02.json']
+        )
+
+
+@override_settings(
+    QUIZ_ATTEMPT_BUFFER={'ENABLED': False},
+    QUIZ_DB_REPLICAS={'ALIASES': ['replica'], 'GRADING_READS': 'primary'},
+)
+class ReplicaRoutingTests(QuizAPITestCase):
+    # 'replica' 는 primary 를 복제하지 않는 별도 테스트 DB 라 어느 쪽에서 읽었는지 데이터로 구분된다
+    databases = {'default', 'replica'}
+
+    def test_safe_requests_read_from_replica(self):
+        quizset = QuizSet.objects.using('replica').create(title='Replica only', category='OS')
+
+        with CaptureQueriesContext(connections['default']) as primary:
+            response = self.client.get(f'/api/quizsets/{quizset.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['title'], 'Replica only')
+        self.assertEqual(len(primary), 0)
+
+    def test_submit_reads_and_writes_primary(self):
+        quizset = create_quizset(question_count=1)
+        question = quizset.questions.get()
+        correct = question.choices.get(is_correct=True).pk
+
+        with CaptureQueriesContext(connections['replica']) as replica:
+            response = self.client.post(
+                f'/api/quizsets/{quizset.pk}/questions/{question.pk}/submit/',
+                {'choice_ids': [correct]}, content_type='application/json',
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(replica), 0)
+        self.assertTrue(Attempt.objects.using('default').filter(pk=response.json()['attempt_id']).exists())
+        self.assertFalse(Attempt.objects.using('replica').exists())
+
+    def test_reads_after_write_stick_to_primary(self):
+        with replica_reads():
+            self.assertEqual(QuizSet.objects.all().db, 'replica')
+            quizset = QuizSet.objects.create(title='Written', category='NET')
+            self.assertEqual(QuizSet.objects.all().db, 'default')
+            self.assertTrue(QuizSet.objects.filter(pk=quizset.pk).exists())
+        self.assertFalse(QuizSet.objects.using('replica').filter(pk=quizset.pk).exists())
+
+
+class MetricsTests(QuizAPITestCase):
+    url = '/api/_metrics'
+
+    def setUp(self):
+        super().setUp()
+        sample_buffer.clear()
+        self.addCleanup(sample_buffer.clear)
+        self.quizset = create_quizset()
+
+    @override_settings(DEBUG=True)
+    def test_metrics_are_admin_only(self):
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        self.client.force_login(get_user_model().objects.create_user('user'))
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        self.client.force_login(get_user_model().objects.create_user('admin', is_staff=True))
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    @override_settings(QUIZ_METRICS={'SAMPLE_RATE': 1.0, 'SERVER_TIMING': True})
+    def test_sampled_request_is_recorded(self):
+        url = f'/api/quizsets/{self.quizset.pk}/questions/'
+        self.client.get(url)
+        sample_buffer.clear()
+
+        # 스냅샷 적중: 버전 조회 + 스냅샷 조회
+        response = self.client.get(url)
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('desc="2 queries"', response['Server-Timing'])
+        self.assertIn('total;dur=', response['Server-Timing'])
+
+        [sample] = sample_buffer.snapshot()
+        self.assertEqual(sample.endpoint, 'GET quizset-questions-list')
+        self.assertEqual((sample.status, sample.query_count), (200, 2))
+        self.assertGreaterEqual(sample.total_ms, sample.db_ms)
+
+        self.client.force_login(get_user_model().objects.create_user('admin', is_staff=True))
+        summary = self.client.get(self.url).json()['endpoints']['GET quizset-questions-list']
+        self.assertEqual((summary['count'], summary['max_query_count']), (1, 2))
+
+    @override_settings(QUIZ_METRICS={'SAMPLE_RATE': 0.0})
+    def test_unsampled_request_is_not_recorded(self):
+        response = self.client.get(f'/api/quizsets/{self.quizset.pk}/questions/')
+        self.assertFalse(response.has_header('Server-Timing'))
+        self.assertEqual(sample_buffer.snapshot(), [])
+
+    def test_summarize_percentiles(self):
+        samples = []
+        for total_ms in range(1, 101):
+            sample = RequestSample()
+            sample.endpoint, sample.total_ms, sample.query_count = 'GET x', float(total_ms), total_ms % 3
+            samples.append(sample)
+        summary = summarize(samples)['GET x']
+        self.assertEqual((summary['count'], summary['max_query_count']), (100, 2))
+        self.assertEqual((summary['total_ms_p50'], summary['total_ms_p99']), (51.0, 99.0))
+
+
+class SearchTests(QuizAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.os_set = QuizSet.objects.create(title='OS set', category='OS')
+        self.db_set = QuizSet.objects.create(title='DB set', category='DB')
+
+    def add(self, quizset, text, explanation=''):
+        return Question.objects.create(quiz_set=quizset, question_text=text, explanation=explanation)
+
+    def ids(self, query, **filters):
+        questions, total = search_questions(query, **filters)
+        self.assertEqual(total, len(questions))
+        return [question.pk for question in questions]
+
+    def test_triggers_keep_index_in_sync(self):
+        question = self.add(self.os_set, 'Deadlock conditions')
+        self.assertEqual(self.ids('deadlock'), [question.pk])
+
+        question.question_text = 'Starvation and aging'
+        question.save()
+        self.assertEqual(self.ids('deadlock'), [])
+        self.assertEqual(self.ids('starvation'), [question.pk])
+
+        question.delete()
+        self.assertEqual(self.ids('starvation'), [])
+
+    def test_ranking_and_filters(self):
+        once = self.add(self.os_set, 'What is a process scheduler?')
+        twice = self.add(self.os_set, 'Process vs thread', 'A process owns its address space; each process has threads.')
+        other = self.add(self.db_set, 'Process of normalization')
+
+        self.assertEqual(self.ids('process')[0], twice.pk)
+        self.assertCountEqual(self.ids('process'), [once.pk, twice.pk, other.pk])
+        self.assertCountEqual(self.ids('process', category='OS'), [once.pk, twice.pk])
+        self.assertEqual(self.ids('process', quizset_id=self.db_set.pk), [other.pk])
+
+    def test_korean_prefix_and_fts_syntax(self):
+        question = self.add(self.os_set, '프로세스는 실행 중인 프로그램이다')
+        # 조사가 붙은 단어도 prefix 로 찾는다
+        self.assertEqual(self.ids('프로세스'), [question.pk])
+        # FTS5 연산자 / 따옴표는 검색어로만 취급한다
+        self.assertEqual(self.ids('프로세스" OR NOT *'), [])
+        self.assertEqual(search_questions('"*"'), ([], 0))
+
+    def test_like_fallback(self):
+        question = self.add(self.os_set, 'Virtual memory paging', 'Page tables map pages.')
+        self.add(self.db_set, 'Index paging in B-trees')
+        with mock.patch.dict(search.BACKENDS, clear=True):
+            self.assertEqual(self.ids('tables map'), [question.pk])
+            self.assertEqual(len(self.ids('paging')), 2)
+            self.assertEqual(self.ids('paging', category='OS'), [question.pk])
+
+    def test_migration_runs_statements_for_vendor(self):
+        migration = importlib.import_module('quiz.migrations.0007_question_fulltext_index')
+        forwards = migration._run({'mysql': migration.MYSQL_FORWARDS, 'sqlite': migration.SQLITE_FORWARDS})
+        for vendor, expected in [('mysql', migration.MYSQL_FORWARDS), ('postgresql', [])]:
+            schema_editor = mock.Mock()
+            schema_editor.connection.vendor = vendor
+            forwards(None, schema_editor)
+            self.assertEqual([call.args[0] for call in schema_editor.execute.call_args_list], expected)
+
+    def test_search_endpoint(self):
+        question = self.add(self.os_set, 'Context switch cost')
+        response = self.client.get('/api/questions/search/', {'q': 'context', 'category': 'OS'})
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual((body['count'], body['has_next']), (1, False))
+        self.assertEqual(body['results'][0]['id'], question.pk)
+        self.assertGreater(body['results'][0]['score'], 0)
+
+        self.assertEqual(self.client.get('/api/questions/search/', {'q': 'x'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/questions/search/', {'q': 'context', 'category': 'XX'}).status_code, 400)
+
+
+class ScheduleTests(SimpleTestCase):
+
+    def setUp(self):
+        self.state = ReviewState(user_id=1, question_id=1)
+        self.now = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+
+    def review(self, *answers):
+        for is_correct in answers:
+            schedule(self.state, is_correct, self.now)
+        return self.state
+
+    def test_correct_answers_grow_interval(self):
+        intervals = []
+        for _ in range(4):
+            intervals.append(self.review(True).interval_days)
+        # 품질 4 는 ease 를 바꾸지 않으므로 1일, 6일 이후 2.5 배씩
+        self.assertEqual(intervals, [1, 6, 15, 38])
+        self.assertAlmostEqual(self.state.ease, 2.5)
+        self.assertEqual(self.state.repetitions, 4)
+        self.assertEqual(self.state.due_at, self.now + timedelta(days=38))
+        self.assertEqual(self.state.last_reviewed_at, self.now)
+
+    def test_wrong_answer_resets_and_lowers_ease(self):
+        state = self.review(True, True, True, False)
+        self.assertEqual((state.repetitions, state.interval_days), (0, 1))
+        self.assertAlmostEqual(state.ease, 2.5 - 0.54)
+        # 다시 맞히면 1일, 6일부터 다시 시작하고 간격은 낮아진 ease 로 늘어난다
+        self.assertEqual([self.review(True).interval_days for _ in range(3)], [1, 6, round(6 * (2.5 - 0.54))])
+
+    def test_ease_floor(self):
+        state = self.review(*[False] * 5)
+        self.assertEqual(state.ease, MIN_EASE)
+        self.assertEqual(state.due_at, self.now + timedelta(days=1))
+
+
+@override_settings(QUIZ_ATTEMPT_BUFFER={'ENABLED': False})
+class ReviewQueueTests(QuizAPITestCase):
+    url = '/api/review/next'
+
+    def setUp(self):
+        super().setUp()
+        self.user = get_user_model().objects.create_user('learner')
+        self.quizset = create_quizset(question_count=4)
+        self.questions = list(self.quizset.questions.order_by('pk'))
+
+    def submit(self, question, is_correct):
+        choice = question.choices.get(order=1 if is_correct else 2)
+        self.client.post(
+            f'/api/quizsets/{self.quizset.pk}/questions/{question.pk}/submit/',
+            {'choice_ids': [choice.pk]}, content_type='application/json',
+        )
+
+    def test_submissions_schedule_reviews(self):
+        self.client.force_login(self.user)
+        self.submit(self.questions[0], True)
+        self.submit(self.questions[1], False)
+        self.submit(self.questions[1], True)
+
+        states = {state.question_id: state for state in ReviewState.objects.filter(user=self.user)}
+        self.assertEqual(set(states), {self.questions[0].pk, self.questions[1].pk})
+        self.assertEqual((states[self.questions[0].pk].repetitions, states[self.questions[0].pk].interval_days), (1, 1))
+        self.assertAlmostEqual(states[self.questions[1].pk].ease, 2.5 - 0.54)
+
+        # 익명 제출은 복습 상태를 만들지 않는다
+        self.client.logout()
+        self.submit(self.questions[2], True)
+        self.assertFalse(ReviewState.objects.filter(question=self.questions[2]).exists())
+
+    def test_queue_returns_due_reviews_oldest_first(self):
+        now = timezone.now()
+        due = {
+            self.questions[0]: now - timedelta(hours=1),
+            self.questions[1]: now - timedelta(days=3),
+            self.questions[2]: now + timedelta(days=1),
+            self.questions[3]: now - timedelta(days=1),
+        }
+        ReviewState.objects.bulk_create(
+            ReviewState(user=self.user, question=question, due_at=due_at, last_reviewed_at=now - timedelta(days=5))
+            for question, due_at in due.items()
+        )
+        other = get_user_model().objects.create_user('other')
+        ReviewState.objects.create(user=other, question=self.questions[0], due_at=now - timedelta(days=9), last_reviewed_at=now)
+
+        self.client.force_login(self.user)
+        body = self.client.get(self.url).json()
+        self.assertEqual(
+            [result['id'] for result in body['results']],
+            [self.questions[1].pk, self.questions[3].pk, self.questions[0].pk]
+        )
+        self.assertEqual(body['results'][0]['review']['repetitions'], 0)
+        self.assertEqual(len(body['results'][0]['choices']), 4)
+
+        limited = self.client.get(self.url, {'limit': 1}).json()
+        self.assertEqual([result['id'] for result in limited['results']], [self.questions[1].pk])
+        self.assertEqual(self.client.get(self.url, {'limit': 0}).status_code, 400)
+
+    def test_queue_requires_login(self):
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+
+class ExportTests(QuizAPITestCase):
+    url = '/api/export/questions.ndjson'
+
+    def setUp(self):
+        super().setUp()
+        self.first = create_quizset(question_count=3, category='OS')
+        self.second = create_quizset(question_count=2, category='Network')
+        self.admin = get_user_model().objects.create_user('admin', is_staff=True)
+
+    def parse(self, payload):
+        self.assertTrue(payload.endswith(b'\n'))
+        lines = payload.decode('utf-8').splitlines()
+        records = [json.loads(line) for line in lines]
+        self.assertTrue(all(isinstance(record, dict) for record in records))
+        return records
+
+    def test_records_are_one_json_object_per_line(self):
+        # chunk 경계와 버퍼 경계를 모두 넘도록 작은 값으로
+        with mock.patch('quiz.export.WRITE_BUFFER_SIZE', 64):
+            chunks = list(stream_export(chunk_size=2))
+        self.assertGreater(len(chunks), 1)
+        records = self.parse(b''.join(chunks))
+
+        self.assertEqual([record['id'] for record in records], list(Question.objects.order_by('pk').values_list('pk', flat=True)))
+        record = records[0]
+        self.assertEqual(record['quiz_set']['id'], self.first.pk)
+        self.assertEqual(record['quiz_set']['category'], 'OS')
+        self.assertEqual([choice['order'] for choice in record['choices']], [1, 2, 3, 4])
+        self.assertEqual([choice['is_correct'] for choice in record['choices']], [True, False, False, False])
+
+    def test_gzip_stream_decompresses_to_plain_export(self):
+        plain = b''.join(stream_export())
+        compressed = b''.join(stream_export(compress=True))
+        self.assertEqual(gzip.decompress(compressed), plain)
+        self.assertEqual(len(self.parse(plain)), 5)
+
+    def test_quizset_filter(self):
+        records = self.parse(b''.join(stream_export([self.second.pk])))
+        self.assertEqual({record['quiz_set']['id'] for record in records}, {self.second.pk})
+        self.assertEqual(len(records), 2)
+
+    def test_endpoint_is_admin_only(self):
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        self.client.force_login(get_user_model().objects.create_user('user'))
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_endpoint_streams_gzip(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(self.url, {'gzip': 1, 'quizset': self.first.pk})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertIn('questions.ndjson.gz', response['Content-Disposition'])
+        records = self.parse(gzip.decompress(b''.join(response.streaming_content)))
+        self.assertEqual({record['quiz_set']['id'] for record in records}, {self.first.pk})
+
+        response = self.client.get(self.url, {'quizset': 'x'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_command_writes_gzip_file(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        path = os.path.join(tmp, 'backup.ndjson.gz')
+        call_command('export_quiz_ndjson', output=path, gzip=True, chunk_size=2, stderr=io.StringIO())
+
+        with open(path, 'rb') as f:
+            records = self.parse(gzip.decompress(f.read()))
+        self.assertEqual(len(records), 5)
+        self.assertEqual(records, self.parse(b''.join(stream_export())))
+
+
+class RendererTests(SimpleTestCase):
+
+    def test_orjson_output_matches_json_renderer(self):
+        data = {
+            'id': 1,
+            'text': '운영체제 \u2028 "quoted" \\ <tag>',
+            'created_at': datetime(2024, 1, 2, 3, 4, 5, 678901, tzinfo=dt_timezone.utc),
+            'score': Decimal('12.50'),
+            'ratio': 0.25,
+            'choices': [{'order': 1, 'is_correct': True}, {'order': 2, 'is_correct': False, 'note': None}],
+            'huge': 2 ** 70,
+        }
+        for payload in (data, {k: v for k, v in data.items() if k != 'huge'}, [], {}):
+            self.assertEqual(ORJSONRenderer().render(payload), JSONRenderer().render(payload))
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+    def test_orjson_parser(self):
+        self.assertEqual(ORJSONParser().parse(io.BytesIO('{"text": "큐"}'.encode())), {'text': '큐'})
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"text": '))
+
+
+class CompressionTests(QuizAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.quizset = create_quizset(question_count=10)
+        self.url = f'/api/quizsets/{self.quizset.pk}/questions/'
+
+    def test_choose_encoding(self):
+        self.assertEqual(choose_encoding('gzip, deflate'), 'gzip')
+        self.assertEqual(choose_encoding('GZIP;q=0.5, identity'), 'gzip')
+        self.assertEqual(choose_encoding('*'), 'br' if brotli else 'gzip')
+        self.assertIsNone(choose_encoding('gzip;q=0, identity'))
+        self.assertIsNone(choose_encoding('*;q=0'))
+        self.assertIsNone(choose_encoding('deflate'))
+        self.assertIsNone(choose_encoding(''))
+        self.assertIsNone(choose_encoding(None))
+
+    def test_gzip_variant_has_its_own_etag(self):
+        self.client.get(self.url) # 스냅샷이 만들어진 뒤부터 ETag 가 붙는다
+        identity = self.client.get(self.url)
+        compressed = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertFalse(identity.has_header('Content-Encoding'))
+        self.assertEqual(compressed['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(compressed.content), identity.content)
+        self.assertEqual(compressed['Content-Length'], str(len(compressed.content)))
+        for response in (identity, compressed):
+            self.assertIn('Accept-Encoding', response['Vary'])
+            self.assertIn('Accept', response['Vary'])
+
+        self.assertTrue(identity['ETag'].startswith('"'))
+        self.assertEqual(compressed['ETag'], 'W/' + identity['ETag'][:-1] + '-gzip"')
+
+        # 각 표현의 ETag 로 재검증하면 304 와 함께 같은 표현의 ETag 를 돌려준다
+        not_modified = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=compressed['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified['ETag'], compressed['ETag'])
+        self.assertIn('Accept-Encoding', not_modified['Vary'])
+
+        not_modified = self.client.get(self.url, HTTP_IF_NONE_MATCH=identity['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified['ETag'], identity['ETag'])
+
+    def test_small_responses_pass_through(self):
+        response = self.client.get(f'/api/quizsets/{self.quizset.pk}/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertLess(len(response.content), 1024)
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertTrue(response['ETag'].startswith('"'))
+
+        with override_settings(QUIZ_COMPRESSION={'MIN_SIZE': 10 ** 6}):
+            response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        json.loads(response.content)
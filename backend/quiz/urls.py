@@ -1,6 +1,6 @@
-from django.urls import path, include
+from django.urls import path, re_path, include
 from rest_framework_nested import routers
-from .views import QuizSetViewSet, QuestionViewSet
+from .views import QuizSetViewSet, QuestionViewSet, BatchSubmitView, DailyQuestionView, SampleQuestionsView, SearchQuestionsView, ReviewQueueView, ExportQuestionsView, MetricsView
 
 # 1) 최상위 라우터: QuizSetViewSet
 router = routers.SimpleRouter()
@@ -18,4 +18,25 @@ urlpatterns = [
     # /api/quizsets/{quizset_pk}/questions/      -> QuestionViewSet list (filter by quizset_pk)
     # /api/quizsets/{quizset_pk}/questions/{pk}/ -> QuestionViewSet retrieve, update, delete
     path('', include(quizset_router.urls)),
+
+    # /api/submissions/batch/ -> 여러 사용자 / 퀴즈집의 제출을 한 번에 채점
+    path('submissions/batch/', BatchSubmitView.as_view(), name='submission-batch'),
+
+    # /api/daily/?category=NET -> 카테고리별 오늘의 문제
+    path('daily/', DailyQuestionView.as_view(), name='daily-question'),
+
+    # /api/questions/sample/?category=NET&count=10 -> 카테고리별 무작위 문제
+    path('questions/sample/', SampleQuestionsView.as_view(), name='question-sample'),
+
+    # /api/questions/search/?q= -> 문제 / 해설 전문 검색
+    path('questions/search/', SearchQuestionsView.as_view(), name='question-search'),
+
+    # /api/review/next?limit= -> 로그인 사용자의 복습 시각이 지난 문제
+    re_path(r'^review/next/?$', ReviewQueueView.as_view(), name='review-next'),
+
+    # /api/export/questions.ndjson -> 문제 NDJSON 스트리밍 export (관리자 전용)
+    path('export/questions.ndjson', ExportQuestionsView.as_view(), name='question-export'),
+
+    # /api/_metrics -> 요청별 쿼리 수 / 처리 시간 샘플 (QueryMetricsMiddleware)
+    re_path(r'^_metrics/?$', MetricsView.as_view(), name='quiz-metrics'),
 ]
@@ -1,16 +1,63 @@
-from rest_framework import viewsets, status
+from django.conf import settings
+from django.db.models import Prefetch
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
+from rest_framework.views import APIView
 from rest_framework.response import Response
 
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 
-from .models import QuizSet, Question
-from .serializers import QuizSetSerializer, QuestionSerializer
+from .models import QuizSet, Question, Choice
+from .serializers import QuizSetSerializer, QuestionSerializer, QuestionImportSerializer, BatchSubmissionSerializer
+from .bulk import bulk_create_questions
+from .grading import get_answer_key, grade_answer, grade_submission, invalidate_answer_key
+from .content import QUIZSET_COUNT_KEY, question_count_key, quizset_content_changed, quizset_catalog_changed
+from .pagination import KeysetPagination, cached_count
+from .snapshots import get_snapshot, render_question_list
+from .attempts import record_attempt
+from .batch import grade_batch
+from .stats import get_quizset_stats
+from .metrics import sample_buffer, summarize
+from .daily import CATEGORIES, get_daily_payload
+from .sampling import sample_questions
+from .search import search_questions
+from .review import next_reviews
+from .export import stream_export
+from .replicas import ReplicaReadMixin
+from .etags import quizset_etag, question_list_etag, renderer_variant, not_modified, with_etag
 
-class QuizSetViewSet(viewsets.ModelViewSet):
+class QuizSetViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = QuizSet.objects.all()
     serializer_class = QuizSetSerializer
+    # GET 요청과 (설정 시) 채점용 정답표 조회는 읽기 전용 replica 로 (quiz/replicas.py)
+    grading_actions = ('submit_all',)
+    # ?page_size= 또는 ?cursor= 가 있을 때만 (created_at, id) keyset 페이지네이션
+    pagination_class = KeysetPagination
+
+    def retrieve(self, request, *args, **kwargs):
+        # 버전 조회 1회로 If-None-Match 를 먼저 확인해 직렬화 없이 304 응답
+        etag = quizset_etag(kwargs['pk'], variant=renderer_variant(request))
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+        return with_etag(super().retrieve(request, *args, **kwargs), etag)
+
+    def get_paginated_response(self, data):
+        total_count = cached_count(QUIZSET_COUNT_KEY, self.get_queryset())
+        return self.paginator.get_paginated_response(data, count=total_count)
+
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        quizset_catalog_changed()
+
+    def perform_update(self, serializer):
+        # category 가 바뀌면 카테고리 기준 파생 데이터(오늘의 문제, 무작위 추출 인덱스)도 달라진다
+        previous_category = serializer.instance.category
+        super().perform_update(serializer)
+        quizset_content_changed(serializer.instance.pk, categories={previous_category, serializer.instance.category})
 
     @swagger_auto_schema(
         operation_summary="퀴즈집 전체 제출",
@@ -44,6 +91,7 @@ class QuizSetViewSet(viewsets.ModelViewSet):
             200: openapi.Schema(
                 type=openapi.TYPE_OBJECT,
                 properties={
+                    'attempt_id': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_UUID),
                     'quizset_id': openapi.Schema(type=openapi.TYPE_INTEGER),
                     'total_questions': openapi.Schema(type=openapi.TYPE_INTEGER),
                     'total_correct': openapi.Schema(type=openapi.TYPE_INTEGER),
@@ -82,6 +130,7 @@ class QuizSetViewSet(viewsets.ModelViewSet):
 
         response.data 예시:
         {
+          "attempt_id": "9b2f0c4e-5d1a-4c55-a0f3-1f1b6a7f2e10",
           "quizset_id": 3,
           "total_questions": 3,
           "total_correct": 2,
@@ -104,19 +153,16 @@ class QuizSetViewSet(viewsets.ModelViewSet):
           ]
         }
         """
-        # 1) 해당 QuizSet이 실제로 존재하는지 확인
+        # 1) QuizSet 정답표 조회 (캐시 적중 시 쿼리 0회, 미적중 시 1회)
+        #    QuizSet이 없으면 404
         try:
-            quizset = QuizSet.objects.get(pk=pk)
-        except QuizSet.DoesNotExist:
+            answer_key = get_answer_key(pk)
+        except (QuizSet.DoesNotExist, ValueError):
             return Response(
                 {"detail": "QuizSet not found."},
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        # 2) QuizSet에 속한 모든 Question ID 목록 구하기
-        questions = Question.objects.filter(quiz_set=quizset).prefetch_related('choices')
-        question_map = {q.id: q for q in questions}
-
         submitted_answers = request.data.get('answers')
         if not isinstance(submitted_answers, list):
             return Response(
@@ -124,74 +170,247 @@ class QuizSetViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        results = []
-        correct_count = 0
-        total = questions.count()
-
-        # 3) 사용자가 보낸 각 answer 객체에 대해 채점
-        for answer in submitted_answers:
-            qid = answer.get('question_id')
-            user_choice_ids = answer.get('choice_ids', [])
-            if qid not in question_map:
-                # QuizSet에 속하지 않은 question_id가 넘어왔거나 존재하지 않는 ID
-                results.append({
-                    "question_id": qid,
-                    "is_correct": False,
-                    "correct_choice_ids": []
-                })
-                continue
-
-            question = question_map[qid]
-            # 정답 choice IDs 집합
-            correct_choice_ids = set(
-                question.choices.filter(is_correct=True).values_list('id', flat=True)
-            )
+        # 2) 사용자가 보낸 각 answer 객체를 정답표만으로 채점
+        #    QuizSet에 속하지 않은 question_id는 오답 + 빈 정답 리스트로 처리
+        correct_count, results = grade_submission(answer_key, submitted_answers)
 
-            # 제출된 choice IDs 집합
-            submitted_ids = set(user_choice_ids)
-            is_correct = (submitted_ids == correct_choice_ids)
-            if is_correct:
-                correct_count += 1
-
-            results.append({
-                "question_id": qid,
-                "is_correct": is_correct,
-                "correct_choice_ids": sorted(correct_choice_ids)
-            })
+        # 3) 채점 기록은 write-behind 버퍼에 넣고 저장을 기다리지 않음
+        attempt_id = record_attempt(
+            int(pk), request.user, answer_key, submitted_answers, results, len(answer_key)
+        )
 
         # 4) 결과 반환
         return Response({
+            "attempt_id": attempt_id,
             "quizset_id": int(pk),
-            "total_questions": total,
+            "total_questions": len(answer_key),
             "total_correct": correct_count,
             "results": results
         })
-    
-class QuestionViewSet(viewsets.ModelViewSet):
+
+    @swagger_auto_schema(
+        operation_summary="퀴즈집 통계",
+        operation_description="""
+        채점 시 누적되는 카운터 테이블만 읽어 QuizSet 응시 횟수, 평균 정답률,
+        점수 분포(10% 구간)와 문제별 응시 / 정답 횟수를 반환합니다.
+        """,
+        responses={
+            200: openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'quizset_id': openapi.Schema(type=openapi.TYPE_INTEGER),
+                    'attempt_count': openapi.Schema(type=openapi.TYPE_INTEGER),
+                    'average_correct_rate': openapi.Schema(type=openapi.TYPE_NUMBER),
+                    'score_histogram': openapi.Schema(
+                        type=openapi.TYPE_ARRAY,
+                        items=openapi.Items(
+                            type=openapi.TYPE_OBJECT,
+                            properties={
+                                'bucket': openapi.Schema(type=openapi.TYPE_INTEGER),
+                                'min_rate': openapi.Schema(type=openapi.TYPE_NUMBER),
+                                'max_rate': openapi.Schema(type=openapi.TYPE_NUMBER),
+                                'count': openapi.Schema(type=openapi.TYPE_INTEGER)
+                            }
+                        )
+                    ),
+                    'questions': openapi.Schema(
+                        type=openapi.TYPE_ARRAY,
+                        items=openapi.Items(
+                            type=openapi.TYPE_OBJECT,
+                            properties={
+                                'question_id': openapi.Schema(type=openapi.TYPE_INTEGER),
+                                'attempt_count': openapi.Schema(type=openapi.TYPE_INTEGER),
+                                'correct_count': openapi.Schema(type=openapi.TYPE_INTEGER),
+                                'correct_rate': openapi.Schema(type=openapi.TYPE_NUMBER)
+                            }
+                        )
+                    )
+                }
+            )
+        }
+    )
+    @action(detail=True, methods=['get'])
+    def stats(self, request, pk=None):
+        """
+        GET /api/quizsets/{quizset_pk}/stats/
+        """
+        quizset = self.get_object()
+        return Response(get_quizset_stats(quizset.pk))
+
+    def perform_destroy(self, instance):
+        quizset_id, category = instance.pk, instance.category
+        super().perform_destroy(instance)
+        quizset_content_changed(quizset_id, categories=[category])
+        quizset_catalog_changed()
+
+class QuestionViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Question.objects.prefetch_related('choices').all()
     serializer_class = QuestionSerializer
+    grading_actions = ('submit',)
+    pagination_class = KeysetPagination
+
+    # GET ?fields= / ?omit= / ?mode=play 로 정한 QuestionSerializer 인자 (list / retrieve 에서만 설정)
+    representation = None
 
     def get_queryset(self):
         quizset_pk = self.kwargs.get('quizset_pk')
         if quizset_pk is not None:
-            return self.queryset.filter(quiz_set_id=quizset_pk)
-        
-        quizset_q = self.request.query_params.get('quizset')
-        if quizset_q:
-            return Question.objects.filter(quiz_set_id=quizset_q).prefetch_related('choices')
-        return self.queryset
+            queryset = self.queryset.filter(quiz_set_id=quizset_pk)
+        elif self.request.query_params.get('quizset'):
+            queryset = Question.objects.filter(
+                quiz_set_id=self.request.query_params['quizset']
+            ).prefetch_related('choices')
+        else:
+            queryset = self.queryset
+        return self._only_needed_columns(queryset) if self.representation else queryset
+
+    def get_serializer(self, *args, **kwargs):
+        if self.representation:
+            kwargs.update(self.representation)
+        return super().get_serializer(*args, **kwargs)
+
+    def _parse_representation(self, request):
+        """
+        ?fields=id,question_text,choices / ?omit=explanation / ?mode=play 를 QuestionSerializer 인자로.
+        기본 표현이면 None, 알 수 없는 값이면 ValueError.
+        """
+        representation = {}
+        for param in ('fields', 'omit'):
+            value = request.query_params.get(param)
+            if value is None:
+                continue
+            names = [name.strip() for name in value.split(',') if name.strip()]
+            unknown = sorted(set(names) - set(QuestionSerializer.Meta.fields))
+            if unknown:
+                raise ValueError(f"Unknown field(s) in '{param}': {', '.join(unknown)}.")
+            representation[param] = names
 
+        mode = request.query_params.get('mode')
+        if mode not in (None, '', 'play'):
+            raise ValueError("'mode' must be 'play'.")
+        if mode == 'play':
+            representation['play'] = True
+        return representation or None
+
+    def _representation_variant(self, request):
+        """
+        ETag 에 붙일 표현 구분자 (기본 표현이면 None).
+        응답 본문을 바꾸는 것(?mode / ?fields / ?omit, 페이지 위치와 크기, 협상된 렌더러) 은 모두 포함해야
+        다른 페이지나 다른 필드 조합을 요청한 클라이언트가 304 를 받지 않는다.
+        """
+        representation = self.representation or {}
+        parts = ['play'] if representation.get('play') else []
+        for param in ('fields', 'omit'):
+            if param in representation:
+                parts.append(f"{param[0]}={'.'.join(sorted(representation[param]))}")
+        for param in (self.paginator.cursor_query_param, self.paginator.page_size_query_param):
+            if param in request.query_params:
+                parts.append(f'{param}={request.query_params[param]}')
+        renderer = renderer_variant(request)
+        if renderer:
+            parts.append(renderer)
+        return ';'.join(parts) or None
+
+    def _only_needed_columns(self, queryset):
+        """응답에 쓰이는 컬럼만 읽도록 .only() 를 걸고, 필요 없으면 선택지 prefetch 를 뺀다"""
+        serializer = QuestionSerializer(**self.representation)
+        names = set(serializer.fields)
+        # keyset 페이지네이션 cursor 를 만들 때 created_at 을 읽으므로 항상 포함
+        columns = ['created_at', *(name for name in names if name not in ('id', 'choices'))]
+        queryset = queryset.prefetch_related(None).only(*columns)
+        if 'choices' not in names:
+            return queryset
+        if self.representation.get('play'):
+            return queryset.prefetch_related(
+                Prefetch('choices', queryset=Choice.objects.only('id', 'question_id', 'text', 'order'))
+            )
+        return queryset.prefetch_related('choices')
+
+    representation_parameters = [
+        openapi.Parameter(
+            'fields', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+            description="내려줄 필드 (쉼표 구분, 예: `id,question_text,choices`)"
+        ),
+        openapi.Parameter(
+            'omit', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+            description="제외할 필드 (쉼표 구분, 예: `explanation`)"
+        ),
+        openapi.Parameter(
+            'mode', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=['play'],
+            description="`play` 면 풀이 화면용으로 explanation 과 선택지의 is_correct 를 뺀다"
+        ),
+    ]
+
+    @swagger_auto_schema(manual_parameters=representation_parameters)
     def list(self, request, *args, **kwargs):
+        try:
+            self.representation = self._parse_representation(request)
+        except ValueError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # /api/quizsets/{quizset_pk}/questions/ 는 버전 조회 1회로 If-None-Match 를 먼저 확인
+        etag = None
+        if self.kwargs.get('quizset_pk') is not None:
+            etag = question_list_etag(self.kwargs['quizset_pk'], variant=self._representation_variant(request))
+            response = not_modified(request, etag)
+            if response is not None:
+                return response
+        return with_etag(self._list(request), etag)
+
+    @swagger_auto_schema(manual_parameters=representation_parameters)
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            self.representation = self._parse_representation(request)
+        except ValueError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return super().retrieve(request, *args, **kwargs)
+
+    def _list(self, request):
+        quizset_id = self.kwargs.get('quizset_pk') or self.request.query_params.get('quizset')
+
+        # /api/quizsets/{quizset_pk}/questions/ 전체 조회는 미리 직렬화해 둔 스냅샷을 그대로 응답
+        if self._can_serve_snapshot():
+            snapshot = get_snapshot(quizset_id, play=bool(self.representation))
+            if snapshot is not None:
+                questions_json, question_count = snapshot
+                return HttpResponse(
+                    render_question_list(quizset_id, questions_json, question_count),
+                    content_type='application/json'
+                )
+
         queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
-        total_count = queryset.count()
 
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            # 페이지네이션 미사용: 전체를 직렬화하므로 COUNT 쿼리 없이 개수를 센다
+            serializer = self.get_serializer(queryset, many=True)
+            return Response({
+                'quizset_id': quizset_id,
+                'total_question_count': len(serializer.data),
+                'questions': serializer.data
+            })
+
+        # 페이지네이션 사용: 전체 개수는 캐시된 COUNT 로 응답 (몇 번째 페이지든 비용 동일)
+        serializer = self.get_serializer(page, many=True)
         return Response({
-            'quizset_id': self.kwargs.get('quizset_pk') or self.request.query_params.get('quizset'),
-            'total_question_count': total_count,
+            'quizset_id': quizset_id,
+            'total_question_count': cached_count(question_count_key(quizset_id), queryset),
+            'next': self.paginator.get_next_link(),
             'questions': serializer.data
         })
 
+    def _can_serve_snapshot(self):
+        # 스냅샷은 기본 표현과 ?mode=play 두 가지만 저장되어 있다
+        return (
+            self.kwargs.get('quizset_pk') is not None
+            and (self.representation is None or self.representation == {'play': True})
+            and not any(
+                param in self.request.query_params
+                for param in (self.paginator.cursor_query_param, self.paginator.page_size_query_param)
+            )
+            and self.request.accepted_renderer.format == 'json'
+        )
+
     @swagger_auto_schema(
         operation_summary="문제 채점",
         operation_description="`choice_ids` 배열을 받아, 선택지가 정답과 일치하는지 여부를 반환합니다.",
@@ -206,6 +425,7 @@ class QuestionViewSet(viewsets.ModelViewSet):
             200: openapi.Schema(
                 type=openapi.TYPE_OBJECT,
                 properties={
+                    'attempt_id': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_UUID),
                     'is_correct': openapi.Schema(type=openapi.TYPE_BOOLEAN),
                     'correct_choice_ids': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Items(type=openapi.TYPE_INTEGER))
                 }
@@ -213,12 +433,480 @@ class QuestionViewSet(viewsets.ModelViewSet):
         }
     )
     @action(detail=True, methods=['post'])
-    def submit(self, request, pk=None):
+    def submit(self, request, pk=None, quizset_pk=None):
         question = self.get_object()
-        submitted_choice_ids = set(request.data.get('choice_ids', []))
-        correct_choice_ids = set(question.choices.filter(is_correct=True).values_list('id', flat=True))
-        is_correct = submitted_choice_ids == correct_choice_ids
+        answer_key = get_answer_key(question.quiz_set_id)
+        if question.pk not in answer_key:
+            # 다른 워커에서 방금 추가된 문제라 로컬 정답표가 아직 모르는 경우
+            invalidate_answer_key(question.quiz_set_id)
+            answer_key = get_answer_key(question.quiz_set_id)
+        choice_ids = request.data.get('choice_ids', [])
+        is_correct, correct_choice_ids = grade_answer(answer_key, question.pk, choice_ids)
+
+        attempt_id = record_attempt(
+            question.quiz_set_id, request.user, answer_key,
+            [{'question_id': question.pk, 'choice_ids': choice_ids}],
+            [{'question_id': question.pk, 'is_correct': is_correct, 'correct_choice_ids': correct_choice_ids}],
+            1, kind='question'
+        )
         return Response({
+            'attempt_id': attempt_id,
             'is_correct': is_correct,
-            'correct_choice_ids': list(correct_choice_ids)
+            'correct_choice_ids': correct_choice_ids
+        })
+
+    def perform_destroy(self, instance):
+        quizset_id = instance.quiz_set_id
+        super().perform_destroy(instance)
+        quizset_content_changed(quizset_id)
+
+    @swagger_auto_schema(
+        operation_summary="문제 대량 등록",
+        operation_description="""
+        여러 문제를 한 번에 검증한 뒤, 유효한 문제만 하나의 트랜잭션에서
+        Question / Choice bulk_create 로 저장합니다.
+        유효하지 않은 항목은 저장하지 않고 index 별 에러로 반환합니다.
+        """,
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'questions': openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Items(
+                        type=openapi.TYPE_OBJECT,
+                        properties={
+                            'question_text': openapi.Schema(type=openapi.TYPE_STRING),
+                            'explanation': openapi.Schema(type=openapi.TYPE_STRING),
+                            'difficulty_level': openapi.Schema(type=openapi.TYPE_STRING),
+                            'choices': openapi.Schema(
+                                type=openapi.TYPE_ARRAY,
+                                items=openapi.Items(
+                                    type=openapi.TYPE_OBJECT,
+                                    properties={
+                                        'text': openapi.Schema(type=openapi.TYPE_STRING),
+                                        'is_correct': openapi.Schema(type=openapi.TYPE_BOOLEAN)
+                                    },
+                                    required=['text']
+                                )
+                            )
+                        },
+                        required=['question_text', 'choices']
+                    )
+                )
+            },
+            required=['questions']
+        ),
+        responses={
+            201: openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'quizset_id': openapi.Schema(type=openapi.TYPE_INTEGER),
+                    'created_count': openapi.Schema(type=openapi.TYPE_INTEGER),
+                    'created_ids': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Items(type=openapi.TYPE_INTEGER)),
+                    'errors': openapi.Schema(
+                        type=openapi.TYPE_ARRAY,
+                        items=openapi.Items(
+                            type=openapi.TYPE_OBJECT,
+                            properties={
+                                'index': openapi.Schema(type=openapi.TYPE_INTEGER),
+                                'errors': openapi.Schema(type=openapi.TYPE_OBJECT)
+                            }
+                        )
+                    )
+                }
+            )
+        }
+    )
+    @action(detail=False, methods=['post'])
+    def bulk(self, request, quizset_pk=None):
+        """
+        POST /api/quizsets/{quizset_pk}/questions/bulk/
+
+        response.data 예시 (1번 항목만 검증 실패):
+        {
+          "quizset_id": 3,
+          "created_count": 2,
+          "created_ids": [41, 42],
+          "errors": [
+            { "index": 1, "errors": { "choices": ["This list may not be empty."] } }
+          ]
+        }
+        """
+        if quizset_pk is None or not QuizSet.objects.filter(pk=quizset_pk).exists():
+            return Response(
+                {"detail": "QuizSet not found."},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        items = request.data.get('questions')
+        if not isinstance(items, list):
+            return Response(
+                {"detail": "'questions' must be a list of questions."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        max_items = getattr(settings, 'QUIZ_BULK_IMPORT_MAX_ITEMS', 1000)
+        if len(items) > max_items:
+            return Response(
+                {"detail": f"Too many questions. At most {max_items} per request."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # 1) 전체 항목을 먼저 검증 (DB 조회 없음)
+        valid_items = []
+        errors = []
+        for index, item in enumerate(items):
+            serializer = QuestionImportSerializer(data=item)
+            if serializer.is_valid():
+                valid_items.append(serializer.validated_data)
+            else:
+                errors.append({"index": index, "errors": serializer.errors})
+
+        # 2) 유효한 항목만 한 트랜잭션에서 bulk_create
+        created = bulk_create_questions(int(quizset_pk), valid_items)
+
+        return Response({
+            "quizset_id": int(quizset_pk),
+            "created_count": len(created),
+            "created_ids": [question.pk for question in created],
+            "errors": errors
+        }, status=status.HTTP_201_CREATED if created or not errors else status.HTTP_400_BAD_REQUEST)
+
+class BatchSubmitView(APIView):
+
+    @swagger_auto_schema(
+        operation_summary="일괄 채점",
+        operation_description="""
+        여러 사용자 / 여러 퀴즈집의 제출을 한 번에 채점합니다 (오프라인 클라이언트 동기화, 강의실 답안 업로드).
+        참조된 퀴즈집의 정답표는 한 번에 읽고 메모리에서 채점하며, 제출별 결과를 입력 순서대로 반환합니다.
+        같은 응시자(user_ref 또는 로그인 계정)의 idempotency_key 가 이미 기록된 제출은 다시 기록하지 않고
+        처음 채점 결과를 status="duplicate" 로 돌려줍니다. 익명 요청의 idempotency_key 에는 user_ref 가 필요합니다.
+        user_ref 가 있는 제출은 요청한 계정이 아닌 user_ref 의 기록으로 저장됩니다.
+        """,
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'submissions': openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Items(
+                        type=openapi.TYPE_OBJECT,
+                        properties={
+                            'user_ref': openapi.Schema(type=openapi.TYPE_STRING),
+                            'quizset_id': openapi.Schema(type=openapi.TYPE_INTEGER),
+                            'idempotency_key': openapi.Schema(type=openapi.TYPE_STRING),
+                            'answers': openapi.Schema(
+                                type=openapi.TYPE_ARRAY,
+                                items=openapi.Items(
+                                    type=openapi.TYPE_OBJECT,
+                                    properties={
+                                        'question_id': openapi.Schema(type=openapi.TYPE_INTEGER),
+                                        'choice_ids': openapi.Schema(
+                                            type=openapi.TYPE_ARRAY,
+                                            items=openapi.Items(type=openapi.TYPE_INTEGER)
+                                        )
+                                    }
+                                )
+                            )
+                        },
+                        required=['quizset_id', 'answers']
+                    )
+                )
+            },
+            required=['submissions']
+        )
+    )
+    def post(self, request):
+        """
+        POST /api/submissions/batch/
+
+        request.data 예시:
+        {
+          "submissions": [
+            { "user_ref": "student-01", "quizset_id": 3, "idempotency_key": "c0a8-01",
+              "answers": [ { "question_id": 7, "choice_ids": [22] } ] },
+            { "user_ref": "student-02", "quizset_id": 5, "idempotency_key": "c0a8-02",
+              "answers": [ { "question_id": 12, "choice_ids": [40, 41] } ] }
+          ]
+        }
+
+        response.data 예시:
+        {
+          "graded_count": 1,
+          "duplicate_count": 1,
+          "error_count": 0,
+          "results": [
+            { "index": 0, "status": "graded", "user_ref": "student-01", "quizset_id": 3,
+              "attempt_id": "9b2f0c4e-...", "total_questions": 1, "total_correct": 1, "results": [ ... ] },
+            { "index": 1, "status": "duplicate", ... }
+          ]
+        }
+        """
+        submissions = request.data.get('submissions')
+        if not isinstance(submissions, list):
+            return Response(
+                {"detail": "'submissions' must be a list of { user_ref, quizset_id, answers, idempotency_key }."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        max_submissions = getattr(settings, 'QUIZ_BATCH_GRADING_MAX_SUBMISSIONS', 500)
+        if len(submissions) > max_submissions:
+            return Response(
+                {"detail": f"Too many submissions. At most {max_submissions} per request."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # 1) 전체 항목을 먼저 검증 (DB 조회 없음)
+        valid = []
+        results = []
+        for index, submission in enumerate(submissions):
+            serializer = BatchSubmissionSerializer(data=submission, context={'request': request})
+            if serializer.is_valid():
+                valid.append((index, serializer.validated_data))
+            else:
+                results.append({"index": index, "status": "error", "errors": serializer.errors})
+
+        # 2) 유효한 제출만 정답표 일괄 조회 후 메모리에서 채점 / 저장
+        results.extend(grade_batch(valid, request.user) if valid else [])
+        results.sort(key=lambda result: result["index"])
+
+        counts = {"graded": 0, "duplicate": 0, "error": 0}
+        for result in results:
+            counts[result["status"]] += 1
+        return Response({
+            "graded_count": counts["graded"],
+            "duplicate_count": counts["duplicate"],
+            "error_count": counts["error"],
+            "results": results
+        })
+
+class DailyQuestionView(APIView):
+
+    @swagger_auto_schema(
+        operation_summary="오늘의 문제",
+        operation_description="""
+        카테고리별로 하루에 한 번 정해지는 '오늘의 문제'를 반환합니다.
+        같은 날에는 모든 사용자에게 같은 문제가 내려가며, 하루 첫 요청 이후에는 캐시에서 응답합니다.
+        """,
+        manual_parameters=[
+            openapi.Parameter(
+                'category', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                enum=CATEGORIES, required=True
+            )
+        ]
+    )
+    def get(self, request):
+        """
+        GET /api/daily/?category=NET
+        """
+        category = request.query_params.get('category')
+        if category not in CATEGORIES:
+            return Response(
+                {"detail": f"'category' must be one of {', '.join(CATEGORIES)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        payload = get_daily_payload(category)
+        if payload is None:
+            return Response(
+                {"detail": "No questions in this category."},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(payload)
+
+class SampleQuestionsView(APIView):
+    max_count = 50
+
+    @swagger_auto_schema(
+        operation_summary="무작위 문제 추출",
+        operation_description="""
+        카테고리(와 난이도)에서 중복 없이 N 개의 문제를 무작위로 골라 선택지와 함께 반환합니다.
+        ORDER BY RAND() 대신 메모리에 유지되는 문제 id 인덱스에서 고르므로 테이블 크기와 관계없이 쿼리 수가 일정합니다.
+        """,
+        manual_parameters=[
+            openapi.Parameter('category', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=CATEGORIES, required=True),
+            openapi.Parameter('difficulty_level', openapi.IN_QUERY, type=openapi.TYPE_STRING),
+            openapi.Parameter('count', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, default=10),
+        ]
+    )
+    def get(self, request):
+        """
+        GET /api/questions/sample/?category=NET&difficulty_level=easy&count=10
+        """
+        category = request.query_params.get('category')
+        if category not in CATEGORIES:
+            return Response(
+                {"detail": f"'category' must be one of {', '.join(CATEGORIES)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            count = int(request.query_params.get('count', 10))
+        except ValueError:
+            count = 0
+        if not 1 <= count <= self.max_count:
+            return Response(
+                {"detail": f"'count' must be an integer between 1 and {self.max_count}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        difficulty_level = request.query_params.get('difficulty_level') or None
+        questions = sample_questions(category, count, difficulty_level)
+        return Response({
+            "category": category,
+            "difficulty_level": difficulty_level,
+            "count": len(questions),
+            "questions": QuestionSerializer(questions, many=True).data
+        })
+
+class SearchQuestionsView(APIView):
+    page_size = 20
+    max_page_size = 100
+
+    @swagger_auto_schema(
+        operation_summary="문제 검색",
+        operation_description="""
+        문제 본문(question_text)과 해설(explanation)을 전문 검색 인덱스로 검색해 관련도 순으로 반환합니다.
+        category, quizset 으로 범위를 좁힐 수 있습니다.
+        """,
+        manual_parameters=[
+            openapi.Parameter('q', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True),
+            openapi.Parameter('category', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=CATEGORIES),
+            openapi.Parameter('quizset', openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+            openapi.Parameter('page', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, default=1),
+            openapi.Parameter('page_size', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, default=20),
+        ]
+    )
+    def get(self, request):
+        """
+        GET /api/questions/search/?q=트랜잭션&category=DB&page=1
+        """
+        query = request.query_params.get('q', '').strip()
+        if len(query) < 2:
+            return Response(
+                {"detail": "'q' must be at least 2 characters."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        category = request.query_params.get('category') or None
+        if category is not None and category not in CATEGORIES:
+            return Response(
+                {"detail": f"'category' must be one of {', '.join(CATEGORIES)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            quizset_id = int(request.query_params['quizset']) if request.query_params.get('quizset') else None
+            page = max(int(request.query_params.get('page', 1)), 1)
+            page_size = min(max(int(request.query_params.get('page_size', self.page_size)), 1), self.max_page_size)
+        except ValueError:
+            return Response(
+                {"detail": "'quizset', 'page' and 'page_size' must be integers."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        questions, total = search_questions(
+            query, category=category, quizset_id=quizset_id,
+            limit=page_size, offset=(page - 1) * page_size
+        )
+        results = QuestionSerializer(questions, many=True).data
+        for result, question in zip(results, questions):
+            result['score'] = question.score
+
+        return Response({
+            "query": query,
+            "count": total,
+            "page": page,
+            "page_size": page_size,
+            "has_next": page * page_size < total,
+            "results": results
+        })
+
+class ReviewQueueView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    default_limit = 10
+    max_limit = 50
+
+    @swagger_auto_schema(
+        operation_summary="다음 복습 문제",
+        operation_description="""
+        로그인 사용자가 풀었던 문제 중 복습 시각(due_at)이 지난 문제를 오래된 순으로 반환합니다.
+        복습 일정은 문제를 제출할 때마다 SM-2 규칙으로 갱신됩니다.
+        """,
+        manual_parameters=[
+            openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, default=10),
+        ]
+    )
+    def get(self, request):
+        """
+        GET /api/review/next?limit=10
+        """
+        try:
+            limit = int(request.query_params.get('limit', self.default_limit))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= self.max_limit:
+            return Response(
+                {"detail": f"'limit' must be an integer between 1 and {self.max_limit}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        states = next_reviews(request.user, limit, timezone.now())
+        results = QuestionSerializer([state.question for state in states], many=True).data
+        for result, state in zip(results, states):
+            result['review'] = {
+                "due_at": state.due_at,
+                "interval_days": state.interval_days,
+                "ease": state.ease,
+                "repetitions": state.repetitions,
+            }
+        return Response({
+            "count": len(results),
+            "results": results
+        })
+
+class ExportQuestionsView(APIView):
+    """
+    GET /api/export/questions.ndjson?gzip=1&quizset=3&quizset=4
+
+    전체(또는 지정한 QuizSet 의) 문제를 NDJSON 으로 스트리밍. 관리자 전용.
+    iterator(chunk_size) 로 읽으면서 바로 내보내므로 카탈로그 크기와 관계없이 메모리 사용량이 일정하다.
+    """
+    permission_classes = [permissions.IsAdminUser]
+    chunk_size = 500
+
+    @swagger_auto_schema(
+        operation_summary="문제 NDJSON export (관리자)",
+        manual_parameters=[
+            openapi.Parameter('gzip', openapi.IN_QUERY, type=openapi.TYPE_BOOLEAN, default=False),
+            openapi.Parameter('quizset', openapi.IN_QUERY, type=openapi.TYPE_ARRAY, items=openapi.Items(type=openapi.TYPE_INTEGER)),
+        ]
+    )
+    def get(self, request):
+        try:
+            quizset_ids = [int(value) for value in request.query_params.getlist('quizset')]
+        except ValueError:
+            return Response(
+                {"detail": "'quizset' must be integers."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        compress = request.query_params.get('gzip') in ('1', 'true')
+
+        filename = 'questions.ndjson.gz' if compress else 'questions.ndjson'
+        response = StreamingHttpResponse(
+            stream_export(quizset_ids, self.chunk_size, compress=compress),
+            content_type='application/gzip' if compress else 'application/x-ndjson; charset=utf-8'
+        )
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+class MetricsView(APIView):
+    """
+    GET /api/_metrics
+
+    QueryMetricsMiddleware 가 샘플링한 최근 요청들의 엔드포인트별 요약과 원본 샘플을 반환 (관리자 전용).
+    """
+    swagger_schema = None
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        samples = sample_buffer.snapshot()
+        return Response({
+            "sample_count": len(samples),
+            "endpoints": summarize(samples),
+            "samples": [sample.as_dict() for sample in samples]
         })
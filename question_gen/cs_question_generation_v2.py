@@ -1,20 +1,18 @@
 import os
 import sys
 import json
-import boto3
+import time
 import random
+import asyncio
 import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict
 from datetime import datetime
 
-# Google Gemini API
-from google import genai
-from google.genai import types
-
-# RAG 관련 라이브러리
-from sentence_transformers import SentenceTransformer
-import chromadb
-from chromadb.utils import embedding_functions
+# boto3 / Google Gemini API / RAG 관련 라이브러리(sentence_transformers, chromadb) 는 import 만으로도 수 초가 걸리므로
+# 처음 사용할 때 import 한다 (Resources, GeminiClient)
+STARTED_AT = time.perf_counter()
 
 # --- 환경 변수 설정 ---
 GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY")
@@ -22,63 +20,164 @@ BUCKET_NAME = os.environ.get("BUCKET_NAME")
 AWS_ACCESS_KEY_ID = os.environ.get("AWS_ACCESS_KEY_ID")
 AWS_SECRET_ACCESS_KEY = os.environ.get("AWS_SECRET_ACCESS_KEY")
 AWS_REGION = os.environ.get("AWS_REGION")
+# 지정하면 S3 대신 이 디렉터리에 key 경로 그대로 저장 (local_bucket.py, AWS 설정 불필요). 백엔드 ingest 의 --dir 로 읽는다
+OUTPUT_DIR = os.environ.get("OUTPUT_DIR")
 
 # --- ChromaDB 설정 ---
 CHROMA_HOST = os.environ.get("CHROMA_HOST", "localhost") 
 CHROMA_PORT = os.environ.get("CHROMA_PORT", 8000)
 COLLECTION_NAME = os.environ.get("COLLECTION_NAME", "cs_skill_questions")
 
-# 환경 변수 유효성 검사
-if not GEMINI_API_KEY:
-    print("Error: GEMINI_API_KEY environment variable not set.", file=sys.stderr)
-    sys.exit(1)
-if not BUCKET_NAME:
-    print("Error: BUCKET_NAME environment variable not set.", file=sys.stderr)
-    sys.exit(1)
-if not AWS_ACCESS_KEY_ID or not AWS_SECRET_ACCESS_KEY or not AWS_REGION:
-    print("Error: AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, AWS_REGION environment variables not fully set.", file=sys.stderr)
-    # sys.exit(1) # S3 사용하지 않는 경우를 대비해 일단 에러는 띄우고 종료하지 않음
-    # 실제 환경에서는 필수적으로 설정되어야 함.
-
-# S3 클라이언트 초기화
-s3_client = boto3.client(
-    "s3",
-    aws_access_key_id=AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-    region_name=AWS_REGION
-)
-
-
-# --- RAG 관련 초기화 ---
-# 임베딩 모델 로드 (스크립트 시작 시 한 번만 로드)
-print("[*] Loading SentenceTransformer model...")
-embedding_model = SentenceTransformer('all-MiniLM-L6-v2') 
-print("[*] SentenceTransformer model loaded.")
-
-# ChromaDB 클라이언트 초기화
-print(f"Connecting to ChromaDB at {CHROMA_HOST}:{CHROMA_PORT}...")
-try:
-    chroma_client = chromadb.HttpClient(host=CHROMA_HOST, port=CHROMA_PORT)
-    # 컬렉션 존재 여부 확인 후 로드 또는 생성
-    collection = chroma_client.get_collection(name=COLLECTION_NAME)
-    print(f"ChromaDB collection '{COLLECTION_NAME}' loaded.")
-except Exception as e:
-    print(f"ChromaDB collection '{COLLECTION_NAME}' not found or connection error: {e}. Attempting to create it...")
-    try:
-        collection = chroma_client.create_collection(name=COLLECTION_NAME)
-        print(f"ChromaDB collection '{COLLECTION_NAME}' created.")
-    except Exception as create_e:
-        print(f"Error creating ChromaDB collection: {create_e}. Please ensure ChromaDB server is running and accessible.", file=sys.stderr)
+# --- 벡터 저장소 설정 ---
+# chroma: ChromaDB 서버 (CHROMA_HOST / CHROMA_PORT), local: 로컬 디스크 인덱스 (vector_index.py, 서버 없이 동작)
+VECTOR_BACKEND = os.environ.get("VECTOR_BACKEND", "chroma")
+LOCAL_INDEX_DIR = os.environ.get("LOCAL_INDEX_DIR", os.path.expanduser("~/.cache/dailycs/vector-index"))
+# 같은 주제에 코사인 유사도가 이 값 이상인 문제가 있으면 저장하지 않고 다시 생성 (빈 값이면 검사하지 않음)
+DUPLICATE_SIMILARITY_THRESHOLD = float(os.environ.get("DUPLICATE_SIMILARITY_THRESHOLD", "0.92") or "inf")
+# 임베딩 전에 question + answer 의 MinHash 로 거의 같은 문장을 거르는 인덱스 위치 (빈 값이면 사용하지 않음) 와 추정 Jaccard 기준
+LEXICAL_INDEX_DIR = os.environ.get("LEXICAL_INDEX_DIR", os.path.expanduser("~/.cache/dailycs/lexical-index"))
+LEXICAL_DUPLICATE_THRESHOLD = float(os.environ.get("LEXICAL_DUPLICATE_THRESHOLD", "0.7"))
+
+# --- 임베딩 설정 ---
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+# 임베딩 디스크 캐시 위치 (빈 값이면 사용하지 않음) 와 최대 크기
+EMBEDDING_CACHE_DIR = os.environ.get("EMBEDDING_CACHE_DIR", os.path.expanduser("~/.cache/dailycs/embeddings"))
+EMBEDDING_CACHE_MAX_MB = int(os.environ.get("EMBEDDING_CACHE_MAX_MB", 64))
+
+
+def check_environment():
+    """환경 변수 유효성 검사 (GEMINI_API_KEY 는 Gemini 를 쓸 때 GeminiClient 에서 확인, OUTPUT_DIR 이면 S3 설정은 필요 없음)"""
+    if OUTPUT_DIR:
+        return
+    if not BUCKET_NAME:
+        print("Error: BUCKET_NAME environment variable not set.", file=sys.stderr)
         sys.exit(1)
+    if not AWS_ACCESS_KEY_ID or not AWS_SECRET_ACCESS_KEY or not AWS_REGION:
+        print("Error: AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, AWS_REGION environment variables not fully set.", file=sys.stderr)
+        # sys.exit(1) # S3 사용하지 않는 경우를 대비해 일단 에러는 띄우고 종료하지 않음
+        # 실제 환경에서는 필수적으로 설정되어야 함.
+
+
+# --- 외부 리소스 (처음 사용할 때 생성) ---
+class Resources:
+    """
+    S3 클라이언트(OUTPUT_DIR 이면 로컬 디렉터리), 임베딩 모델, 임베딩 캐시, 벡터 저장소(ChromaDB 컬렉션 또는 로컬 인덱스), MinHash 중복 인덱스를
+    처음 사용할 때 만드는 컨테이너.
+    --help 나 검증 실패로 끝나는 실행, --no-rag 실행은 쓰지 않는 리소스의 import / 로드 / 연결 비용을 내지 않는다.
+    배치 모드의 여러 스레드에서 동시에 접근해도 리소스마다 한 번만 만들며, 만드는 데 걸린 시간(import 포함) 을 timings 에 기록한다.
+    """
+    NAMES = ("s3", "embedding_model", "embedding_cache", "collection", "lexical_index")
+
+    def __init__(self):
+        self.timings = {}
+        self._values = {}
+        self._locks = {name: threading.Lock() for name in self.NAMES}
+
+    def _get(self, name):
+        if name not in self._values:
+            with self._locks[name]:
+                if name not in self._values:
+                    started = time.perf_counter()
+                    self._values[name] = getattr(self, f"_create_{name}")()
+                    self.timings[name] = time.perf_counter() - started
+        return self._values[name]
+
+    @property
+    def s3(self):
+        return self._get("s3")
+
+    @property
+    def embedding_model(self):
+        return self._get("embedding_model")
+
+    @property
+    def embedding_cache(self):
+        return self._get("embedding_cache")
+
+    @property
+    def collection(self):
+        return self._get("collection")
+
+    @property
+    def lexical_index(self):
+        return self._get("lexical_index")
+
+    def warm_up(self, *names):
+        """여러 리소스를 동시에 준비 (모델 로드와 ChromaDB 연결을 겹쳐서 기다리는 시간을 줄인다)"""
+        with ThreadPoolExecutor(max_workers=len(names)) as executor:
+            list(executor.map(self._get, names))
+
+    def _create_s3(self):
+        if OUTPUT_DIR:
+            from local_bucket import LocalBucket
+            return LocalBucket(OUTPUT_DIR)
+        import boto3
+        return boto3.client(
+            "s3",
+            aws_access_key_id=AWS_ACCESS_KEY_ID,
+            aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
+            region_name=AWS_REGION
+        )
 
-try:
-    collection = chroma_client.get_collection(name=COLLECTION_NAME)
-    print(f"ChromaDB collection '{COLLECTION_NAME}' loaded.")
-except Exception as e:
-    print(f"ChromaDB collection '{COLLECTION_NAME}' not found. Creating it...")
-    # NOTE: embedding_function은 add/query 시 직접 임베딩을 제공하므로 여기서 지정하지 않습니다.
-    collection = chroma_client.create_collection(name=COLLECTION_NAME)
-    print(f"ChromaDB collection '{COLLECTION_NAME}' created. Please run embed_and_store.py to populate it.")
+    def _create_embedding_model(self):
+        from sentence_transformers import SentenceTransformer
+        print("[*] Loading SentenceTransformer model...")
+        model = SentenceTransformer(EMBEDDING_MODEL_NAME)
+        print("[*] SentenceTransformer model loaded.")
+        return model
+
+    def _create_embedding_cache(self):
+        if not EMBEDDING_CACHE_DIR:
+            return None
+        from embedding_cache import EmbeddingCache
+        return EmbeddingCache(
+            os.path.join(EMBEDDING_CACHE_DIR, EMBEDDING_MODEL_NAME), EMBEDDING_MODEL_NAME,
+            max_bytes=EMBEDDING_CACHE_MAX_MB * 1024 * 1024
+        )
+
+    def _create_collection(self):
+        if VECTOR_BACKEND == "local":
+            from vector_index import LocalVectorIndex
+            collection = LocalVectorIndex(os.path.join(LOCAL_INDEX_DIR, COLLECTION_NAME))
+            print(f"Local vector index '{COLLECTION_NAME}' loaded ({collection.count()} questions).")
+            return collection
+
+        import chromadb
+        print(f"Connecting to ChromaDB at {CHROMA_HOST}:{CHROMA_PORT}...")
+        try:
+            chroma_client = chromadb.HttpClient(host=CHROMA_HOST, port=CHROMA_PORT)
+            # 컬렉션이 없으면 생성
+            # NOTE: embedding_function은 add/query 시 직접 임베딩을 제공하므로 여기서 지정하지 않습니다.
+            collection = chroma_client.get_or_create_collection(name=COLLECTION_NAME)
+        except Exception as e:
+            print(f"Error loading ChromaDB collection '{COLLECTION_NAME}': {e}. Please ensure ChromaDB server is running and accessible.", file=sys.stderr)
+            raise
+        print(f"ChromaDB collection '{COLLECTION_NAME}' loaded.")
+        return collection
+
+    def _create_lexical_index(self):
+        if not LEXICAL_INDEX_DIR:
+            return None
+        from lexical_dedup import LexicalDuplicateIndex
+        return LexicalDuplicateIndex(LEXICAL_INDEX_DIR)
+
+    def close(self):
+        """실행 종료 시 임베딩 캐시를 디스크에 기록"""
+        if self._values.get("embedding_cache") is not None:
+            self._values["embedding_cache"].flush()
+
+    def report(self):
+        """시작 비용 요약: 모듈 로드 시간과 리소스별 생성 시간 (만들지 않은 리소스는 skipped)"""
+        parts = [f"module {MODULE_LOADED_AT - STARTED_AT:.2f}s"]
+        for name in self.NAMES:
+            parts.append(f"{name} {self.timings[name]:.2f}s" if name in self.timings else f"{name} skipped")
+        report = "Startup: " + ", ".join(parts)
+        if self._values.get("embedding_cache") is not None:
+            report += f"\n{self._values['embedding_cache'].stats()}"
+        return report
+
+
+resources = Resources()
 
 
 # --- 메인 주제 및 세부 주제 정의 (프롬프트의 내용과 일치하도록) ---
@@ -129,15 +228,25 @@ def update_last_topic_index(s3_client_obj, bucket_name, index):
     )
     print(f"Updated last topic index in S3 to {index}")
 
+def encode_text(text):
+    """임베딩 캐시를 거쳐 text 를 임베딩. 캐시에 있으면 모델을 호출하지 않는다 (아직 로드 전이면 로드도 하지 않음)"""
+    cache = resources.embedding_cache
+    vector = cache.get(text) if cache is not None else None
+    if vector is None:
+        vector = resources.embedding_model.encode(text)
+        if cache is not None:
+            cache.put(text, vector)
+    return vector.tolist()
+
 def retrieve_similar_questions(query_text: str, target_topic: str, n_results: int = 3) -> List[Dict]:
     """ChromaDB에서 쿼리 및 특정 주제와 유사한 문제들을 검색"""
-    query_embedding = embedding_model.encode(query_text).tolist()
+    query_embedding = encode_text(query_text)
     
-    # 'where' 절을 사용하여 특정 topic의 문제만 검색
-    results = collection.query(
+    # 'where' 절을 사용하여 특정 topic의 문제만 검색 (수동 모드처럼 주제가 없으면 전체에서 검색)
+    results = resources.collection.query(
         query_embeddings=[query_embedding],
         n_results=n_results,
-        where={"topic": target_topic}, # 동일 주제 필터링
+        where={"topic": target_topic} if target_topic else None, # 동일 주제 필터링
         include=['documents', 'metadatas']
     )
     
@@ -153,8 +262,36 @@ def retrieve_similar_questions(query_text: str, target_topic: str, n_results: in
             })
     return retrieved_questions
 
-def embed_and_store_single_question(question_data: Dict):
-    """단일 문제를 임베딩하고 ChromaDB에 저장"""
+class DuplicateQuestionError(ValueError):
+    """이미 저장된 문제와 거의 같은 문제 (저장하지 않고 다시 생성)"""
+
+
+def check_not_duplicate(question_data: Dict, question_embedding):
+    """같은 주제에서 가장 가까운 문제와의 코사인 유사도가 DUPLICATE_SIMILARITY_THRESHOLD 이상이면 DuplicateQuestionError"""
+    import numpy as np
+
+    topic = question_data.get("topic")
+    results = resources.collection.query(
+        query_embeddings=[question_embedding],
+        n_results=1,
+        where={"topic": topic} if topic else None,
+        include=['documents', 'embeddings']
+    )
+    if not results or not results['ids'] or not results['ids'][0]:
+        return
+
+    # 저장소마다 distance 정의(l2 / cosine) 가 달라서 코사인 유사도는 반환된 임베딩으로 직접 계산
+    query = np.asarray(question_embedding, dtype=np.float32)
+    nearest = np.asarray(results['embeddings'][0][0], dtype=np.float32)
+    similarity = float(query @ nearest / max(np.linalg.norm(query) * np.linalg.norm(nearest), 1e-12))
+    if similarity >= DUPLICATE_SIMILARITY_THRESHOLD:
+        raise DuplicateQuestionError(
+            f"Near-duplicate of stored question (cosine similarity {similarity:.3f}): {results['documents'][0][0][:50]}..."
+        )
+
+
+def embed_and_store_single_question(question_data: Dict, question_embedding=None):
+    """단일 문제를 임베딩하고 ChromaDB(또는 로컬 인덱스)에 저장. 중복 검사에서 계산한 임베딩이 있으면 재사용"""
     question_text = question_data.get("question")
     topic = question_data.get("topic")
     answer = question_data.get("answer")
@@ -165,14 +302,15 @@ def embed_and_store_single_question(question_data: Dict):
         return
 
     # 임베딩
-    question_embedding = embedding_model.encode(question_text).tolist()
+    if question_embedding is None:
+        question_embedding = encode_text(question_text)
 
     # 고유 ID 생성 (타임스탬프와 랜덤 조합)
     unique_id = f"q-{datetime.now().strftime('%Y%m%d%H%M%S%f')}-{random.randint(0, 999999)}"
 
     try:
         # ChromaDB에 추가
-        collection.add(
+        resources.collection.add(
             ids=[unique_id],
             embeddings=[question_embedding],
             documents=[question_text],
@@ -187,61 +325,36 @@ def embed_and_store_single_question(question_data: Dict):
         print(f"Error storing question in ChromaDB: {e}", file=sys.stderr)
 
 
-# --- 메인 문제 생성 함수 ---
-def generate_and_store_question(custom_user_prompt=None):
-    genai_client = genai.Client(api_key=GEMINI_API_KEY)
-    model = "gemini-2.5-flash-preview-05-20"
-    
-    is_manual_mode = (custom_user_prompt is not None)
-    selected_topic = None
-    selected_sub_topic = None
-    next_topic_index = -1 
+# --- LLM 클라이언트 ---
+GEMINI_MODEL = "gemini-2.5-flash-preview-05-20"
 
-    # 1. USER_INPUT 결정 및 모드 설정
-    if not is_manual_mode: # 자동 모드 (Cronjob 시뮬레이션)
-        print("Running in automatic mode (simulating Cronjob).")
-        last_index = get_last_topic_index(s3_client, BUCKET_NAME)
-        next_topic_index = (last_index + 1) % len(TOPICS)
-        selected_topic = TOPICS[next_topic_index]
-        selected_sub_topic = random.choice(SUB_TOPICS[selected_topic])
-        base_prompt_text = generate_prompt_text(selected_topic, selected_sub_topic)
-        print(f"Selected Topic: {selected_topic}, Sub-Topic: {selected_sub_topic}")
-    else: # 수동 모드
-        print("Running in manual mode with custom prompt.")
-        base_prompt_text = custom_user_prompt
-        # 수동 모드에서는 RAG 검색 시 topic 필터링을 하지 않음 (프롬프트에서 topic 추출 로직 필요시 추가)
-        print("NOTE: In manual mode, RAG search will NOT filter by topic. Consider refining your prompt for specificity.")
-        selected_topic = None # RAG 검색에서 topic 필터를 적용하지 않도록 설정
+MAX_RETRIES = 3 # 최대 재시도 횟수 (응답 없음 / 형식 오류 / 저장 실패)
+MAX_RATE_LIMIT_RETRIES = 6 # rate limit(429 등) 응답에 대한 최대 재시도 횟수
+BACKOFF_BASE_SECONDS = 2.0
+BACKOFF_MAX_SECONDS = 60.0
 
-    # 2. 유사 문제 검색 (RAG) 및 프롬프트 컨텍스트 증강
-    retrieved_similar_questions = retrieve_similar_questions(base_prompt_text, target_topic=selected_topic, n_results=3)
-    
-    context_for_llm = ""
-    if retrieved_similar_questions:
-        print(f"Retrieved {len(retrieved_similar_questions)} similar questions from ChromaDB for RAG context.")
-        context_for_llm += "\n\n# 참고할 기존 문제 (이와는 다른 새로운 문제를 생성해야 함):\n"
-        for i, q_data in enumerate(retrieved_similar_questions):
-            context_for_llm += f"## 기존 문제 {i+1}:\n"
-            context_for_llm += f"Question: {q_data.get('question', 'N/A')}\n"
-            context_for_llm += f"Answer: {q_data.get('answer', 'N/A')}\n\n" # 선택지 제외
-        context_for_llm += "위 문제를 참고하여, **유사하지 않은 완전히 새로운** CS 스킬 4지선다 문제를 JSON 스키마에 맞춰 생성해주세요.\n"
-    else:
-        print("No similar questions found in ChromaDB for RAG context or filters applied (e.g., topic).")
 
-    # 최종 USER_INPUT 구성
-    final_user_input_with_rag = base_prompt_text + context_for_llm
-
-    contents = [
-        types.Content(
-            role="user",
-            parts=[
-                types.Part.from_text(text=final_user_input_with_rag),
-            ],
-        ),
-    ]
+class RateLimitError(Exception):
+    """LLM API 가 요청 한도를 넘었다고 응답한 경우 (StubLLMClient 에서 흉내낼 때 사용)"""
+    code = 429
+
+
+def is_rate_limited(error):
+    """google-genai APIError(code 429 / 503, RESOURCE_EXHAUSTED) 등 잠시 후 다시 시도해야 하는 오류인지"""
+    code = getattr(error, "code", None) or getattr(error, "status_code", None)
+    return code in (429, 503) or "RESOURCE_EXHAUSTED" in str(error)
+
 
-    # 모델 생성 설정
-    generate_content_config = types.GenerateContentConfig(
+def backoff_delay(attempt):
+    """지수 backoff + jitter (동시에 실패한 요청들이 같은 시각에 다시 몰리지 않도록)"""
+    return min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** attempt)) * random.uniform(0.5, 1.0)
+
+
+def build_generate_content_config():
+    """Gemini 응답 형식(JSON 스키마) 과 시스템 지시문. 요청마다 같으므로 클라이언트 생성 시 한 번만 만든다"""
+    from google import genai
+    from google.genai import types
+    return types.GenerateContentConfig(
         response_mime_type="application/json",
         response_schema=genai.types.Schema(
             type = genai.types.Type.OBJECT,
@@ -374,61 +487,368 @@ def generate_and_store_question(custom_user_prompt=None):
         ],
     )
 
-    MAX_RETRIES = 3 # 최대 재시도 횟수
-
-    for attempt in range(MAX_RETRIES):
-        response = genai_client.models.generate_content(
-            model=model,
+class GeminiClient:
+    """Gemini 로 프롬프트 1개에 대한 문제 JSON 문자열을 생성 (스레드에서 동시에 호출해도 된다)"""
+
+    def __init__(self, api_key=None, model=GEMINI_MODEL):
+        api_key = api_key or GEMINI_API_KEY
+        if not api_key:
+            print("Error: GEMINI_API_KEY environment variable not set.", file=sys.stderr)
+            sys.exit(1)
+        from google import genai
+        self.client = genai.Client(api_key=api_key)
+        self.model = model
+        self.config = build_generate_content_config()
+
+    def generate(self, prompt_text):
+        from google.genai import types
+        contents = [
+            types.Content(
+                role="user",
+                parts=[
+                    types.Part.from_text(text=prompt_text),
+                ],
+            ),
+        ]
+        response = self.client.models.generate_content(
+            model=self.model,
             contents=contents,
-            config=generate_content_config,
+            config=self.config,
         )
-        
-        if not response or not response.text:
-            print(f"No response text received. Retrying... (Attempt {attempt + 1})")
+        return response.text if response else None
+
+
+class StubLLMClient:
+    """
+    로컬 테스트용 LLM 클라이언트. path(JSON 파일 1개 또는 *.json 이 있는 디렉터리) 의 응답을 순서대로 돌려준다.
+    JSON 파일이 배열이면 원소 하나가 응답 하나이다. latency 로 API 지연을, rate_limit_every 로 N 번째 호출마다 429 를 흉내낸다.
+    """
+
+    def __init__(self, path, latency=0.0, rate_limit_every=0):
+        if os.path.isdir(path):
+            files = sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith(".json"))
+        else:
+            files = [path]
+
+        self.responses = []
+        for file_path in files:
+            with open(file_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for item in (data if isinstance(data, list) else [data]):
+                self.responses.append(item if isinstance(item, str) else json.dumps(item, ensure_ascii=False))
+        if not self.responses:
+            raise ValueError(f"No canned responses found in {path}")
+
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate(self, prompt_text):
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+        if self.latency:
+            time.sleep(self.latency)
+        if self.rate_limit_every and call % self.rate_limit_every == 0:
+            raise RateLimitError("429 RESOURCE_EXHAUSTED (stub)")
+        return self.responses[(call - 1) % len(self.responses)]
+
+
+# --- 문제 생성 단계 ---
+def plan_question(custom_user_prompt=None, topic_index=None):
+    """(프롬프트, 메인 주제, 세부 주제). 수동 모드면 주제 없이 전달된 프롬프트를 그대로 사용"""
+    if custom_user_prompt is not None:
+        return custom_user_prompt, None, None
+    selected_topic = TOPICS[topic_index]
+    selected_sub_topic = random.choice(SUB_TOPICS[selected_topic])
+    return generate_prompt_text(selected_topic, selected_sub_topic), selected_topic, selected_sub_topic
+
+
+def build_rag_prompt(base_prompt_text, selected_topic, use_rag=True):
+    """유사 문제 검색 (RAG) 결과로 프롬프트 컨텍스트를 증강 (use_rag=False 면 프롬프트 그대로)"""
+    if not use_rag:
+        return base_prompt_text
+    retrieved_similar_questions = retrieve_similar_questions(base_prompt_text, target_topic=selected_topic, n_results=3)
+
+    context_for_llm = ""
+    if retrieved_similar_questions:
+        print(f"Retrieved {len(retrieved_similar_questions)} similar questions from ChromaDB for RAG context.")
+        context_for_llm += "\n\n# 참고할 기존 문제 (이와는 다른 새로운 문제를 생성해야 함):\n"
+        for i, q_data in enumerate(retrieved_similar_questions):
+            context_for_llm += f"## 기존 문제 {i+1}:\n"
+            context_for_llm += f"Question: {q_data.get('question', 'N/A')}\n"
+            context_for_llm += f"Answer: {q_data.get('answer', 'N/A')}\n\n" # 선택지 제외
+        context_for_llm += "위 문제를 참고하여, **유사하지 않은 완전히 새로운** CS 스킬 4지선다 문제를 JSON 스키마에 맞춰 생성해주세요.\n"
+    else:
+        print("No similar questions found in ChromaDB for RAG context or filters applied (e.g., topic).")
+
+    # 최종 USER_INPUT 구성
+    return base_prompt_text + context_for_llm
+
+
+def validate_question(response_text):
+    """LLM 응답을 문제 dict 로. 스키마에 맞지 않으면 ValueError (백엔드 ingest 가 건너뛰는 형식도 여기서 거른다)"""
+    generated_data = json.loads(response_text)
+    if not isinstance(generated_data, dict):
+        raise ValueError("Expected a JSON object.")
+    if generated_data.get("topic") not in TOPICS:
+        raise ValueError(f"Unknown topic: {generated_data.get('topic')!r}")
+    selections = generated_data.get("selections")
+    if not generated_data.get("question") or not isinstance(selections, list) or len(selections) < 2:
+        raise ValueError("'question' and at least two 'selections' are required.")
+    if generated_data.get("answer") not in selections:
+        raise ValueError("'answer' does not match any selection.")
+    return generated_data
+
+
+def save_question_to_s3(response_text, is_manual_mode):
+    """
+    문제 JSON 을 S3 에 저장하고 key 를 반환. key 는 저장 시각 순으로 정렬된다 (동시 실행 시 충돌하지 않도록 마이크로초 포함).
+    마이크로초는 '_' 로 붙인다: '_' 가 '.' 보다 뒤이므로 같은 초의 예전 형식 key(q-<초>.json) 보다도 사전순으로 뒤에 온다
+    (백엔드 ingest 가 사전순 워터마크 이후만 나열한다).
+    """
+    now = datetime.now().strftime("%Y-%m-%d-%H-%M-%S_%f")
+    # 자동/수동 모드에 따라 S3 경로 접두사 변경 (선택 사항)
+    s3_key_prefix = "cs-question-manual/" if is_manual_mode else "cs-question/"
+    question_file_key = f"{s3_key_prefix}q-{now}.json"
+
+    resources.s3.put_object(
+        Body=response_text.encode('utf-8'), # S3는 bytes를 선호
+        Bucket=BUCKET_NAME,
+        Key=question_file_key,
+    )
+    location = os.path.join(OUTPUT_DIR, question_file_key) if OUTPUT_DIR else f"S3://{BUCKET_NAME}/{question_file_key}"
+    print(f"Successfully generated and saved question to {location}")
+    return question_file_key
+
+
+def store_question(response_text, generated_data, is_manual_mode, use_rag=True):
+    """
+    검증된 문제를 저장하고 S3 key 를 반환: 문장 중복 검사(MinHash) -> 의미 중복 검사(임베딩) -> S3 저장 -> 임베딩 / MinHash 저장.
+    거의 같은 문제가 이미 있으면 DuplicateQuestionError (S3 에도 저장하지 않는다).
+    문장을 조금 고쳐 쓴 중복은 MinHash 단계에서 걸러지므로 임베딩 모델 / 벡터 저장소를 호출하지 않는다.
+    """
+    lexical_index = resources.lexical_index
+    signature = None
+    if lexical_index is not None:
+        from lexical_dedup import question_signature
+        signature = question_signature(generated_data)
+        duplicate = lexical_index.find_duplicate(signature, LEXICAL_DUPLICATE_THRESHOLD)
+        if duplicate is not None:
+            raise DuplicateQuestionError(
+                f"Lexical near-duplicate of {duplicate[0]} (estimated Jaccard {duplicate[1]:.2f})"
+            )
+
+    question_embedding = None
+    if use_rag:
+        question_embedding = encode_text(generated_data["question"])
+        check_not_duplicate(generated_data, question_embedding)
+
+    # S3에 JSON 파일로 저장
+    key = save_question_to_s3(response_text, is_manual_mode)
+    print(f"Question: {generated_data.get('question', 'N/A')[:50]}...")
+
+    # 생성된 문제를 ChromaDB에 바로 임베딩 추가
+    if use_rag:
+        embed_and_store_single_question(generated_data, question_embedding)
+    if lexical_index is not None:
+        lexical_index.add(key, signature)
+    return key
+
+
+# --- 메인 문제 생성 함수 ---
+def generate_and_store_question(custom_user_prompt=None, llm=None, use_rag=True):
+    llm = llm or GeminiClient()
+    is_manual_mode = (custom_user_prompt is not None)
+    next_topic_index = -1
+
+    # 1. USER_INPUT 결정 및 모드 설정
+    if not is_manual_mode: # 자동 모드 (Cronjob 시뮬레이션)
+        print("Running in automatic mode (simulating Cronjob).")
+        last_index = get_last_topic_index(resources.s3, BUCKET_NAME)
+        next_topic_index = (last_index + 1) % len(TOPICS)
+    else: # 수동 모드
+        print("Running in manual mode with custom prompt.")
+        # 수동 모드에서는 RAG 검색 시 topic 필터링을 하지 않음 (프롬프트에서 topic 추출 로직 필요시 추가)
+        print("NOTE: In manual mode, RAG search will NOT filter by topic. Consider refining your prompt for specificity.")
+    base_prompt_text, selected_topic, selected_sub_topic = plan_question(custom_user_prompt, next_topic_index)
+    if not is_manual_mode:
+        print(f"Selected Topic: {selected_topic}, Sub-Topic: {selected_sub_topic}")
+
+    # 2. 유사 문제 검색 (RAG) 및 프롬프트 컨텍스트 증강
+    final_user_input_with_rag = build_rag_prompt(base_prompt_text, selected_topic, use_rag)
+
+    attempt = 0
+    rate_limited = 0
+    while attempt < MAX_RETRIES:
+        try:
+            response_text = llm.generate(final_user_input_with_rag)
+        except Exception as e:
+            if is_rate_limited(e) and rate_limited < MAX_RATE_LIMIT_RETRIES:
+                delay = backoff_delay(rate_limited)
+                rate_limited += 1
+                print(f"Rate limited by LLM API: {e}. Backing off {delay:.1f}s...")
+                time.sleep(delay)
+                continue
+            raise
+
+        attempt += 1
+        if not response_text:
+            print(f"No response text received. Retrying... (Attempt {attempt})")
             continue
 
         try:
-            generated_data = json.loads(response.text)
-            
-            # S3에 JSON 파일로 저장
-            now = datetime.now().strftime("%Y-%m-%d-%H-%M-%S")
-            # 자동/수동 모드에 따라 S3 경로 접두사 변경 (선택 사항)
-            s3_key_prefix = "cs-question/"
-            if is_manual_mode: 
-                s3_key_prefix = "cs-question-manual/"
-            
-            question_file_key = f"{s3_key_prefix}q-{now}.json"
-            
-            s3_client.put_object(
-                Body=response.text.encode('utf-8'), # S3는 bytes를 선호
-                Bucket=BUCKET_NAME,
-                Key=question_file_key,
-            )
-            print(f"Successfully generated and saved question to S3://{BUCKET_NAME}/{question_file_key}")
-            print(f"Question: {generated_data.get('question', 'N/A')[:50]}...")
+            generated_data = validate_question(response_text)
 
-            # 생성된 문제를 ChromaDB에 바로 임베딩 추가
-            embed_and_store_single_question(generated_data)
+            # 중복 검사 후 S3 / ChromaDB 에 저장
+            store_question(response_text, generated_data, is_manual_mode, use_rag)
 
             # Cronjob 모드일 때만 상태 업데이트 (S3에 다음 토픽 인덱스 저장)
             if not is_manual_mode:
-                update_last_topic_index(s3_client, BUCKET_NAME, next_topic_index)
-            
+                update_last_topic_index(resources.s3, BUCKET_NAME, next_topic_index)
+
             return # 성공 시 함수 종료
 
-        except json.JSONDecodeError as jde:
-            print(f"JSON Decode Error from Gemini response: {jde}. Raw response: {response.text}. Retrying... (Attempt {attempt + 1})")
-            continue 
-        except s3_client.exceptions.ClientError as s3_ce:
-            print(f"S3 Error: {s3_ce}. Check AWS credentials and bucket name. Retrying... (Attempt {attempt + 1})")
+        except DuplicateQuestionError as de:
+            print(f"{de}. Retrying... (Attempt {attempt})")
+            continue
+        except (json.JSONDecodeError, ValueError) as ve:
+            print(f"Invalid question from LLM response: {ve}. Raw response: {response_text}. Retrying... (Attempt {attempt})")
+            continue
+        except resources.s3.exceptions.ClientError as s3_ce:
+            print(f"S3 Error: {s3_ce}. Check AWS credentials and bucket name. Retrying... (Attempt {attempt})")
             continue
         except Exception as e:
-            print(f"An unexpected error occurred during save or embed: {e}. Retrying... (Attempt {attempt + 1})")
-            continue 
+            print(f"An unexpected error occurred during save or embed: {e}. Retrying... (Attempt {attempt})")
+            continue
 
     print(f"Failed to generate a valid question after {MAX_RETRIES} attempts.")
     sys.exit(1)
 
+
+# --- 배치 생성 (--count N --concurrency K) ---
+class BatchGenerator:
+    """
+    문제 count 개를 최대 concurrency 개씩 동시에 생성하는 asyncio 파이프라인.
+    한 문제는 RAG 검색 -> LLM 호출 -> 검증 -> S3 저장 -> 임베딩 순으로 처리되며, 블로킹 호출(SDK / boto3 / 임베딩) 은
+    concurrency 크기의 스레드 풀에서 실행한다. 요청 한도(429) 를 받으면 backoff 하면서 다른 작업도 그 시각까지 LLM 호출을 멈춘다.
+    중복 검사 -> S3 저장 -> 임베딩 저장은 한 번에 하나씩 해서, 동시에 만들어진 비슷한 문제가 함께 검사를 통과하지 않게 하고
+    key(저장 시각) 순서와 버킷에 보이는 순서를 맞춘다 (백엔드 ingest 가 key 순으로 이어 읽는다).
+    """
+
+    def __init__(self, llm, concurrency, custom_user_prompt=None, use_rag=True):
+        self.llm = llm
+        self.concurrency = concurrency
+        self.custom_user_prompt = custom_user_prompt
+        self.is_manual_mode = (custom_user_prompt is not None)
+        self.use_rag = use_rag
+
+    async def _call(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def _generate_text(self, prompt_text):
+        """LLM 호출. 요청 한도 초과면 공유 cooldown 을 설정하고 backoff 후 다시 시도"""
+        rate_limited = 0
+        while True:
+            wait = self.cooldown_until - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                return await self._call(self.llm.generate, prompt_text)
+            except Exception as e:
+                if not is_rate_limited(e) or rate_limited >= MAX_RATE_LIMIT_RETRIES:
+                    raise
+                delay = backoff_delay(rate_limited)
+                rate_limited += 1
+                self.cooldown_until = max(self.cooldown_until, time.monotonic() + delay)
+                self.rate_limit_hits += 1
+                print(f"Rate limited by LLM API: {e}. Backing off {delay:.1f}s...")
+
+    async def _process(self, index, topic_index):
+        async with self.semaphore:
+            base_prompt_text, selected_topic, selected_sub_topic = plan_question(self.custom_user_prompt, topic_index)
+            print(f"[{index + 1}] Topic: {selected_topic}, Sub-Topic: {selected_sub_topic}")
+            prompt_text = await self._call(build_rag_prompt, base_prompt_text, selected_topic, self.use_rag)
+
+            for attempt in range(1, MAX_RETRIES + 1):
+                try:
+                    response_text = await self._generate_text(prompt_text)
+                    if not response_text:
+                        raise ValueError("No response text received.")
+                    generated_data = validate_question(response_text)
+                except (json.JSONDecodeError, ValueError) as ve:
+                    print(f"[{index + 1}] Invalid question from LLM response: {ve}. Retrying... (Attempt {attempt})")
+                    continue
+
+                try:
+                    # 중복 검사부터 임베딩 저장까지 한 번에 하나씩: 동시에 생성된 비슷한 문제 둘이 모두 검사를 통과하지 않도록
+                    async with self.upload_lock:
+                        return await self._call(
+                            store_question, response_text, generated_data, self.is_manual_mode, self.use_rag
+                        )
+                except DuplicateQuestionError as de:
+                    print(f"[{index + 1}] {de}. Retrying... (Attempt {attempt})")
+                except Exception as e:
+                    print(f"[{index + 1}] Failed to store question: {e}. Retrying... (Attempt {attempt})")
+
+            print(f"[{index + 1}] Failed to generate a valid question after {MAX_RETRIES} attempts.", file=sys.stderr)
+            return None
+
+    async def run(self, count):
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        self.upload_lock = asyncio.Lock()
+        self.cooldown_until = 0.0
+        self.rate_limit_hits = 0
+
+        # 모든 작업이 S3 / RAG 검색을 쓰므로 S3 클라이언트, 모델 로드, ChromaDB 연결을 동시에 먼저 준비
+        resources.warm_up(*(resources.NAMES if self.use_rag else ("s3",)))
+
+        # 자동 모드는 마지막 토픽 다음부터 순서대로 나눠 준다 (상태 파일은 배치가 끝난 뒤 한 번만 갱신)
+        topic_indexes = [None] * count
+        if not self.is_manual_mode:
+            last_index = get_last_topic_index(resources.s3, BUCKET_NAME)
+            topic_indexes = [(last_index + 1 + i) % len(TOPICS) for i in range(count)]
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as self.executor:
+            results = await asyncio.gather(
+                *(self._process(i, topic_index) for i, topic_index in enumerate(topic_indexes)),
+                return_exceptions=True,
+            )
+
+        keys = []
+        last_stored_topic = None
+        for i, result in enumerate(results):
+            if isinstance(result, BaseException):
+                print(f"[{i + 1}] Failed: {result}", file=sys.stderr)
+            elif result is not None:
+                keys.append(result)
+                last_stored_topic = topic_indexes[i]
+
+        # 마지막으로 저장에 성공한 문제의 토픽을 기록 (뒤쪽 작업이 실패했으면 다음 배치가 그 토픽부터 다시 만든다)
+        if last_stored_topic is not None:
+            update_last_topic_index(resources.s3, BUCKET_NAME, last_stored_topic)
+        return keys
+
+
+def generate_questions_batch(count, concurrency, custom_user_prompt=None, llm=None, use_rag=True):
+    """문제 count 개를 동시 생성하고 결과를 출력. 하나도 만들지 못하면 종료 코드 1"""
+    started = time.monotonic()
+    generator = BatchGenerator(llm or GeminiClient(), concurrency, custom_user_prompt, use_rag)
+    keys = asyncio.run(generator.run(count))
+    elapsed = time.monotonic() - started
+
+    print(
+        f"Generated {len(keys)}/{count} questions in {elapsed:.1f}s "
+        f"(concurrency={concurrency}, rate-limit backoffs={generator.rate_limit_hits})"
+    )
+    if not keys:
+        sys.exit(1)
+    return keys
+
+
+MODULE_LOADED_AT = time.perf_counter()
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Generate CS skill quiz questions using Gemini API.")
     parser.add_argument(
@@ -441,27 +861,74 @@ if __name__ == "__main__":
         type=str,
         help="Path to a JSON file containing the custom prompt (e.g., {'prompt': '...'}) or raw text."
     )
+    parser.add_argument(
+        "--count",
+        type=int,
+        default=1,
+        help="Number of questions to generate in this run (batch mode when greater than 1)."
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Maximum number of questions generated at the same time in batch mode."
+    )
+    parser.add_argument(
+        "--no-rag",
+        action="store_true",
+        help="Skip similar-question retrieval and ChromaDB storage (no embedding model load or ChromaDB connection)."
+    )
+    parser.add_argument(
+        "--stub-llm",
+        type=str,
+        help="Path to a JSON file (or directory of JSON files) with canned LLM responses, used instead of Gemini."
+    )
+    parser.add_argument(
+        "--stub-latency",
+        type=float,
+        default=0.0,
+        help="Simulated LLM latency in seconds for --stub-llm."
+    )
+    parser.add_argument(
+        "--output-dir",
+        type=str,
+        default=OUTPUT_DIR,
+        help="Write questions and state to this directory instead of S3 (same key layout, no AWS settings needed)."
+    )
 
-args = parser.parse_args()
-
-# 일반 문제 생성 모드
-custom_input = None
-if args.prompt:
-    custom_input = args.prompt
-# elif args.input_file:
-#     try:
-#         with open(args.input_file, 'r', encoding='utf-8') as f:
-#             file_content = f.read()
-#             try:
-#                 json_data = json.loads(file_content)
-#                 custom_input = json_data.get("prompt", file_content)
-#             except json.JSONDecodeError:
-#                 custom_input = file_content
-#     except FileNotFoundError:
-#         print(f"Error: Input file '{args.input_file}' not found.", file=sys.stderr)
-#         sys.exit(1)
-#     except Exception as e:
-#         print(f"Error reading input file '{args.input_file}': {e}", file=sys.stderr)
-#         sys.exit(1)
-
-generate_and_store_question(custom_user_prompt=custom_input)
\ No newline at end of file
+    args = parser.parse_args()
+    if args.count < 1 or args.concurrency < 1:
+        parser.error("--count and --concurrency must be at least 1.")
+    OUTPUT_DIR = args.output_dir
+    check_environment()
+
+    # 일반 문제 생성 모드
+    custom_input = None
+    if args.prompt:
+        custom_input = args.prompt
+    # elif args.input_file:
+    #     try:
+    #         with open(args.input_file, 'r', encoding='utf-8') as f:
+    #             file_content = f.read()
+    #             try:
+    #                 json_data = json.loads(file_content)
+    #                 custom_input = json_data.get("prompt", file_content)
+    #             except json.JSONDecodeError:
+    #                 custom_input = file_content
+    #     except FileNotFoundError:
+    #         print(f"Error: Input file '{args.input_file}' not found.", file=sys.stderr)
+    #         sys.exit(1)
+    #     except Exception as e:
+    #         print(f"Error reading input file '{args.input_file}': {e}", file=sys.stderr)
+    #         sys.exit(1)
+
+    use_rag = not args.no_rag
+    try:
+        llm = StubLLMClient(args.stub_llm, latency=args.stub_latency) if args.stub_llm else GeminiClient()
+        if args.count > 1:
+            generate_questions_batch(args.count, args.concurrency, custom_user_prompt=custom_input, llm=llm, use_rag=use_rag)
+        else:
+            generate_and_store_question(custom_user_prompt=custom_input, llm=llm, use_rag=use_rag)
+    finally:
+        resources.close()
+        print(resources.report())
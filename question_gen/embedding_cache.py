@@ -0,0 +1,165 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+INDEX_FILE = "index.json"
+VECTORS_FILE = "vectors.f32"
+FLUSH_EVERY = 64 # 새 항목이 이만큼 쌓이면 index 를 디스크에 기록
+EVICT_FRACTION = 8 # 한 번에 내보내는 항목은 capacity 의 1/8 이하 (작은 캐시가 eviction 때마다 반 가까이 비지 않도록)
+
+
+class EmbeddingCache:
+    """
+    (모델 이름 + 텍스트) 의 sha256 을 key 로 하는 디스크 임베딩 캐시.
+
+    벡터는 directory/vectors.f32 (capacity x dim float32 행렬, np.memmap) 의 한 행에, key -> 행 번호는 LRU 순서대로
+    directory/index.json 에 저장한다. capacity 는 max_bytes 로 정해지며, 가득 차면 가장 오래 쓰지 않은 항목을
+    FLUSH_EVERY 개(capacity 의 1/EVICT_FRACTION 이하) 내보내고 index 를 먼저 기록한 뒤 그 행들을 재사용한다 (디스크의 index 가 가리키는 행은 덮어쓰지 않는다).
+    한 프로세스 안에서는 여러 스레드가 같이 써도 되지만, 같은 디렉터리를 여러 프로세스가 동시에 쓰는 것은 고려하지 않는다
+    (cron 실행은 순차적). index 는 임시 파일에 쓴 뒤 교체하므로 중간에 종료되어도 마지막으로 기록된 상태는 깨지지 않는다.
+    """
+
+    def __init__(self, directory, model_name, max_bytes=64 * 1024 * 1024):
+        self.directory = directory
+        self.model_name = model_name
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._dirty = 0 # 마지막 flush 이후 새로 쓴 항목 수
+        self._touched = False # 마지막 flush 이후 LRU 순서가 바뀌었는지 (조회 적중)
+        self._vectors = None
+        self._entries = OrderedDict() # key -> 행 번호 (앞쪽이 가장 오래 쓰지 않은 항목)
+        self._free_rows = [] # 내보낸 항목의 행. 디스크의 index 에서도 빠진 뒤에만 여기 들어온다
+        self._next_row = 0
+        self.dim = None
+        self.capacity = None
+        self._load()
+
+    # --- 저장 / 로드 ---
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _load(self):
+        try:
+            with open(self._path(INDEX_FILE), "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        # 다른 모델의 캐시, 행렬 크기가 index 와 맞지 않는 (잘린) vectors.f32, 깨진 index 는 쓰지 않고 처음 put 할 때 새로 만든다
+        if not isinstance(index, dict) or index.get("model") != self.model_name:
+            return
+        try:
+            dim, capacity, next_row = int(index["dim"]), int(index["capacity"]), int(index["next_row"])
+            entries = OrderedDict((str(key), int(row)) for key, row in index["entries"])
+            size = os.path.getsize(self._path(VECTORS_FILE))
+        except (KeyError, TypeError, ValueError, OSError):
+            return
+        if dim < 1 or capacity < 1 or size != capacity * dim * 4 or not 0 <= next_row <= capacity:
+            return
+        if any(not 0 <= row < next_row for row in entries.values()) or len(set(entries.values())) != len(entries):
+            return
+
+        self.dim = dim
+        self.capacity = capacity
+        self._next_row = next_row
+        self._entries = entries
+        # 내보낸 뒤 다시 쓰기 전에 종료된 행
+        self._free_rows = sorted(set(range(self._next_row)) - set(self._entries.values()), reverse=True)
+        self._vectors = np.memmap(self._path(VECTORS_FILE), dtype=np.float32, mode="r+", shape=(self.capacity, self.dim))
+
+    def _create(self, dim):
+        os.makedirs(self.directory, exist_ok=True)
+        self.dim = dim
+        self.capacity = max(1, self.max_bytes // (dim * 4))
+        self._next_row = 0
+        self._entries = OrderedDict()
+        self._free_rows = []
+        # 파일 크기만 잡아 두고(sparse) 실제로 쓴 행만 디스크를 차지한다
+        self._vectors = np.memmap(self._path(VECTORS_FILE), dtype=np.float32, mode="w+", shape=(self.capacity, dim))
+
+    def flush(self):
+        """memmap 의 변경 내용과 index 를 디스크에 기록"""
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if self._vectors is None or not (self._dirty or self._touched):
+            return
+        self._vectors.flush()
+        index = {
+            "model": self.model_name,
+            "dim": self.dim,
+            "capacity": self.capacity,
+            "next_row": self._next_row,
+            "entries": list(self._entries.items()),
+        }
+        tmp_path = self._path(INDEX_FILE + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, separators=(",", ":"))
+        os.replace(tmp_path, self._path(INDEX_FILE))
+        self._dirty = 0
+        self._touched = False
+
+    # --- 조회 / 저장 ---
+    def key(self, text):
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest()[:32]
+
+    def get(self, text):
+        """캐시된 벡터(float32 ndarray 복사본) 또는 None"""
+        key = self.key(text)
+        with self._lock:
+            row = self._entries.get(key)
+            if row is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._touched = True
+            self.hits += 1
+            return np.array(self._vectors[row])
+
+    def put(self, text, vector):
+        vector = np.asarray(vector, dtype=np.float32).reshape(-1)
+        key = self.key(text)
+        with self._lock:
+            if self._vectors is None or vector.shape[0] != self.dim:
+                self._create(vector.shape[0])
+
+            row = self._entries.get(key)
+            if row is None:
+                if self._next_row < self.capacity:
+                    row = self._next_row
+                    self._next_row += 1
+                else:
+                    if not self._free_rows:
+                        self._evict()
+                    row = self._free_rows.pop()
+            self._entries[key] = row
+            self._entries.move_to_end(key)
+            self._vectors[row] = vector
+
+            self._dirty += 1
+            if self._dirty >= FLUSH_EVERY:
+                self._flush()
+
+    def _evict(self):
+        """
+        가장 오래 쓰지 않은 항목을 FLUSH_EVERY 개(capacity 의 1/EVICT_FRACTION 이하) 내보내고 index 를 바로 기록한다 (LRU).
+        기록 전에 행을 덮어쓰면 중간에 종료됐을 때 디스크의 index 가 내보낸 key 로 다른 텍스트의 벡터를 돌려주므로,
+        한 번에 여러 행을 비워 index 기록 횟수를 줄인다. 작은 캐시에서는 기록이 잦아지는 대신 캐시가 거의 가득 찬 상태를 유지한다.
+        """
+        for _ in range(min(FLUSH_EVERY, max(1, self.capacity // EVICT_FRACTION), len(self._entries))):
+            _, row = self._entries.popitem(last=False)
+            self._free_rows.append(row)
+        self._touched = True
+        self._flush()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        return f"embedding cache: {len(self)} entries, {self.hits} hits, {self.misses} misses"
@@ -0,0 +1,156 @@
+import os
+import re
+import threading
+import unicodedata
+
+import numpy as np
+
+SIGNATURES_FILE = "signatures.u32"
+IDS_FILE = "ids.txt"
+
+NUM_PERM = 128
+BANDS = 32 # BANDS x ROWS == NUM_PERM. 후보가 되는 Jaccard 기준 ~ (1 / BANDS) ** (1 / ROWS) = 0.42
+ROWS = 4
+SHINGLE_SIZE = 3
+
+_MAX_HASH = np.uint64((1 << 32) - 1)
+# 마크다운 기호 / 구두점 / 공백은 shingle 에서 제외 (**굵게**, `코드` 표기나 띄어쓰기만 다른 문장을 같게 본다)
+_IGNORED_RE = re.compile(r"[\W_]+", re.UNICODE)
+
+# 모든 실행에서 같은 hash 함수를 써야 저장된 signature 와 비교할 수 있으므로 seed 고정
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(0, 1 << 63, size=NUM_PERM, dtype=np.uint64) * np.uint64(2) + np.uint64(1) # 홀수
+_PERM_B = _rng.randint(0, 1 << 63, size=NUM_PERM, dtype=np.uint64)
+_BAND_MULT = (_rng.randint(0, 1 << 63, size=(BANDS, ROWS), dtype=np.uint64) * np.uint64(2) + np.uint64(1))
+
+
+def normalize(text):
+    """NFKC 정규화 + 소문자 후 공백 / 구두점 / 마크다운 기호 제거"""
+    return _IGNORED_RE.sub("", unicodedata.normalize("NFKC", text or "").lower())
+
+
+def shingle_hashes(text, size=SHINGLE_SIZE):
+    """
+    문자 n-gram 의 32bit 해시 배열. 한국어는 띄어쓰기와 조사 붙임이 제각각이므로 공백을 모두 지운 뒤
+    음절(한 글자) 단위로 자른다. code point(21bit) 3개를 64bit 정수 하나로 묶고 splitmix64 로 섞어서
+    shingle 마다 파이썬 해시 함수를 호출하지 않는다.
+    """
+    code_points = np.frombuffer(normalize(text).encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    if code_points.size == 0:
+        return np.empty(0, dtype=np.uint64)
+    if code_points.size < size:
+        code_points = np.concatenate([code_points, np.zeros(size - code_points.size, dtype=np.uint64)])
+
+    packed = np.zeros(code_points.size - size + 1, dtype=np.uint64)
+    for offset in range(size):
+        packed = (packed << np.uint64(21)) | code_points[offset:offset + packed.size]
+
+    # splitmix64 (uint64 곱셈은 overflow 시 wrap)
+    with np.errstate(over="ignore"):
+        z = packed + np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        z = z ^ (z >> np.uint64(31))
+    return z & _MAX_HASH
+
+
+def minhash(hashes):
+    """shingle 해시(중복 허용) 의 MinHash signature (NUM_PERM 개 uint32)"""
+    hashes = np.unique(hashes)
+    if hashes.size == 0:
+        return np.full(NUM_PERM, _MAX_HASH, dtype=np.uint32)
+    # permutation 대신 multiply-shift hash: (a * x + b) mod 2^64 의 상위 32bit (나머지 연산 없이 uint64 overflow 로 mod)
+    with np.errstate(over="ignore"):
+        permuted = (np.outer(_PERM_A, hashes) + _PERM_B[:, None]) >> np.uint64(32)
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+def question_signature(question_data):
+    """문제의 question + answer 로 만든 signature"""
+    return minhash(np.concatenate([
+        shingle_hashes(question_data.get("question")),
+        shingle_hashes(question_data.get("answer")),
+    ]))
+
+
+def band_keys(signatures):
+    """
+    signature 행렬(n x NUM_PERM) 의 band 별 bucket key (n x BANDS 개의 int).
+    band 마다 다른 계수로 ROWS 개 값을 64bit 하나로 섞으므로 band 번호 없이 key 만으로 bucket 을 구분한다.
+    """
+    bands = np.asarray(signatures, dtype=np.uint64).reshape(-1, BANDS, ROWS)
+    with np.errstate(over="ignore"):
+        return (bands * _BAND_MULT).sum(axis=2, dtype=np.uint64).tolist()
+
+
+class LexicalDuplicateIndex:
+    """
+    MinHash signature 의 LSH(band) 인덱스. 거의 같은 문장을 고쳐 쓴 문제를 임베딩 모델 / 벡터 저장소 없이 걸러낸다.
+
+    signature 는 directory/signatures.u32 (문제당 NUM_PERM x 4 바이트) 에, id 는 directory/ids.txt 에 추가만 하며 저장하고,
+    band bucket 은 로드할 때 signature 로 다시 만든다. 같은 bucket 에 들어간 후보만 signature 일치 비율(추정 Jaccard) 로 비교한다.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._ids = []
+        self._signatures = []
+        self._buckets = {}
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _load(self):
+        if not os.path.exists(self._path(IDS_FILE)):
+            return
+        with open(self._path(IDS_FILE), "r", encoding="utf-8") as f:
+            raw = f.read()
+        ids = raw.split("\n")[:-1] # 마지막 줄이 개행 없이 끊겼으면 버린다
+        signatures = np.fromfile(self._path(SIGNATURES_FILE), dtype=np.uint32)
+        count = min(len(ids), signatures.size // NUM_PERM)
+
+        # 기록 도중 끊긴 꼬리를 잘라내야 이후 add 가 경계에 맞춰 이어 쓴다
+        if signatures.size != count * NUM_PERM:
+            with open(self._path(SIGNATURES_FILE), "r+b") as f:
+                f.truncate(count * NUM_PERM * 4)
+        if count != len(ids) or not raw.endswith("\n") and raw:
+            with open(self._path(IDS_FILE), "w", encoding="utf-8") as f:
+                f.write("".join(f"{id_}\n" for id_ in ids[:count]))
+
+        signatures = signatures[:count * NUM_PERM].reshape(-1, NUM_PERM)
+        for id_, signature, keys in zip(ids[:count], signatures, band_keys(signatures)):
+            self._insert(id_, signature, keys)
+
+    def _insert(self, id_, signature, keys):
+        row = len(self._ids)
+        self._ids.append(id_)
+        self._signatures.append(signature)
+        for key in keys:
+            self._buckets.setdefault(key, []).append(row)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def find_duplicate(self, signature, threshold):
+        """추정 Jaccard 가 threshold 이상인 가장 비슷한 (id, 유사도), 없으면 None"""
+        with self._lock:
+            candidates = {row for key in band_keys(signature)[0] for row in self._buckets.get(key, ())}
+            best = None
+            for row in candidates:
+                similarity = float(np.count_nonzero(self._signatures[row] == signature)) / NUM_PERM
+                if similarity >= threshold and (best is None or similarity > best[1]):
+                    best = (self._ids[row], similarity)
+            return best
+
+    def add(self, id_, signature):
+        signature = np.asarray(signature, dtype=np.uint32)
+        with self._lock:
+            # signature 를 먼저 기록해야 id 만 있고 signature 가 없는 행이 생기지 않는다
+            with open(self._path(SIGNATURES_FILE), "ab") as f:
+                f.write(signature.tobytes())
+            with open(self._path(IDS_FILE), "a", encoding="utf-8") as f:
+                f.write(f"{id_}\n")
+            self._insert(id_, signature, band_keys(signature)[0])
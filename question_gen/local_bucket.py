@@ -0,0 +1,56 @@
+import io
+import os
+import tempfile
+
+
+class LocalBucketError(Exception):
+    pass
+
+
+class NoSuchKey(LocalBucketError):
+    pass
+
+
+class _Exceptions:
+    # boto3 클라이언트의 client.exceptions.NoSuchKey / ClientError 와 같은 방식으로 잡을 수 있도록
+    NoSuchKey = NoSuchKey
+    ClientError = LocalBucketError
+
+
+class LocalBucket:
+    """
+    S3 클라이언트 대신 쓰는 로컬 디렉터리 (OUTPUT_DIR). 생성기가 쓰는 put_object / get_object 만 흉내내며,
+    Bucket 은 무시하고 key 를 root 아래 경로로 쓴다. 백엔드 ingest 의 `--dir` (LocalSource) 가 그대로 읽는 구조이다.
+    """
+    exceptions = _Exceptions
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+
+    def _path(self, key):
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            raise LocalBucketError(f"Key escapes the output directory: {key!r}")
+        return path
+
+    def put_object(self, Body, Key, Bucket=None, **kwargs):
+        # 임시 파일에 쓰고 rename 해서, ingest 가 쓰는 중인 파일을 읽지 않도록 한다
+        path = self._path(Key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(Body.encode("utf-8") if isinstance(Body, str) else Body)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return {}
+
+    def get_object(self, Key, Bucket=None, **kwargs):
+        try:
+            with open(self._path(Key), "rb") as f:
+                return {"Body": io.BytesIO(f.read())}
+        except FileNotFoundError:
+            raise NoSuchKey(Key) from None
@@ -0,0 +1,215 @@
+"""
+stub LLM + 로컬 출력 디렉터리로 배치 생성을 끝까지 실행하는 테스트 (Gemini / AWS / 임베딩 모델 없이 동작)
+
+    cd question_gen && python -m unittest test_batch_generation
+"""
+import asyncio
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from datetime import datetime
+from unittest import mock
+
+import cs_question_generation_v2 as gen
+
+SCRIPT = os.path.abspath(gen.__file__)
+# import 만으로 수 초가 걸리는 모듈. 실행 중 import 하면 ImportError 가 나도록 sys.modules 에서 막는다
+HEAVY_MODULES = ("boto3", "sentence_transformers", "chromadb", "google.genai")
+
+
+class InFlightStubLLM(gen.StubLLMClient):
+    """동시에 진행 중인 generate 호출 수의 최댓값을 기록하는 stub"""
+
+    def __init__(self, path, latency):
+        super().__init__(path, latency=latency)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._count_lock = threading.Lock()
+
+    def generate(self, prompt_text):
+        with self._count_lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            return super().generate(prompt_text)
+        finally:
+            with self._count_lock:
+                self.in_flight -= 1
+
+
+def canned_question(index):
+    topic = gen.TOPICS[index % len(gen.TOPICS)]
+    return {
+        "topic": topic,
+        "question": f"{topic} 문제 {index}",
+        "answer": f"정답 {index}",
+        "selections": [f"정답 {index}", f"오답 {index}-1", f"오답 {index}-2", f"오답 {index}-3"],
+    }
+
+
+class BatchGenerationTests(unittest.TestCase):
+    count = 6
+    concurrency = 2
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.output_dir = os.path.join(self.tmp, "bucket")
+
+        responses_path = os.path.join(self.tmp, "responses.json")
+        self.responses = [canned_question(i) for i in range(self.count)]
+        with open(responses_path, "w", encoding="utf-8") as f:
+            json.dump(self.responses, f, ensure_ascii=False)
+        self.llm = InFlightStubLLM(responses_path, latency=0.05)
+
+        # 모듈 전역 리소스 / 설정을 테스트마다 새로 (MinHash 인덱스, 임베딩 캐시는 쓰지 않음)
+        for name, value in {
+            "OUTPUT_DIR": self.output_dir,
+            "BUCKET_NAME": None,
+            "LEXICAL_INDEX_DIR": "",
+            "EMBEDDING_CACHE_DIR": "",
+            "resources": gen.Resources(),
+        }.items():
+            patcher = mock.patch.object(gen, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_batch_writes_questions_and_state_to_output_dir(self):
+        gen.check_environment() # OUTPUT_DIR 이면 BUCKET_NAME / AWS 설정 없이 통과
+        generator = gen.BatchGenerator(self.llm, self.concurrency, use_rag=False)
+        keys = asyncio.run(generator.run(self.count))
+
+        self.assertEqual(len(keys), self.count)
+        self.assertEqual(self.llm.calls, self.count)
+        self.assertLessEqual(self.llm.max_in_flight, self.concurrency)
+        self.assertGreater(self.llm.max_in_flight, 1)
+
+        # 백엔드 ingest 의 LocalSource(root=OUTPUT_DIR, prefix='cs-question/') 가 읽는 구조
+        names = sorted(os.listdir(os.path.join(self.output_dir, "cs-question")))
+        self.assertEqual(["cs-question/" + name for name in names], sorted(keys))
+        self.assertTrue(all(name.startswith("q-") and name.endswith(".json") for name in names))
+        written = []
+        for key in keys:
+            with open(os.path.join(self.output_dir, key), encoding="utf-8") as f:
+                written.append(json.load(f))
+        self.assertCountEqual([item["question"] for item in written], [item["question"] for item in self.responses])
+
+        with open(os.path.join(self.output_dir, "cs-question-state", "last_topic_index.json")) as f:
+            self.assertEqual(json.load(f), {"last_topic_index": (self.count - 1) % len(gen.TOPICS)})
+
+    def test_next_batch_continues_from_saved_topic(self):
+        asyncio.run(gen.BatchGenerator(self.llm, self.concurrency, use_rag=False).run(2))
+        self.assertEqual(gen.get_last_topic_index(gen.resources.s3, gen.BUCKET_NAME), 1)
+
+        asyncio.run(gen.BatchGenerator(self.llm, self.concurrency, use_rag=False).run(2))
+        self.assertEqual(gen.get_last_topic_index(gen.resources.s3, gen.BUCKET_NAME), 3)
+        self.assertEqual(len(os.listdir(os.path.join(self.output_dir, "cs-question"))), 4)
+
+    def test_state_records_topic_of_last_stored_question(self):
+        generator = gen.BatchGenerator(self.llm, self.concurrency, use_rag=False)
+        process = generator._process
+
+        async def fail_tail(index, topic_index):
+            # 마지막 두 작업: 하나는 재시도를 모두 실패, 하나는 예외
+            if index == 3:
+                return None
+            if index == 4:
+                raise RuntimeError("upload failed")
+            return await process(index, topic_index)
+
+        generator._process = fail_tail
+        keys = asyncio.run(generator.run(5))
+        self.assertEqual(len(keys), 3)
+        self.assertEqual(gen.get_last_topic_index(gen.resources.s3, gen.BUCKET_NAME), 2)
+
+    def test_keys_sort_after_legacy_keys(self):
+        # 예전 형식(초 단위) key 와 섞여도 사전순이 저장 시각 순이어야 ingest 의 StartAfter 워터마크가 건너뛰지 않는다
+        second = datetime(2024, 1, 1, 0, 0, 0)
+        times = [second, second.replace(microsecond=1), second.replace(second=1, microsecond=5)]
+        with mock.patch.object(gen, "datetime", mock.Mock(now=mock.Mock(side_effect=times))):
+            keys = [gen.save_question_to_s3("{}", is_manual_mode=False) for _ in times]
+
+        legacy = ["cs-question/q-2024-01-01-00-00-00.json", "cs-question/q-2024-01-01-00-00-01.json"]
+        self.assertEqual(sorted(keys + legacy), [legacy[0], keys[0], keys[1], legacy[1], keys[2]])
+
+
+class StartupTests(unittest.TestCase):
+    """--help / 검증 실패 / --no-rag 실행이 임베딩 모델과 ChromaDB 를 만들지 않는지 (Resources.timings, report())"""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+    def run_script(self, *argv, **env):
+        """스크립트를 __main__ 으로 실행하고 (종료 코드, 모듈 전역, 출력) 을 반환"""
+        with open(SCRIPT, encoding="utf-8") as f:
+            code = compile(f.read(), SCRIPT, "exec")
+        namespace = {"__name__": "__main__", "__file__": SCRIPT}
+        environ = {"OUTPUT_DIR": "", "BUCKET_NAME": "", "LEXICAL_INDEX_DIR": "", "EMBEDDING_CACHE_DIR": "", **env}
+        output = io.StringIO()
+        with contextlib.ExitStack() as stack:
+            stack.enter_context(mock.patch.dict(os.environ, environ))
+            stack.enter_context(mock.patch.dict(sys.modules, dict.fromkeys(HEAVY_MODULES)))
+            stack.enter_context(mock.patch.object(sys, "argv", [SCRIPT, *argv]))
+            stack.enter_context(contextlib.redirect_stdout(output))
+            stack.enter_context(contextlib.redirect_stderr(output))
+            try:
+                exec(code, namespace)
+                status = 0
+            except SystemExit as exc:
+                status = exc.code
+        return status, namespace, output.getvalue()
+
+    def assertSkipped(self, namespace, *names):
+        resources = namespace["resources"]
+        report = resources.report()
+        for name in names:
+            self.assertNotIn(name, resources.timings)
+            self.assertIn(f"{name} skipped", report)
+
+    def test_help_creates_no_resources(self):
+        status, namespace, output = self.run_script("--help")
+        self.assertEqual(status, 0)
+        self.assertIn("--no-rag", output)
+        self.assertEqual(namespace["resources"].timings, {})
+        self.assertSkipped(namespace, *gen.Resources.NAMES)
+
+    def test_failed_validation_creates_no_resources(self):
+        status, namespace, output = self.run_script("--count", "0")
+        self.assertEqual(status, 2)
+        self.assertEqual(namespace["resources"].timings, {})
+
+        # OUTPUT_DIR 도 BUCKET_NAME 도 없으면 LLM / S3 를 건드리기 전에 종료
+        status, namespace, output = self.run_script("--no-rag")
+        self.assertEqual(status, 1)
+        self.assertIn("BUCKET_NAME", output)
+        self.assertEqual(namespace["resources"].timings, {})
+        self.assertSkipped(namespace, *gen.Resources.NAMES)
+
+    def test_no_rag_run_skips_embedding_model_and_vector_store(self):
+        responses_path = os.path.join(self.tmp, "responses.json")
+        with open(responses_path, "w", encoding="utf-8") as f:
+            json.dump([canned_question(i) for i in range(2)], f, ensure_ascii=False)
+        output_dir = os.path.join(self.tmp, "bucket")
+
+        for count in ("1", "2"):
+            status, namespace, output = self.run_script(
+                "--no-rag", "--count", count, "--stub-llm", responses_path, "--output-dir", output_dir
+            )
+            self.assertEqual(status, 0, output)
+            self.assertIn("s3", namespace["resources"].timings)
+            self.assertSkipped(namespace, "embedding_model", "embedding_cache", "collection")
+            # 실행 끝에 출력하는 시작 비용 요약에도 skipped 로 남는다
+            self.assertIn("embedding_model skipped", output)
+            self.assertIn("collection skipped", output)
+        self.assertEqual(len(os.listdir(os.path.join(output_dir, "cs-question"))), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+"""
+EmbeddingCache 테스트 (임시 디렉터리, 모델 없이 동작)
+
+    cd question_gen && python -m unittest test_embedding_cache
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import embedding_cache
+from embedding_cache import EmbeddingCache, INDEX_FILE, VECTORS_FILE
+
+DIM = 4
+
+
+def vector(i, dim=DIM):
+    return np.arange(dim, dtype=np.float32) + i
+
+
+class EmbeddingCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def cache(self, rows=100, model="model-a"):
+        return EmbeddingCache(self.directory, model, max_bytes=rows * DIM * 4)
+
+    def test_put_get_round_trip(self):
+        cache = self.cache()
+        self.assertIsNone(cache.get("missing"))
+        cache.put("hello", [1.0, 2.0, 3.0, 4.0])
+        cache.put("world", vector(7))
+
+        np.testing.assert_array_equal(cache.get("hello"), np.array([1, 2, 3, 4], dtype=np.float32))
+        np.testing.assert_array_equal(cache.get("world"), vector(7))
+        self.assertEqual(cache.get("hello").dtype, np.float32)
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (3, 1, 2))
+
+        # 같은 텍스트를 다시 넣으면 행을 새로 쓰지 않고 덮어쓴다
+        cache.put("hello", vector(9))
+        np.testing.assert_array_equal(cache.get("hello"), vector(9))
+        self.assertEqual(len(cache), 2)
+
+    def test_reload_from_disk(self):
+        cache = self.cache()
+        for i in range(10):
+            cache.put(f"text {i}", vector(i))
+        cache.get("text 0") # LRU 순서도 유지된다
+        cache.flush()
+
+        reloaded = self.cache()
+        self.assertEqual(len(reloaded), 10)
+        for i in range(10):
+            np.testing.assert_array_equal(reloaded.get(f"text {i}"), vector(i))
+        self.assertEqual(list(reloaded._entries)[-1], reloaded.key("text 9"))
+
+        # 이어서 넣은 항목은 기존 행을 덮어쓰지 않는다
+        reloaded.put("text 10", vector(10))
+        np.testing.assert_array_equal(reloaded.get("text 0"), vector(0))
+        np.testing.assert_array_equal(reloaded.get("text 10"), vector(10))
+
+    def test_lru_eviction_order(self):
+        cache = self.cache(rows=16)
+        for i in range(16):
+            cache.put(f"text {i}", vector(i))
+        cache.get("text 0") # 가장 최근에 쓴 항목이 되어 내보내지 않는다
+
+        cache.put("text 16", vector(16))
+        # capacity 16 의 1/8 인 2개만 내보낸다: 가장 오래 쓰지 않은 text 1, text 2
+        self.assertEqual(len(cache), 15)
+        self.assertIsNone(cache.get("text 1"))
+        self.assertIsNone(cache.get("text 2"))
+        for i in (0, 3, 15, 16):
+            np.testing.assert_array_equal(cache.get(f"text {i}"), vector(i))
+
+    def test_eviction_keeps_cache_nearly_full(self):
+        cache = self.cache(rows=100)
+        for i in range(300):
+            cache.put(f"text {i}", vector(i))
+        self.assertGreaterEqual(len(cache), 100 - 100 // embedding_cache.EVICT_FRACTION)
+        self.assertLessEqual(len(cache), 100)
+        # 최근 항목은 모두 남아 있고 벡터가 섞이지 않았다
+        for i in range(290, 300):
+            np.testing.assert_array_equal(cache.get(f"text {i}"), vector(i))
+
+    def test_model_or_dim_change_discards_cache(self):
+        cache = self.cache()
+        cache.put("hello", vector(1))
+        cache.flush()
+
+        other_model = self.cache(model="model-b")
+        self.assertEqual(len(other_model), 0)
+        self.assertIsNone(other_model.get("hello"))
+
+        # 같은 모델이라도 차원이 바뀌면 새로 만든다
+        cache = self.cache()
+        cache.put("wide", vector(2, dim=8))
+        self.assertEqual(cache.dim, 8)
+        self.assertIsNone(cache.get("hello"))
+        np.testing.assert_array_equal(cache.get("wide"), vector(2, dim=8))
+
+    def test_truncated_vectors_file_is_discarded(self):
+        cache = self.cache()
+        for i in range(5):
+            cache.put(f"text {i}", vector(i))
+        cache.flush()
+        with open(os.path.join(self.directory, VECTORS_FILE), "r+b") as f:
+            f.truncate(DIM * 4 * 2)
+
+        reloaded = self.cache()
+        self.assertEqual(len(reloaded), 0)
+        self.assertIsNone(reloaded.get("text 0"))
+        reloaded.put("text 0", vector(0))
+        np.testing.assert_array_equal(reloaded.get("text 0"), vector(0))
+
+        # 깨진 index 도 마찬가지
+        with open(os.path.join(self.directory, INDEX_FILE), "w") as f:
+            f.write('{"model": "model-a", "dim": 4')
+        self.assertEqual(len(self.cache()), 0)
+
+    def test_crash_after_eviction_never_returns_wrong_vector(self):
+        cache = self.cache(rows=16)
+        with mock.patch.object(embedding_cache, "FLUSH_EVERY", 1000): # eviction 외에는 index 를 기록하지 않는다
+            for i in range(40):
+                cache.put(f"text {i}", vector(i))
+        # flush 없이 종료: 디스크의 index 는 마지막 eviction 시점 상태
+
+        reloaded = self.cache(rows=16)
+        self.assertGreater(len(reloaded), 0)
+        found = 0
+        for i in range(40):
+            cached = reloaded.get(f"text {i}")
+            if cached is not None:
+                np.testing.assert_array_equal(cached, vector(i))
+                found += 1
+        self.assertEqual(found, len(reloaded))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,207 @@
+"""
+MinHash / LSH 문장 중복 인덱스 테스트 (임시 디렉터리, 모델 / ChromaDB 없이 동작)
+
+    cd question_gen && python -m unittest test_lexical_dedup
+"""
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import cs_question_generation_v2 as gen
+from lexical_dedup import (
+    IDS_FILE, NUM_PERM, SIGNATURES_FILE, LexicalDuplicateIndex, band_keys, minhash, normalize, question_signature,
+    shingle_hashes,
+)
+
+
+def random_text(rng, length=40):
+    """한글 음절 length 개 (문제마다 shingle 이 거의 겹치지 않는다)"""
+    return "".join(chr(0xAC00 + rng.randrange(11172)) for _ in range(length))
+
+
+def mutate(rng, text, edits=2):
+    """글자 edits 개를 바꾼 문장 (문제를 조금 고쳐 쓴 중복)"""
+    chars = list(text)
+    for _ in range(edits):
+        chars[rng.randrange(len(chars))] = "가"
+    return "".join(chars)
+
+
+def jaccard(a, b):
+    a, b = set(shingle_hashes(a).tolist()), set(shingle_hashes(b).tolist())
+    return len(a & b) / len(a | b)
+
+
+class ShingleTests(unittest.TestCase):
+
+    def test_normalize_ignores_spacing_punctuation_and_markdown(self):
+        self.assertEqual(normalize("**프로세스**와 `스레드`의 차이는?"), "프로세스와스레드의차이는")
+        self.assertEqual(normalize("ＴＣＰ  Handshake!"), "tcphandshake")
+        self.assertEqual(normalize(None), "")
+
+    def test_shingles(self):
+        hashes = shingle_hashes("프로세스와 스레드")
+        self.assertEqual(hashes.size, len("프로세스와스레드") - 2)
+        self.assertTrue((hashes <= 0xFFFFFFFF).all())
+        np.testing.assert_array_equal(hashes, shingle_hashes("**프로세스와**   스레드."))
+        self.assertFalse(np.array_equal(hashes, shingle_hashes("프로세스와 스레드 차이")))
+        # 음절 순서가 바뀌면 다른 shingle
+        self.assertNotEqual(set(shingle_hashes("가나다").tolist()), set(shingle_hashes("다나가").tolist()))
+        # 짧은 문장은 한 shingle, 빈 문장은 없음
+        self.assertEqual(shingle_hashes("ab").size, 1)
+        self.assertEqual(shingle_hashes(" !? ").size, 0)
+
+    def test_minhash_estimates_jaccard(self):
+        rng = random.Random(1)
+        text = random_text(rng, 200)
+        for edits in (0, 5, 20, 60):
+            variant = mutate(rng, text, edits)
+            estimated = np.count_nonzero(minhash(shingle_hashes(text)) == minhash(shingle_hashes(variant))) / NUM_PERM
+            self.assertAlmostEqual(estimated, jaccard(text, variant), delta=0.15)
+
+        signature = minhash(shingle_hashes(""))
+        self.assertEqual(signature.dtype, np.uint32)
+        self.assertEqual(signature.shape, (NUM_PERM,))
+
+    def test_question_signature_uses_question_and_answer(self):
+        signature = question_signature({"question": "TCP 의 3-way handshake 순서는?", "answer": "SYN, SYN-ACK, ACK"})
+        np.testing.assert_array_equal(
+            signature, question_signature({"question": "**TCP의 3way handshake** 순서는", "answer": "SYN SYN ACK ACK", "topic": "x"})
+        )
+        self.assertFalse(np.array_equal(
+            signature, question_signature({"question": "TCP 의 3-way handshake 순서는?", "answer": "ACK, SYN"})
+        ))
+
+
+class LexicalDuplicateIndexTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        rng = random.Random(7)
+        self.texts = [random_text(rng) for _ in range(100)]
+        self.variants = [mutate(rng, text) for text in self.texts]
+
+    def populated(self):
+        index = LexicalDuplicateIndex(self.directory)
+        for i, text in enumerate(self.texts):
+            index.add(f"q-{i}", minhash(shingle_hashes(text)))
+        return index
+
+    def test_lsh_candidate_recall(self):
+        index = self.populated()
+        self.assertGreaterEqual(min(jaccard(text, variant) for text, variant in zip(self.texts, self.variants)), 0.7)
+
+        for i, variant in enumerate(self.variants):
+            signature = minhash(shingle_hashes(variant))
+            # 원래 문제가 같은 band bucket 에 들어가 후보가 되고, 가장 비슷한 문제로 찾아진다
+            candidates = {row for key in band_keys(signature)[0] for row in index._buckets.get(key, ())}
+            self.assertIn(i, candidates)
+            found = index.find_duplicate(signature, 0.6)
+            self.assertEqual(found[0], f"q-{i}")
+            self.assertGreaterEqual(found[1], 0.6)
+
+    def test_unrelated_questions_are_not_duplicates(self):
+        index = self.populated()
+        rng = random.Random(11)
+        for _ in range(100):
+            self.assertIsNone(index.find_duplicate(minhash(shingle_hashes(random_text(rng))), 0.5))
+        # 같은 문장이라도 기준을 넘지 않으면 None
+        self.assertIsNone(index.find_duplicate(minhash(shingle_hashes(self.variants[0])), 1.0))
+
+    def test_reload_from_disk(self):
+        self.populated()
+        reloaded = LexicalDuplicateIndex(self.directory)
+        self.assertEqual(len(reloaded), 100)
+        self.assertEqual(reloaded.find_duplicate(minhash(shingle_hashes(self.variants[3])), 0.6)[0], "q-3")
+
+    def test_reload_truncates_partial_tail(self):
+        self.populated()
+        # signature 일부와 개행 없는 id 가 남은 채로 종료된 경우
+        with open(os.path.join(self.directory, SIGNATURES_FILE), "ab") as f:
+            f.write(b"\0" * 10)
+        with open(os.path.join(self.directory, IDS_FILE), "a", encoding="utf-8") as f:
+            f.write("q-partial")
+
+        index = LexicalDuplicateIndex(self.directory)
+        self.assertEqual(len(index), 100)
+        self.assertEqual(os.path.getsize(os.path.join(self.directory, SIGNATURES_FILE)), 100 * NUM_PERM * 4)
+        index.add("q-after", minhash(shingle_hashes("새로 추가한 문제 문장")))
+
+        reloaded = LexicalDuplicateIndex(self.directory)
+        self.assertEqual(len(reloaded), 101)
+        self.assertEqual(reloaded.find_duplicate(minhash(shingle_hashes("새로 추가한 문제 문장")), 0.9)[0], "q-after")
+        self.assertEqual(reloaded.find_duplicate(minhash(shingle_hashes(self.texts[99])), 0.9)[0], "q-99")
+
+    def test_reload_with_fewer_signatures_than_ids(self):
+        self.populated()
+        with open(os.path.join(self.directory, SIGNATURES_FILE), "r+b") as f:
+            f.truncate(50 * NUM_PERM * 4)
+
+        index = LexicalDuplicateIndex(self.directory)
+        self.assertEqual(len(index), 50)
+        with open(os.path.join(self.directory, IDS_FILE), encoding="utf-8") as f:
+            self.assertEqual(f.read().splitlines(), [f"q-{i}" for i in range(50)])
+        self.assertIsNone(index.find_duplicate(minhash(shingle_hashes(self.texts[60])), 0.9))
+
+
+class StoreQuestionOrderTests(unittest.TestCase):
+    """store_question: MinHash 검사 -> 임베딩 검사 -> S3 저장 -> 임베딩 / MinHash 저장 순서"""
+
+    question = {"topic": "OS", "question": "프로세스와 스레드의 차이는 무엇인가?", "answer": "메모리 공유 여부", "selections": []}
+
+    def setUp(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        self.calls = mock.Mock()
+        self.calls.encode_text.return_value = [1.0, 0.0]
+        for name, value in {
+            "OUTPUT_DIR": os.path.join(tmp, "bucket"),
+            "LEXICAL_INDEX_DIR": os.path.join(tmp, "lexical"),
+            "EMBEDDING_CACHE_DIR": "",
+            "resources": gen.Resources(),
+            "encode_text": self.calls.encode_text,
+            "check_not_duplicate": self.calls.check_not_duplicate,
+            "embed_and_store_single_question": self.calls.embed_and_store_single_question,
+        }.items():
+            patcher = mock.patch.object(gen, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def store(self, question):
+        return gen.store_question("{}", question, is_manual_mode=False, use_rag=True)
+
+    def test_new_question_is_checked_then_stored(self):
+        key = self.store(self.question)
+        self.assertEqual([name for name, _, _ in self.calls.mock_calls], [
+            "encode_text", "check_not_duplicate", "embed_and_store_single_question",
+        ])
+        self.assertEqual(len(gen.resources.lexical_index), 1)
+        self.assertEqual(gen.resources.lexical_index.find_duplicate(question_signature(self.question), 0.9)[0], key)
+
+    def test_lexical_duplicate_skips_embedding(self):
+        self.store(self.question)
+        self.calls.reset_mock()
+
+        rewritten = {**self.question, "question": "**프로세스**와 스레드의 차이는 무엇인가요?"}
+        with self.assertRaisesRegex(gen.DuplicateQuestionError, "Lexical"):
+            self.store(rewritten)
+        self.assertEqual(self.calls.mock_calls, [])
+        self.assertEqual(len(os.listdir(os.path.join(gen.OUTPUT_DIR, "cs-question"))), 1)
+        self.assertNotIn("embedding_model", gen.resources.timings)
+
+    def test_embedding_duplicate_is_not_added_to_lexical_index(self):
+        self.calls.check_not_duplicate.side_effect = gen.DuplicateQuestionError("near-duplicate")
+        with self.assertRaises(gen.DuplicateQuestionError):
+            self.store(self.question)
+        self.assertEqual(len(gen.resources.lexical_index), 0)
+        self.calls.embed_and_store_single_question.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
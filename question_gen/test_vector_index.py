@@ -0,0 +1,180 @@
+"""
+LocalVectorIndex / 임베딩 중복 검사 테스트 (임시 디렉터리, 모델 / ChromaDB 없이 동작)
+
+    cd question_gen && python -m unittest test_vector_index
+"""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import cs_question_generation_v2 as gen
+from vector_index import LocalVectorIndex, RECORDS_FILE, VECTORS_FILE
+
+
+def unit(*values):
+    vector = np.asarray(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+class LocalVectorIndexTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def populated(self):
+        index = LocalVectorIndex(self.directory)
+        index.add(
+            ids=["os-1", "os-2", "net-1"],
+            embeddings=[[1, 0, 0], [0, 2, 0], [1, 0.1, 0]],
+            documents=["OS 1", "OS 2", "NET 1"],
+            metadatas=[{"topic": "OS"}, {"topic": "OS"}, {"topic": "Network"}],
+        )
+        index.add(ids=["untagged"], embeddings=[[0, 0, 1]])
+        return index
+
+    def test_add_and_query(self):
+        index = self.populated()
+        self.assertEqual(index.count(), 4)
+
+        result = index.query([[2, 0.2, 0]], n_results=2)
+        self.assertEqual(result["ids"], [["net-1", "os-1"]])
+        self.assertEqual(result["documents"], [["NET 1", "OS 1"]])
+        self.assertAlmostEqual(result["distances"][0][0], 0.0, places=6)
+        self.assertNotIn("embeddings", result)
+
+        # 저장한 벡터는 정규화되어 있다
+        result = index.query([[0, 1, 0]], n_results=1, include=["embeddings"])
+        np.testing.assert_allclose(result["embeddings"][0][0], [0, 1, 0])
+        self.assertEqual(set(result), {"ids", "embeddings"})
+
+        # 여러 query 를 한 번에, n_results 가 후보 수보다 커도 된다
+        result = index.query([[1, 0, 0], [0, 0, 1]], n_results=10)
+        self.assertEqual([len(ids) for ids in result["ids"]], [4, 4])
+        self.assertEqual([ids[0] for ids in result["ids"]], ["os-1", "untagged"])
+
+        with self.assertRaises(ValueError):
+            index.add(ids=["bad"], embeddings=[[1, 0]])
+
+    def test_topic_partitions(self):
+        index = self.populated()
+        result = index.query([[1, 0.1, 0]], n_results=5, where={"topic": "OS"})
+        self.assertEqual(result["ids"], [["os-1", "os-2"]])
+        self.assertEqual(index.query([[1, 0, 0]], where={"topic": "DB"})["ids"], [[]])
+        self.assertEqual(index.query([[1, 0, 0]], where={"topic": None})["ids"], [["untagged"]])
+
+        index.add(ids=["os-3"], embeddings=[[1, 0.2, 0]], metadatas=[{"topic": "OS", "level": "hard"}])
+        self.assertEqual(index.query([[1, 0, 0]], n_results=5, where={"topic": "OS"})["ids"], [["os-1", "os-3", "os-2"]])
+        self.assertEqual(index.query([[1, 0, 0]], where={"topic": "OS", "level": "hard"})["ids"], [["os-3"]])
+        self.assertEqual(LocalVectorIndex(self.directory).query([[1, 0, 0]], where={"topic": "OS"})["ids"], [["os-1", "os-3", "os-2"]])
+
+    def test_empty_index(self):
+        index = LocalVectorIndex(self.directory)
+        self.assertEqual(index.count(), 0)
+        self.assertEqual(index.query([[1, 0, 0]], n_results=3)["ids"], [[]])
+
+    def test_reload_truncates_partial_tail(self):
+        self.populated()
+        # 벡터 한 행의 일부와 끝나지 않은 record 줄이 남은 채로 종료된 경우
+        with open(os.path.join(self.directory, VECTORS_FILE), "ab") as f:
+            f.write(b"\0" * 5)
+        with open(os.path.join(self.directory, RECORDS_FILE), "a") as f:
+            f.write('{"id": "partial", "dim"')
+
+        index = LocalVectorIndex(self.directory)
+        self.assertEqual(index.count(), 4)
+        self.assertEqual(os.path.getsize(os.path.join(self.directory, VECTORS_FILE)), 4 * 3 * 4)
+        index.add(ids=["after"], embeddings=[[0, 1, 1]], metadatas=[{"topic": "DB"}])
+
+        reloaded = LocalVectorIndex(self.directory)
+        self.assertEqual(reloaded.count(), 5)
+        self.assertEqual(reloaded.query([[0, 1, 1]], n_results=1, where={"topic": "DB"})["ids"], [["after"]])
+
+    def test_reload_with_fewer_vectors_than_records(self):
+        self.populated()
+        with open(os.path.join(self.directory, VECTORS_FILE), "r+b") as f:
+            f.truncate(2 * 3 * 4 + 7)
+
+        index = LocalVectorIndex(self.directory)
+        self.assertEqual(index.count(), 2)
+        self.assertEqual(index.query([[1, 0, 0]], n_results=5)["ids"], [["os-1", "os-2"]])
+        with open(os.path.join(self.directory, RECORDS_FILE)) as f:
+            self.assertEqual(len(f.readlines()), 2)
+
+    def test_reload_stops_at_corrupt_record(self):
+        self.populated()
+        path = os.path.join(self.directory, RECORDS_FILE)
+        with open(path) as f:
+            lines = f.readlines()
+        lines[2] = "not json\n"
+        with open(path, "w") as f:
+            f.writelines(lines)
+
+        index = LocalVectorIndex(self.directory)
+        self.assertEqual(index.count(), 2)
+        self.assertEqual(os.path.getsize(os.path.join(self.directory, VECTORS_FILE)), 2 * 3 * 4)
+        index.add(ids=["after"], embeddings=[[0, 0, 1]])
+        self.assertEqual(LocalVectorIndex(self.directory).count(), 3)
+
+    def test_reload_without_vectors_file(self):
+        self.populated()
+        os.remove(os.path.join(self.directory, VECTORS_FILE))
+
+        index = LocalVectorIndex(self.directory)
+        self.assertEqual(index.count(), 0)
+        self.assertEqual(os.path.getsize(os.path.join(self.directory, RECORDS_FILE)), 0)
+        # 다른 차원으로 새로 시작할 수 있다
+        index.add(ids=["wide"], embeddings=[[1, 0, 0, 0]])
+        self.assertEqual(LocalVectorIndex(self.directory).query([[1, 0, 0, 0]], n_results=1)["ids"], [["wide"]])
+
+
+class DuplicateCheckTests(unittest.TestCase):
+    """check_not_duplicate: 같은 주제에서 가장 가까운 문제와의 코사인 유사도가 기준 이상이면 DuplicateQuestionError"""
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.index = LocalVectorIndex(directory)
+        self.index.add(
+            ids=["os-1", "net-1"],
+            embeddings=[[1, 0, 0], [0, 1, 0]],
+            documents=["OS question", "Network question"],
+            metadatas=[{"topic": "OS"}, {"topic": "Network"}],
+        )
+        resources = gen.Resources()
+        resources._values["collection"] = self.index
+        for name, value in {"resources": resources, "DUPLICATE_SIMILARITY_THRESHOLD": 0.9}.items():
+            patcher = mock.patch.object(gen, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_similarity_at_threshold_is_duplicate(self):
+        with self.assertRaisesRegex(gen.DuplicateQuestionError, "OS question"):
+            gen.check_not_duplicate({"topic": "OS"}, unit(1, 0.05, 0) * 3)
+        # cos = 0.9 정확히: 기준 이상이면 중복
+        with self.assertRaises(gen.DuplicateQuestionError):
+            gen.check_not_duplicate({"topic": "OS"}, [0.9, np.sqrt(1 - 0.81), 0])
+
+    def test_below_threshold_passes(self):
+        gen.check_not_duplicate({"topic": "OS"}, [0.85, np.sqrt(1 - 0.85 ** 2), 0])
+        gen.check_not_duplicate({"topic": "OS"}, [0, 0, 1])
+
+    def test_only_same_topic_is_compared(self):
+        # Network 문제와 같은 벡터지만 OS 주제에서는 가장 가까운 문제가 멀다
+        gen.check_not_duplicate({"topic": "OS"}, [0, 1, 0])
+        gen.check_not_duplicate({"topic": "DB"}, [1, 0, 0])
+        with self.assertRaises(gen.DuplicateQuestionError):
+            gen.check_not_duplicate({}, [0, 1, 0])
+
+    def test_disabled_threshold(self):
+        with mock.patch.object(gen, "DUPLICATE_SIMILARITY_THRESHOLD", float("inf")):
+            gen.check_not_duplicate({"topic": "OS"}, [1, 0, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
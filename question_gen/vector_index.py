@@ -0,0 +1,167 @@
+import os
+import json
+import threading
+
+import numpy as np
+
+VECTORS_FILE = "vectors.f32"
+RECORDS_FILE = "records.jsonl"
+
+
+class LocalVectorIndex:
+    """
+    ChromaDB 컬렉션의 add / query / count 와 같은 인터페이스를 가진 로컬 벡터 인덱스 (ChromaDB 서버 없이 동작).
+
+    정규화한 float32 임베딩을 directory/vectors.f32 에 행 단위로 이어 쓰고 np.memmap 으로 읽으며,
+    id / 문서 / 메타데이터는 directory/records.jsonl 에 한 줄씩 이어 쓴다. 둘 다 추가만 하므로 중간에 종료되어도
+    이미 기록된 행은 깨지지 않는다 (로드 시 두 파일 중 짧은 쪽에 맞추고, 깨진 줄이나 없는 파일도 끊긴 꼬리처럼 잘라낸다).
+
+    검색은 정확한(brute-force) 코사인 유사도이며, metadata 의 topic 별로 행 번호를 나눠 두어 where={"topic": ...}
+    검색은 해당 주제의 행만 계산한다 (주제를 coarse partition 으로 쓰는 IVF). 문제 수가 수만 개 수준이면
+    행렬-벡터 곱 한 번이 1ms 안팎이라 HNSW 같은 근사 구조가 필요하지 않다.
+    """
+
+    def __init__(self, directory, partition_key="topic"):
+        self.directory = directory
+        self.partition_key = partition_key
+        self._lock = threading.Lock()
+        self.dim = None
+        self._vectors = None
+        self._records = []
+        self._partitions = {} # partition_key 값 -> 행 번호 목록
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _load(self):
+        record_ends = [] # 각 record 줄이 끝나는 바이트 위치
+        if os.path.exists(self._path(RECORDS_FILE)):
+            with open(self._path(RECORDS_FILE), "rb") as f:
+                for line in f:
+                    record = self._parse_record(line)
+                    if record is None:
+                        break # 마지막 줄이 기록 도중 끊겼거나 깨진 경우: 그 줄부터 끊긴 꼬리로 취급한다
+                    self._records.append(record)
+                    record_ends.append((record_ends[-1] if record_ends else 0) + len(line))
+
+        vectors_size = os.path.getsize(self._path(VECTORS_FILE)) if os.path.exists(self._path(VECTORS_FILE)) else 0
+        self.dim = self._records[0]["dim"] if self._records else None
+        rows = min(len(self._records), vectors_size // (self.dim * 4)) if self.dim else 0
+        del self._records[rows:]
+        # 기록 도중 끊긴 꼬리를 잘라내야 이후 add 가 행 / 줄 경계에 맞춰 이어 쓴다
+        if os.path.exists(self._path(VECTORS_FILE)):
+            with open(self._path(VECTORS_FILE), "r+b") as f:
+                f.truncate(rows * self.dim * 4 if rows else 0)
+        if os.path.exists(self._path(RECORDS_FILE)):
+            with open(self._path(RECORDS_FILE), "r+b") as f:
+                f.truncate(record_ends[rows - 1] if rows else 0)
+        if not rows:
+            self.dim = None
+            return
+        self._remap()
+        for row, record in enumerate(self._records):
+            self._partitions.setdefault((record["metadata"] or {}).get(self.partition_key), []).append(row)
+
+    def _parse_record(self, line):
+        """records.jsonl 의 한 줄. 끝나지 않았거나 깨진 줄, 앞 줄과 dim 이 다른 줄이면 None"""
+        if not line.endswith(b"\n"):
+            return None
+        try:
+            record = json.loads(line)
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            return None
+        if not isinstance(record, dict) or not {"id", "dim", "metadata"} <= record.keys():
+            return None
+        dim = record["dim"]
+        if not isinstance(record["metadata"], (dict, type(None))) or not isinstance(dim, int) or dim < 1 or (self._records and dim != self._records[0]["dim"]):
+            return None
+        return record
+
+    def _remap(self):
+        self._vectors = np.memmap(self._path(VECTORS_FILE), dtype=np.float32, mode="r", shape=(len(self._records), self.dim))
+
+    def count(self):
+        return len(self._records)
+
+    def add(self, ids, embeddings, documents=None, metadatas=None):
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim != 2 or (self.dim is not None and vectors.shape[1] != self.dim):
+            raise ValueError(f"Expected embeddings of dimension {self.dim}, got shape {vectors.shape}.")
+        vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        documents = documents or [None] * len(ids)
+        metadatas = metadatas or [None] * len(ids)
+
+        with self._lock:
+            self.dim = vectors.shape[1]
+            start = len(self._records)
+            # 벡터를 먼저 기록해야 records 만 있고 벡터가 없는 행이 생기지 않는다
+            with open(self._path(VECTORS_FILE), "ab") as f:
+                f.write(vectors.tobytes())
+            with open(self._path(RECORDS_FILE), "a", encoding="utf-8") as f:
+                for id_, document, metadata in zip(ids, documents, metadatas):
+                    record = {"id": id_, "dim": self.dim, "document": document, "metadata": metadata}
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    self._records.append(record)
+            for row in range(start, len(self._records)):
+                key = (self._records[row]["metadata"] or {}).get(self.partition_key)
+                self._partitions.setdefault(key, []).append(row)
+            self._remap()
+
+    def _candidate_rows(self, where):
+        """where 는 ChromaDB 와 같은 {key: value} 동등 조건만 지원 (partition_key 조건은 partition 으로 바로 찾는다)"""
+        if not where:
+            return None
+        rows = None
+        for key, value in where.items():
+            if key == self.partition_key:
+                matched = self._partitions.get(value, [])
+            else:
+                matched = [row for row in (rows if rows is not None else range(len(self._records)))
+                           if (self._records[row]["metadata"] or {}).get(key) == value]
+            if rows is not None:
+                matched = set(matched)
+                matched = [row for row in rows if row in matched]
+            rows = matched
+        return rows
+
+    def query(self, query_embeddings, n_results=10, where=None, include=("documents", "metadatas", "distances")):
+        """ChromaDB 와 같은 형식의 결과 (query 마다 리스트). distances 는 코사인 거리(1 - 코사인 유사도)"""
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+
+        with self._lock:
+            vectors = self._vectors
+            rows = self._candidate_rows(where)
+            # partition 조건이면 _candidate_rows 가 add 가 이어 붙이는 리스트 자체를 돌려주므로, 같은 시점의 vectors 와 함께 복사한다
+            if rows is not None:
+                rows = np.array(rows, dtype=np.int64)
+        if vectors is None:
+            rows = np.empty(0, dtype=np.int64)
+            candidates = None
+        elif rows is None:
+            rows = np.arange(len(vectors))
+            candidates = vectors
+        else:
+            candidates = vectors[rows]
+
+        result = {"ids": [], "distances": [], "documents": [], "metadatas": [], "embeddings": []}
+        for query in queries:
+            if rows.size == 0 or n_results < 1:
+                top = np.empty(0, dtype=np.int64)
+                scores = np.empty(0, dtype=np.float32)
+            else:
+                scores = candidates @ query
+                k = min(n_results, scores.size)
+                top = np.argpartition(-scores, k - 1)[:k]
+                top = top[np.argsort(-scores[top])]
+                scores = scores[top]
+                top = rows[top]
+            result["ids"].append([self._records[row]["id"] for row in top])
+            result["distances"].append([float(1.0 - score) for score in scores])
+            result["documents"].append([self._records[row]["document"] for row in top])
+            result["metadatas"].append([self._records[row]["metadata"] for row in top])
+            result["embeddings"].append([np.array(vectors[row]) for row in top])
+
+        return {key: value for key, value in result.items() if key == "ids" or key in include}